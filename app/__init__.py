@@ -1,5 +1,6 @@
 from importlib import metadata as importlib_metadata
 from os import getenv as _getenv
+from pathlib import Path as _Path
 
 from dotenv import load_dotenv as _load_dotenv
 from loguru import logger as _logger
@@ -25,19 +26,45 @@ _load_dotenv(dotenv_path=_env_file)
 version: str = get_version()
 settings = _Settings(VERSION=version)  # type: ignore
 
+# Load the log files from ENV, else from app.paths
+_log_file = _Path(_getenv("LOG_FILE", _LOG_FILE))
+_error_log_file = _Path(_getenv("ERROR_LOG_FILE", _ERROR_LOG_FILE))
+
+# The ids of the file sinks, to replace them
+_log_sinks: list[int] = []
+
+
+def configure_log_files(
+    log_file: _Path = _log_file, error_log_file: _Path = _error_log_file
+) -> None:
+    """
+    Replace the log file sinks with sinks writing to the given files.
+
+    With LOG_ENQUEUE, the file sinks write from a background thread, so logging never
+    blocks the event loop on disk. The sinks are added once per process, on import, and only
+    replaced, never duplicated.
+
+    Args:
+        log_file (Path): The log file, at LOG_LEVEL.
+        error_log_file (Path): The error log file.
+    """
+    for sink_id in _log_sinks:
+        _logger.remove(sink_id)
+    _log_sinks.clear()
+    for sink_file, sink_level in ((log_file, settings.LOG_LEVEL), (error_log_file, "ERROR")):
+        _log_sinks.append(
+            _logger.add(
+                sink_file,
+                filter=lambda record: record["extra"].get("name") == "logger",
+                level=sink_level,
+                rotation="10 MB",
+                enqueue=settings.LOG_ENQUEUE,
+            )
+        )
+
+
 # Configure loggers
-_logger.add(
-    _LOG_FILE,
-    filter=lambda record: record["extra"].get("name") == "logger",
-    level=settings.LOG_LEVEL,
-    rotation="10 MB",
-)
-_logger.add(
-    _ERROR_LOG_FILE,
-    filter=lambda record: record["extra"].get("name") == "logger",
-    level="ERROR",
-    rotation="10 MB",
-)
+configure_log_files()
 
 # Expose logger
 logger = _logger.bind(name="logger")
@@ -5,7 +5,7 @@ from fastapi.security import OAuth2PasswordBearer
 from sqlmodel import Session
 
 from app import crud, models, settings
-from app.core import security
+from app.core import auth_cache
 from app.db.session import SessionLocal
 
 reusable_oauth2 = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_PREFIX}/login/access-token")
@@ -35,7 +35,7 @@ async def get_current_user_id(token: str = Depends(reusable_oauth2)) -> str:
     Returns:
         str: The user id.
     """
-    return security.decode_token(token=token, key=settings.JWT_ACCESS_SECRET_KEY)
+    return auth_cache.decode_access_token(token=token)
 
 
 async def get_current_user(
@@ -56,7 +56,7 @@ async def get_current_user(
         HTTPException: If the user is not found.
     """
     try:
-        return await crud.user.get(db=db, id=user_id)
+        return await auth_cache.get_user(db=db, user_id=user_id)
     except crud.RecordNotFoundError as exc:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User from access token not found"
@@ -1,12 +1,13 @@
 from fastapi import APIRouter
 
 from app import models, settings, version
-from app.api.v1.endpoints import login, users
+from app.api.v1.endpoints import generation, login, users
 
 api_router = APIRouter()
 
 api_router.include_router(login.router, tags=["login"])
 api_router.include_router(users.router, prefix="/user", tags=["Users"])
+api_router.include_router(generation.router, prefix="/generation", tags=["Generation"])
 
 
 @api_router.get("/", response_model=models.HealthCheck, tags=["status"])
@@ -1,15 +1,344 @@
-from typing import Optional
+from typing import Any, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlmodel import Session
 
 from app import crud, models
 from app.api import deps
+from app.core import metrics
 from app.core.civit import fetch_cursor_data
+from app.core.page_cache import invalidate_gallery
+from app.core.responses import FastJSONResponse
+from app.services.importer import import_cursor_content, run_import
 
 router = APIRouter()
 
 
+def serialize_cursor(cursor: models.Cursor) -> dict[str, Any]:
+    """
+    Serialize a cursor to plain JSON-able data.
+
+    Args:
+        cursor (models.Cursor): The cursor.
+
+    Returns:
+        dict[str, Any]: The serialized cursor.
+    """
+    return {
+        "id": cursor.id,
+        "next_cursor_id": cursor.next_cursor_id,
+        "page_number": cursor.page_number,
+        "model_id": cursor.model_id,
+        "timestamp_ms": cursor.timestamp_ms,
+        "created_at": cursor.created_at,
+    }
+
+
+def serialize_image(image: models.GeneratedImage) -> dict[str, Any]:
+    """
+    Serialize a generated image to plain JSON-able data.
+
+    Args:
+        image (models.GeneratedImage): The image.
+
+    Returns:
+        dict[str, Any]: The serialized image.
+    """
+    return {
+        "id": image.id,
+        "url": image.url,
+        "width": image.width,
+        "height": image.height,
+        "cursor_id": image.cursor_id,
+        "step_id": image.step_id,
+        "seed": image.seed,
+        "created_at": image.created_at,
+    }
+
+
+def serialize_step(step: models.GenerationStep) -> dict[str, Any]:
+    """
+    Serialize a generation step to plain JSON-able data.
+
+    Args:
+        step (models.GenerationStep): The generation step.
+
+    Returns:
+        dict[str, Any]: The serialized generation step.
+    """
+    return {
+        "id": step.id,
+        "prompt": step.prompt,
+        "negative_prompt": step.negative_prompt,
+        "base_model": step.base_model,
+        "model_id": step.model_id,
+        "sampler": step.sampler,
+        "seed": step.seed,
+        "steps": step.steps,
+        "cfg_scale": step.cfg_scale,
+    }
+
+
+def serialize_import_run(run: models.ImportRun) -> dict[str, Any]:
+    """
+    Serialize an import run to plain JSON-able data.
+
+    Args:
+        run (models.ImportRun): The import run.
+
+    Returns:
+        dict[str, Any]: The serialized import run.
+    """
+    return {
+        "id": run.id,
+        "trigger": run.trigger,
+        "status": run.status,
+        "start_cursor_id": run.start_cursor_id,
+        "started_at": run.started_at,
+        "finished_at": run.finished_at,
+        "error": run.error,
+        "pages_fetched": run.pages_fetched,
+        "cursors_imported": run.cursors_imported,
+        "images_inserted": run.images_inserted,
+        "images_skipped": run.images_skipped,
+        "bytes_downloaded": run.bytes_downloaded,
+        "fetch_seconds": run.fetch_seconds,
+        "parse_seconds": run.parse_seconds,
+        "db_seconds": run.db_seconds,
+        "relink_seconds": run.relink_seconds,
+        "duration_seconds": run.duration_seconds,
+        "images_per_second": run.images_per_second,
+        "bound": run.bound,
+    }
+
+
+@router.get("/cursors", response_class=FastJSONResponse)
+async def list_cursors(
+    before: Optional[str] = None,
+    limit: int = Query(default=50, ge=1, le=500),
+    db: Session = Depends(deps.get_db),
+    _: models.User = Depends(deps.get_current_active_user),
+) -> FastJSONResponse:
+    """
+    List cursors, newest first, with keyset pagination.
+
+    Args:
+        before (str | None): Return cursors older than this cursor id (the previous `next`).
+        limit (int): The maximum number of cursors to return.
+        db (Session): database session.
+        _ (models.User): Current active user.
+
+    Returns:
+        FastJSONResponse: The cursors and the `next` keyset token.
+
+    Raises:
+        HTTPException: If the `before` token is not a cursor id.
+    """
+    try:
+        cursors = await crud.cursor.get_before(db=db, before=before, limit=limit)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail="Invalid 'before' token") from exc
+    return FastJSONResponse(
+        {
+            "items": [serialize_cursor(cursor) for cursor in cursors],
+            "next": cursors[-1].id if len(cursors) == limit else None,
+        }
+    )
+
+
+@router.get("/cursors/{cursor_id}", response_class=FastJSONResponse)
+async def get_cursor(
+    cursor_id: str,
+    db: Session = Depends(deps.get_db),
+    _: models.User = Depends(deps.get_current_active_user),
+) -> FastJSONResponse:
+    """
+    Get a cursor with its images.
+
+    Args:
+        cursor_id (str): The cursor id.
+        db (Session): database session.
+        _ (models.User): Current active user.
+
+    Returns:
+        FastJSONResponse: The cursor and its images.
+
+    Raises:
+        HTTPException: If the cursor does not exist.
+    """
+    cursor = await crud.cursor.get_or_none(db=db, id=cursor_id)
+    if not cursor:
+        raise HTTPException(status_code=404, detail="Cursor not found")
+    images = await crud.generated_image.get_by_cursor(db=db, cursor_id=cursor_id)
+    return FastJSONResponse(
+        {**serialize_cursor(cursor), "images": [serialize_image(image) for image in images]}
+    )
+
+
+@router.get("/images/{image_id}/neighbors", response_class=FastJSONResponse)
+async def get_image_neighbors(
+    image_id: str,
+    limit: int = Query(default=5, ge=1, le=100),
+    db: Session = Depends(deps.get_db),
+    _: models.User = Depends(deps.get_current_active_user),
+) -> FastJSONResponse:
+    """
+    Get an image with its neighbours in gallery order, across cursor boundaries.
+
+    Args:
+        image_id (str): The image id.
+        limit (int): The number of neighbours to return on each side.
+        db (Session): database session.
+        _ (models.User): Current active user.
+
+    Returns:
+        FastJSONResponse: The image, the preceding images and the following images, each
+            list nearest first.
+
+    Raises:
+        HTTPException: If the image does not exist.
+    """
+    image = await crud.generated_image.get_or_none(db=db, id=image_id)
+    if not image:
+        raise HTTPException(status_code=404, detail="Image not found")
+    before = await crud.generated_image.get_before(db=db, image=image, limit=limit)
+    after = await crud.generated_image.get_after(db=db, image=image, limit=limit)
+    return FastJSONResponse(
+        {
+            "image": serialize_image(image),
+            "before": [serialize_image(img) for img in before],
+            "after": [serialize_image(img) for img in after],
+        }
+    )
+
+
+@router.get("/timeline", response_class=FastJSONResponse)
+async def get_timeline(
+    after: Optional[str] = None,
+    limit: int = Query(default=24, ge=1, le=500),
+    db: Session = Depends(deps.get_db),
+    _: models.User = Depends(deps.get_current_active_user),
+) -> FastJSONResponse:
+    """
+    Get the image timeline in gallery order, across cursor boundaries.
+
+    Args:
+        after (str | None): Keyset token, the image id of the previous `next`.
+        limit (int): The maximum number of images to return.
+        db (Session): database session.
+        _ (models.User): Current active user.
+
+    Returns:
+        FastJSONResponse: The images and the `next` keyset token.
+
+    Raises:
+        HTTPException: If the keyset token does not exist.
+    """
+    try:
+        images = await crud.generated_image.get_timeline(db=db, after_id=after, limit=limit)
+    except crud.RecordNotFoundError as exc:
+        raise HTTPException(status_code=400, detail="Invalid 'after' token") from exc
+    return FastJSONResponse(
+        {
+            "items": [serialize_image(image) for image in images],
+            "next": images[-1].id if len(images) == limit else None,
+        }
+    )
+
+
+@router.get("/days", response_class=FastJSONResponse)
+async def list_days(
+    year: int = Query(ge=1, le=9998),
+    month: int = Query(ge=1, le=12),
+    db: Session = Depends(deps.get_db),
+    _: models.User = Depends(deps.get_current_active_user),
+) -> FastJSONResponse:
+    """
+    List the days of a month that have cursors, with their counts.
+
+    Args:
+        year (int): The year.
+        month (int): The month.
+        db (Session): database session.
+        _ (models.User): Current active user.
+
+    Returns:
+        FastJSONResponse: The days, in calendar order.
+    """
+    days = await crud.browse_day.get_month(db=db, year=year, month=month)
+    return FastJSONResponse(
+        {
+            "items": [
+                {
+                    "day": day.day,
+                    "cursor_count": day.cursor_count,
+                    "image_count": day.image_count,
+                    "first_cursor_id": day.first_cursor_id,
+                }
+                for day in days
+            ]
+        }
+    )
+
+
+@router.get("/search", response_class=FastJSONResponse)
+async def search_images(
+    q: Optional[str] = None,
+    base_model: Optional[str] = None,
+    model_id: Optional[int] = None,
+    sampler: Optional[str] = None,
+    seed: Optional[int] = None,
+    before: Optional[str] = None,
+    limit: int = Query(default=50, ge=1, le=500),
+    db: Session = Depends(deps.get_db),
+    _: models.User = Depends(deps.get_current_active_user),
+) -> FastJSONResponse:
+    """
+    Search images by prompt text and generation parameters, newest first.
+
+    Args:
+        q (str | None): Free text matched against the prompt and negative prompt.
+        base_model (str | None): Exact base model to filter by.
+        model_id (int | None): Exact checkpoint model version id to filter by.
+        sampler (str | None): Exact sampler to filter by.
+        seed (int | None): Exact image seed to filter by.
+        before (str | None): Keyset token, the image id of the previous `next`.
+        limit (int): The maximum number of images to return.
+        db (Session): database session.
+        _ (models.User): Current active user.
+
+    Returns:
+        FastJSONResponse: The matching images with their step and the `next` keyset token.
+
+    Raises:
+        HTTPException: If the keyset token does not exist.
+    """
+    before_image = None
+    if before:
+        before_image = await crud.generated_image.get_or_none(db=db, id=before)
+        if not before_image:
+            raise HTTPException(status_code=400, detail="Invalid 'before' token")
+
+    results = await crud.generation_step.search_images(
+        db=db,
+        query=q,
+        base_model=base_model,
+        model_id=model_id,
+        sampler=sampler,
+        seed=seed,
+        before=before_image,
+        limit=limit,
+    )
+    return FastJSONResponse(
+        {
+            "items": [
+                {**serialize_image(image), "step": serialize_step(step)} for image, step in results
+            ],
+            "next": results[-1][0].id if len(results) == limit else None,
+        }
+    )
+
+
 @router.post("/import-generation", response_model=models.CursorRead)
 async def import_generation_data(
     cursor_id: str,
@@ -27,16 +356,63 @@ async def import_generation_data(
     # Create cursor record
     cursor_create = models.CursorCreate(id=cursor_id, next_cursor_id=cursor_data.get("next_cursor"))
     cursor = await crud.cursor.create(db, obj_in=cursor_create)
+    metrics.IMPORTED_CURSORS.inc()
 
-    # Create image records
-    for image_data in cursor_data.get("images", []):
-        image_create = models.GeneratedImageCreate(
-            id=image_data["id"],
-            url=image_data["url"],
-            width=image_data["width"],
-            height=image_data["height"],
-            cursor_id=cursor.id,
-        )
-        await crud.generated_image.create(db, obj_in=image_create)
+    # Create the generation steps and images, the way a full import does
+    await import_cursor_content(db=db, cursor=cursor, cursor_data=cursor_data)
 
+    await invalidate_gallery(db=db)
     return cursor
+
+
+@router.get("/imports", response_class=FastJSONResponse)
+async def list_import_runs(
+    before: Optional[int] = None,
+    limit: int = Query(default=50, ge=1, le=500),
+    db: Session = Depends(deps.get_db),
+    _: models.User = Depends(deps.get_current_active_user),
+) -> FastJSONResponse:
+    """
+    List import runs, newest first, with keyset pagination.
+
+    Args:
+        before (int | None): Return runs older than this run id (the previous `next`).
+        limit (int): The maximum number of runs to return.
+        db (Session): database session.
+        _ (models.User): Current active user.
+
+    Returns:
+        FastJSONResponse: The import runs and the `next` keyset token.
+    """
+    runs = await crud.import_run.get_recent(db=db, before=before, limit=limit)
+    return FastJSONResponse(
+        {
+            "items": [serialize_import_run(run) for run in runs],
+            "next": runs[-1].id if len(runs) == limit else None,
+        }
+    )
+
+
+@router.post("/import", response_class=FastJSONResponse)
+async def import_cursors(
+    cursor_id: Optional[str] = None,
+    db: Session = Depends(deps.get_db),
+    _: models.User = Depends(deps.get_current_active_user),
+) -> FastJSONResponse:
+    """
+    Import from Civitai, following the cursor chain, and record the import run.
+
+    Args:
+        cursor_id (str | None): The cursor to start from, or None for the latest page.
+        db (Session): database session.
+        _ (models.User): Current active user.
+
+    Returns:
+        FastJSONResponse: The finished import run.
+    """
+    try:
+        run = await run_import(db=db, trigger=models.ImportTrigger.API, cursor_id=cursor_id)
+        content = serialize_import_run(run)
+    finally:
+        await invalidate_gallery(db=db)
+    return FastJSONResponse(content)
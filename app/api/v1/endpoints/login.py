@@ -10,6 +10,7 @@ from sqlmodel import Session
 from app import crud, models, settings
 from app.api import deps
 from app.core import notify, security
+from app.core.executor import run_blocking
 
 router = APIRouter()
 
@@ -147,12 +148,11 @@ async def reset_password(
     if not crud.user.is_active(user):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Inactive user")
 
-    # Update the password
-    user.hashed_password = security.get_password_hash(new_password)
-
-    # Save the user
-    db.add(user)
-    db.commit()
+    # Update the password, through crud so the cached snapshot of the user is dropped
+    hashed_password = await run_blocking(security.get_password_hash, new_password)
+    await crud.user.update(
+        db, id=user.id, obj_in=models.UserUpdate(hashed_password=hashed_password)
+    )
 
     return {"msg": "Password updated successfully"}
 
@@ -5,6 +5,7 @@ from sqlmodel import Session
 from app import crud, models, settings
 from app.api import deps
 from app.core import notify, security
+from app.core.executor import run_blocking
 
 router = APIRouter()
 
@@ -181,7 +182,7 @@ async def update_user_me(
     """
     user_in = models.UserUpdate(**current_user.dict())
     if password is not None:
-        user_in.hashed_password = security.get_password_hash(password=password)
+        user_in.hashed_password = await run_blocking(security.get_password_hash, password=password)
     if full_name is not None:
         user_in.full_name = full_name
     if email is not None:
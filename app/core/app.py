@@ -1,5 +1,4 @@
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
 from fastapi_utils.tasks import repeat_every
 from sqlmodel import Session
 
@@ -7,9 +6,17 @@ from app import logger, settings, version
 from app.api import deps
 from app.api.v1.api import api_router
 from app.core import notify
+from app.core.compression import CompressionMiddleware
+from app.core.executor import blocking_executor
+from app.core.metrics import MetricsMiddleware
+from app.core.profiling import ProfilingMiddleware
+from app.core.query_stats import QueryStatsMiddleware
+from app.core.static import PrecompressedStaticFiles
 from app.db.init_db import init_initial_data
-from app.paths import STATIC_PATH
+from app.paths import STATIC_BUILD_PATH, STATIC_PATH
+from app.views import templates
 from app.views.router import views_router
+from app.views.templates import precompile_templates
 
 # Initialize FastAPI App
 app = FastAPI(
@@ -22,7 +29,28 @@ app.include_router(api_router, prefix=settings.API_V1_PREFIX)
 app.include_router(views_router)
 
 # STATIC_PATH.mkdir(parents=True, exist_ok=True)
-app.mount("/static", StaticFiles(directory=STATIC_PATH))
+app.mount(
+    "/static",
+    PrecompressedStaticFiles(directory=STATIC_PATH, build_directory=STATIC_BUILD_PATH),
+)
+
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MINIMUM_SIZE)
+app.add_middleware(
+    QueryStatsMiddleware,
+    warning_threshold=settings.QUERY_WARNING_THRESHOLD,
+    repeat_threshold=settings.QUERY_REPEAT_THRESHOLD,
+    server_timing=settings.SERVER_TIMING_ENABLED,
+)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+if settings.PROFILING_ENABLED or settings.PROFILING_SAMPLE_RATE > 0:
+    app.add_middleware(
+        ProfilingMiddleware,
+        on_demand=settings.PROFILING_ENABLED,
+        sample_rate=settings.PROFILING_SAMPLE_RATE,
+        max_files=settings.PROFILING_MAX_FILES,
+    )
 
 
 @app.on_event("startup")  # type: ignore
@@ -38,10 +66,25 @@ async def on_startup(db: Session = next(deps.get_db())) -> None:
     logger.debug("Starting FastAPI App...")
     await init_initial_data(db=db)
 
+    if settings.JINJA_PRECOMPILE_ON_STARTUP:
+        compiled = precompile_templates(templates)
+        logger.debug(f"Precompiled {compiled} templates")
+
     if settings.NOTIFY_ON_START:
         await notify.notify(text=f"{settings.PROJECT_NAME}('{settings.ENV_NAME}') started.")
 
 
+@app.on_event("shutdown")  # type: ignore
+async def on_shutdown() -> None:
+    """
+    Event handler that gets called when the application stops.
+    Waits for blocking work (e.g. emails being sent) to finish, and for queued log messages
+    to be written.
+    """
+    blocking_executor.shutdown()
+    await logger.complete()
+
+
 @app.on_event("startup")  # type: ignore
 @repeat_every(seconds=120, wait_first=False)
 async def repeating_task() -> None:
@@ -1,14 +1,137 @@
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
+
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
 
 import httpx
 from fastapi import HTTPException
 from sqlmodel import Session
 
 from app import crud
+from app.core import metrics
+
+BASE_URL = "https://civitai.com/api/trpc/orchestrator.queryGeneratedImages"
+
+
+@dataclass
+class ImportStats:
+    """What an import did, and where its time went."""
+
+    pages_fetched: int = 0
+    cursors_imported: int = 0
+    images_inserted: int = 0
+    images_skipped: int = 0
+    bytes_downloaded: int = 0
+    fetch_seconds: float = 0.0
+    parse_seconds: float = 0.0
+    db_seconds: float = 0.0
+    relink_seconds: float = 0.0
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Add the duration of a block to a stage.
+
+        Args:
+            name (str): The stage: `fetch`, `parse`, `db` or `relink`.
+
+        Yields:
+            None
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = f"{name}_seconds"
+            setattr(self, seconds, getattr(self, seconds) + time.perf_counter() - start)
+
+
+def _to_int(value: Any) -> Optional[int]:
+    """Convert a loosely typed payload value to int, returning None when it is not numeric."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_step(item: dict[str, Any], step: dict[str, Any]) -> dict[str, Any]:
+    """
+    Extract the generation parameters of a workflow step.
+
+    Args:
+        item (dict[str, Any]): The workflow item the step belongs to.
+        step (dict[str, Any]): The step payload.
+
+    Returns:
+        dict[str, Any]: The step parameters, keyed like `models.GenerationStepCreate`.
+    """
+    params = step.get("params") or {}
+    resources = step.get("resources") or []
+    cfg_scale = params.get("cfgScale")
+    step_data = {
+        "id": f"{item['id']}-{step.get('name', 0)}",
+        "workflow_id": item["id"],
+        "prompt": params.get("prompt"),
+        "negative_prompt": params.get("negativePrompt"),
+        "base_model": params.get("baseModel"),
+        "model_id": _to_int(resources[0].get("id")) if resources else None,
+        "sampler": params.get("sampler"),
+        "seed": _to_int(params.get("seed")),
+        "steps": _to_int(params.get("steps")),
+        "cfg_scale": float(cfg_scale) if cfg_scale is not None else None,
+    }
+    if item.get("createdAt"):
+        step_data["created_at"] = item["createdAt"]
+    return step_data
+
+
+def get_client(**kwargs: Any) -> httpx.AsyncClient:
+    """
+    Create an HTTP client for the Civitai API.
+
+    Reusing one client across the pages of an import keeps the connection alive, instead
+    of a new TLS handshake per page.
 
+    Args:
+        kwargs (Any): Extra `httpx.AsyncClient` arguments, e.g. a `transport` to serve
+            the API locally in tests and benchmarks.
+
+    Returns:
+        httpx.AsyncClient: The client.
+    """
+    return httpx.AsyncClient(**kwargs)
+
+
+async def fetch_cursor_data(
+    cursor: Optional[str],
+    db: Session,
+    client: Optional[httpx.AsyncClient] = None,
+    stats: Optional[ImportStats] = None,
+) -> dict[str, Any]:
+    """
+    Fetch images for a given cursor and return the JSON response
+
+    Args:
+        cursor (str | None): The cursor to fetch, or None for the latest page.
+        db (Session): The database session.
+        client (httpx.AsyncClient | None): The client to fetch with, from `get_client`.
+            A client is created for this call if None.
+        stats (ImportStats | None): Add the fetch and parse times and the downloaded bytes
+            to these import stats.
+
+    Returns:
+        dict[str, Any]: The next cursor, and the steps and images of the page.
+
+    Raises:
+        HTTPException: If the cookie is not configured, or the request fails.
+    """
+    if client is None:
+        async with get_client() as client:
+            return await fetch_cursor_data(cursor=cursor, db=db, client=client, stats=stats)
+    if stats is None:
+        stats = ImportStats()
 
-async def fetch_cursor_data(cursor: Optional[str], db: Session) -> dict[str, Any]:
-    """Fetch images for a given cursor and return the JSON response"""
     settings = await crud.settings.get_current(db)
 
     if not settings or not settings.cookie_string:
@@ -16,13 +139,12 @@ async def fetch_cursor_data(cursor: Optional[str], db: Session) -> dict[str, Any
             status_code=400, detail="Civitai cookie not configured. Please set it in Settings."
         )
 
-    base_url = "https://civitai.com/api/trpc/orchestrator.queryGeneratedImages"
     cursor_param = cursor if cursor else "null"  # Use "null" for latest
     params = (
         "?input=%7B%22json%22%3A%7B%22tags%22%3A%5B%22gen%22%5D%2C%22cursor%22%3A%22"
         f"{cursor_param}%22%2C%22authed%22%3Atrue%7D%7D"
     )
-    url = base_url + params
+    url = BASE_URL + params
 
     headers = {
         "Host": "civitai.com",
@@ -34,36 +156,69 @@ async def fetch_cursor_data(cursor: Optional[str], db: Session) -> dict[str, Any
     }
 
     try:
-        async with httpx.AsyncClient() as client:
+        start = time.perf_counter()
+        try:
             response = await client.get(url, headers=headers)
-            response.raise_for_status()
-            data = response.json()
+        except httpx.HTTPError:
+            metrics.CIVIT_FETCH_SECONDS.observe(time.perf_counter() - start, status="error")
+            raise
+        elapsed = time.perf_counter() - start
+        stats.fetch_seconds += elapsed
+        metrics.CIVIT_FETCH_SECONDS.observe(elapsed, status=response.status_code)
+        response.raise_for_status()
+        stats.pages_fetched += 1
+        stats.bytes_downloaded += len(response.content)
 
-            if "error" in data:
-                raise HTTPException(
-                    status_code=response.status_code, detail=f"Civitai API error: {data['error']}"
-                )
+        with stats.stage("parse"):
+            return _parse_response(response, cursor)
 
-            if "result" not in data or "data" not in data["result"]:
-                raise HTTPException(
-                    status_code=500, detail="Invalid response format from Civitai API"
-                )
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching cursor data: {str(e)}")
 
-            # Extract relevant data
-            result = {"next_cursor": data["result"]["data"]["json"].get("nextCursor"), "images": []}
 
-            # Process each item's images
-            for item in data["result"]["data"]["json"]["items"]:
-                for step in item["steps"]:
-                    for image in step["images"]:
-                        result["images"].append(image)
+def _parse_response(response: httpx.Response, cursor: Optional[str]) -> dict[str, Any]:
+    """
+    Extract the steps and images of a `queryGeneratedImages` response.
 
-            # Extract the current cursor ID from the first item if we requested latest
-            if not cursor and data["result"]["data"]["json"]["items"]:
-                current_cursor_id = data["result"]["data"]["json"]["items"][0]["id"]
-                result["current_cursor_id"] = current_cursor_id
+    Args:
+        response (httpx.Response): The response.
+        cursor (str | None): The requested cursor, or None for the latest page.
 
-            return result
+    Returns:
+        dict[str, Any]: The next cursor, and the steps and images of the page.
 
-    except httpx.HTTPError as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching cursor data: {str(e)}")
+    Raises:
+        HTTPException: If the response is an API error, or has an unexpected format.
+    """
+    data = response.json()
+
+    if "error" in data:
+        raise HTTPException(
+            status_code=response.status_code, detail=f"Civitai API error: {data['error']}"
+        )
+
+    if "result" not in data or "data" not in data["result"]:
+        raise HTTPException(status_code=500, detail="Invalid response format from Civitai API")
+
+    # Extract relevant data
+    result = {
+        "next_cursor": data["result"]["data"]["json"].get("nextCursor"),
+        "steps": [],
+        "images": [],
+    }
+
+    # Process each item's steps and their images
+    for item in data["result"]["data"]["json"]["items"]:
+        for step in item["steps"]:
+            step_data = parse_step(item, step)
+            result["steps"].append(step_data)
+            for image in step["images"]:
+                image["step_id"] = step_data["id"]
+                result["images"].append(image)
+
+    # Extract the current cursor ID from the first item if we requested latest
+    if not cursor and data["result"]["data"]["json"]["items"]:
+        current_cursor_id = data["result"]["data"]["json"]["items"][0]["id"]
+        result["current_cursor_id"] = current_cursor_id
+
+    return result
@@ -1,8 +1,11 @@
+import asyncio
+
 import typer
 from rich.console import Console
 
-from app import logger, settings, version
+from app import logger, paths, settings, version
 from app.core.server import start_server
+from app.core.static import build_static
 
 # from app.core.app import app
 
@@ -33,6 +36,48 @@ def version_callback(print_version: bool) -> None:
         raise typer.Exit()
 
 
+def build_static_callback(build: bool) -> None:
+    """
+    Build the hashed and precompressed static assets.
+
+    Args:
+        build: bool : If true, build the static assets and exit.
+
+    Raises:
+        Exit: Exit the application.
+    """
+    if build:
+        manifest = build_static(source=paths.STATIC_PATH, destination=paths.STATIC_BUILD_PATH)
+        console.print(
+            f"Built [bold blue]{len(manifest)}[/] static assets in '{paths.STATIC_BUILD_PATH}'"
+        )
+        raise typer.Exit()
+
+
+def archive_callback(archive: bool) -> None:
+    """
+    Move the cursors older than `ARCHIVE_AFTER_DAYS` into the archive files.
+
+    Args:
+        archive: bool : If true, archive the old cursors and exit.
+
+    Raises:
+        Exit: Exit the application.
+    """
+    if archive:
+        # Imported here, so the other commands do not open the database
+        from app.db.session import SessionLocal
+        from app.services.archive import archive_cursors
+
+        with SessionLocal() as db:
+            result = asyncio.run(archive_cursors(db=db))
+        console.print(
+            f"Archived [bold blue]{result.cursors}[/] cursors and "
+            f"[bold blue]{result.images}[/] images in '{paths.ARCHIVE_PATH}'"
+        )
+        raise typer.Exit()
+
+
 # Typer Commands
 @typer_app.command()
 def main(
@@ -44,6 +89,20 @@ def main(
         is_eager=True,
         help="Prints the version of the '{APP_NAME}' package.",
     ),
+    build_static_assets: bool = typer.Option(  # pylint: disable=unused-argument
+        None,
+        "--build-static",
+        callback=build_static_callback,
+        is_eager=True,
+        help="Builds the hashed and precompressed static assets, then exits.",
+    ),
+    archive: bool = typer.Option(  # pylint: disable=unused-argument
+        None,
+        "--archive",
+        callback=archive_callback,
+        is_eager=True,
+        help="Moves the cursors older than ARCHIVE_AFTER_DAYS into the archive files, then exits.",
+    ),
 ) -> None:
     """
     Main entrypoint into application
@@ -51,6 +110,8 @@ def main(
 
     Args:
         print_version: bool : If true, print version of the package and exit.
+        build_static_assets: bool : If true, build the static assets and exit.
+        archive: bool : If true, archive the old cursors and exit.
     """
 
     # Start Uvicorn
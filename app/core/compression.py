@@ -0,0 +1,165 @@
+from typing import Any, Callable, Optional
+
+import gzip
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is an optional dependency
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/manifest+json",
+    "image/svg+xml",
+)
+
+
+def is_compressible(content_type: str) -> bool:
+    """
+    Check if a content type is worth compressing (text formats, not images or video).
+
+    Args:
+        content_type (str): The `Content-Type` header value.
+
+    Returns:
+        bool: True if the content type is compressible.
+    """
+    return content_type.split(";")[0].strip().lower().startswith(COMPRESSIBLE_TYPES)
+
+
+def accepted_encodings(
+    accept_encoding: str, available: Optional[tuple[str, ...]] = None
+) -> list[str]:
+    """
+    Get the content codings that a client accepts, in the server's order of preference.
+
+    Args:
+        accept_encoding (str): The `Accept-Encoding` request header value.
+        available (tuple[str, ...] | None): The codings on offer, most preferred first.
+            Defaults to the codings this process can produce: `br` if brotli is installed,
+            then `gzip`.
+
+    Returns:
+        list[str]: The accepted codings.
+    """
+    accepted = set()
+    for coding in accept_encoding.lower().split(","):
+        name, _, params = coding.partition(";")
+        quality = params.strip().removeprefix("q=")
+        try:
+            if quality and float(quality) <= 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(name.strip())
+
+    if available is None:
+        available = ("br", "gzip") if brotli is not None else ("gzip",)
+    if "*" in accepted:
+        return list(available)
+    return [coding for coding in available if coding in accepted]
+
+
+def compress(body: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """
+    Compress a body with the given content coding.
+
+    Args:
+        body (bytes): The body to compress.
+        encoding (str): `br` or `gzip`.
+        level (int | None): The compression level, or None for the format default used for
+            dynamic responses.
+
+    Returns:
+        bytes: The compressed body.
+    """
+    if encoding == "br":
+        return brotli.compress(body, quality=4 if level is None else level)
+    return gzip.compress(body, compresslevel=6 if level is None else level, mtime=0)
+
+
+class CompressionMiddleware:
+    """
+    Compress text responses with brotli (if installed) or gzip, based on `Accept-Encoding`.
+
+    Only complete responses are compressed: streaming responses (image proxy, static files)
+    are passed through untouched, as are responses that are already encoded, too small to
+    benefit, or not a text format.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 500) -> None:
+        """
+        Initialize the middleware.
+
+        Args:
+            app (ASGIApp): The wrapped application.
+            minimum_size (int): Bodies smaller than this many bytes are sent uncompressed.
+        """
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encodings = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        if not encodings:
+            await self.app(scope, receive, send)
+            return
+
+        await self.app(scope, receive, self._wrap_send(send, encodings[0]))
+
+    def _wrap_send(self, send: Send, encoding: str) -> Callable[[Message], Any]:
+        """
+        Wrap the ASGI `send` callable so the response body is compressed on its way out.
+
+        Args:
+            send (Send): The ASGI send callable.
+            encoding (str): The content coding to use.
+
+        Returns:
+            Callable[[Message], Any]: The wrapped send callable.
+        """
+        start_message: Optional[Message] = None
+        passthrough = False
+
+        async def wrapped_send(message: Message) -> None:
+            nonlocal start_message, passthrough
+
+            if passthrough or message["type"] not in ("http.response.start", "http.response.body"):
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+
+            assert start_message is not None  # nosec B101
+            headers = MutableHeaders(raw=start_message["headers"])
+            body: bytes = message.get("body", b"")
+            if (
+                message.get("more_body", False)
+                or "content-encoding" in headers
+                or len(body) < self.minimum_size
+                or not is_compressible(headers.get("content-type", ""))
+            ):
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            compressed = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed})
+
+        return wrapped_send
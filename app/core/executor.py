@@ -0,0 +1,159 @@
+from typing import Any, Callable, Optional, TypeVar
+
+import asyncio
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+from app import logger, settings
+from app.core import metrics
+
+T = TypeVar("T")
+
+
+class BlockingExecutor:
+    """
+    A dedicated thread pool for blocking work (bcrypt hashing, SMTP) called from async code.
+
+    Running such calls directly in a handler blocks the event loop, and with it every other
+    request, for as long as the call takes. Keeping them off the default executor also means
+    a burst of logins cannot starve Starlette's own thread pool of workers.
+
+    The pool tracks how many calls are waiting for a worker, so a pool that is too small
+    for the load shows up in the logs and metrics.
+    """
+
+    def __init__(self, max_workers: int, queue_warning: int = 0) -> None:
+        """
+        Initialize the executor. Threads are only started on first use.
+
+        Args:
+            max_workers (int): The number of worker threads.
+            queue_warning (int): Log a warning when more calls than this are waiting for a
+                worker. 0 disables the warning.
+        """
+        self.max_workers = max_workers
+        self.queue_warning = queue_warning
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.max_queued = 0
+        self.wait_seconds = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="blocking"
+                )
+            return self._executor
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run a blocking function in the pool and wait for its result.
+
+        Args:
+            func (Callable[..., T]): The blocking function.
+            args (Any): Positional arguments for the function.
+            kwargs (Any): Keyword arguments for the function.
+
+        Returns:
+            T: The function result.
+        """
+        submitted_at = time.perf_counter()
+        with self._lock:
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+            queued = self.queued
+        if self.queue_warning and queued > self.queue_warning:
+            logger.warning(
+                f"Blocking executor queue depth is {queued} "
+                f"({self.max_workers} workers), calling {getattr(func, '__name__', func)}"
+            )
+
+        def call() -> T:
+            with self._lock:
+                self.queued -= 1
+                self.running += 1
+                self.wait_seconds += time.perf_counter() - submitted_at
+            try:
+                return func(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self.completed += 1
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), functools.partial(call))
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Get the executor metrics.
+
+        Returns:
+            dict[str, Any]: The pool size, the calls waiting for a worker and running now,
+                the queue depth high-water mark, and the completed calls with their total
+                time spent waiting for a worker.
+        """
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "queued": self.queued,
+                "running": self.running,
+                "max_queued": self.max_queued,
+                "completed": self.completed,
+                "wait_seconds": self.wait_seconds,
+            }
+
+    def shutdown(self) -> None:
+        """Stop the worker threads, waiting for running calls to finish."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+blocking_executor = BlockingExecutor(
+    max_workers=settings.BLOCKING_EXECUTOR_WORKERS,
+    queue_warning=settings.BLOCKING_EXECUTOR_QUEUE_WARNING,
+)
+
+metrics.REGISTRY.register(
+    metrics.Gauge(
+        "blocking_executor_queued",
+        "Blocking calls waiting for an executor worker",
+        lambda: blocking_executor.queued,
+    )
+)
+metrics.REGISTRY.register(
+    metrics.Gauge(
+        "blocking_executor_running",
+        "Blocking calls running in the executor",
+        lambda: blocking_executor.running,
+    )
+)
+metrics.REGISTRY.register(
+    metrics.Gauge(
+        "blocking_executor_wait_seconds",
+        "Total time blocking calls spent waiting for an executor worker",
+        lambda: blocking_executor.wait_seconds,
+    )
+)
+
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking function in the blocking executor, without blocking the event loop.
+
+    Args:
+        func (Callable[..., T]): The blocking function.
+        args (Any): Positional arguments for the function.
+        kwargs (Any): Keyword arguments for the function.
+
+    Returns:
+        T: The function result.
+    """
+    return await blocking_executor.run(func, *args, **kwargs)
@@ -0,0 +1,355 @@
+from typing import Any, Callable, Iterator
+
+import math
+import time
+from contextlib import contextmanager
+from threading import Lock
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class Metric:
+    """
+    Base class of a metric family, rendered in the Prometheus text exposition format.
+    """
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        """
+        Initialize the metric.
+
+        Args:
+            name (str): The metric name.
+            documentation (str): The metric help text.
+            labelnames (tuple[str, ...]): The label names every sample must be given.
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = Lock()
+
+    def _key(self, labels: dict[str, Any]) -> tuple[str, ...]:
+        if len(labels) != len(self.labelnames) or set(labels) != set(self.labelnames):
+            raise ValueError(f"Metric {self.name} expects labels {self.labelnames}, got {labels}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _format_labels(self, key: tuple[str, ...], extra: tuple[tuple[str, str], ...] = ()) -> str:
+        pairs = list(zip(self.labelnames, key)) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def samples(self) -> list[str]:
+        """
+        Get the sample lines of the metric.
+
+        Returns:
+            list[str]: The sample lines.
+        """
+        raise NotImplementedError  # pragma: no cover
+
+    def render(self) -> list[str]:
+        """
+        Render the metric family.
+
+        Returns:
+            list[str]: The HELP and TYPE lines, followed by the sample lines.
+        """
+        return [
+            f"# HELP {self.name} {_escape(self.documentation)}",
+            f"# TYPE {self.name} {self.type_name}",
+            *self.samples(),
+        ]
+
+
+class Counter(Metric):
+    """A monotonically increasing value, e.g. a number of requests."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        """
+        Increment the counter.
+
+        Args:
+            amount (float): The amount to add.
+            labels (Any): The label values.
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        """
+        Get the current value of the counter.
+
+        Args:
+            labels (Any): The label values.
+
+        Returns:
+            float: The current value.
+        """
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{self._format_labels(key)} {_format_value(v)}" for key, v in values]
+
+
+class Gauge(Metric):
+    """A value read when the metrics are collected, e.g. a queue depth."""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, function: Callable[[], float]) -> None:
+        """
+        Initialize the gauge.
+
+        Args:
+            name (str): The metric name.
+            documentation (str): The metric help text.
+            function (Callable[[], float]): Returns the current value.
+        """
+        super().__init__(name, documentation)
+        self.function = function
+
+    def samples(self) -> list[str]:
+        return [f"{self.name} {_format_value(self.function())}"]
+
+
+class Histogram(Metric):
+    """The distribution of observed values, e.g. latencies, in cumulative buckets."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        """
+        Initialize the histogram.
+
+        Args:
+            name (str): The metric name.
+            documentation (str): The metric help text.
+            labelnames (tuple[str, ...]): The label names every observation must be given.
+            buckets (tuple[float, ...]): The bucket upper bounds, in increasing order.
+        """
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._values: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        """
+        Observe a value.
+
+        Args:
+            value (float): The value.
+            labels (Any): The label values.
+        """
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * len(self.buckets), [0.0]))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            total[0] += value
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """
+        Observe the duration of a block, in seconds.
+
+        Args:
+            labels (Any): The label values.
+
+        Yields:
+            None
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: Any) -> int:
+        """
+        Get the number of observations.
+
+        Args:
+            labels (Any): The label values.
+
+        Returns:
+            int: The number of observations.
+        """
+        counts, _ = self._values.get(self._key(labels), ([0], [0.0]))
+        return sum(counts)
+
+    def samples(self) -> list[str]:
+        lines = []
+        with self._lock:
+            values = sorted((key, (list(c), t[0])) for key, (c, t) in self._values.items())
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                labels = self._format_labels(key, (("le", _format_value(bound)),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{self._format_labels(key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{self._format_labels(key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    """The set of metrics served by the `/metrics` route."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Any:
+        """
+        Register a metric.
+
+        Args:
+            metric (Metric): The metric.
+
+        Returns:
+            Any: The same metric.
+
+        Raises:
+            ValueError: If a metric with the same name is already registered.
+        """
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format.
+
+        Returns:
+            str: The metrics.
+        """
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# HTTP
+HTTP_REQUEST_SECONDS: Histogram = REGISTRY.register(
+    Histogram("http_request_seconds", "HTTP request latency", ("method", "handler", "status"))
+)
+HTTP_REQUEST_DB_QUERIES: Histogram = REGISTRY.register(
+    Histogram("http_request_db_queries", "DB queries per HTTP request", ("handler",), COUNT_BUCKETS)
+)
+HTTP_REQUEST_DB_SECONDS: Histogram = REGISTRY.register(
+    Histogram("http_request_db_seconds", "DB time per HTTP request", ("handler",))
+)
+
+# Database
+DB_QUERIES: Counter = REGISTRY.register(Counter("db_queries_total", "DB queries executed"))
+DB_QUERY_SECONDS: Counter = REGISTRY.register(
+    Counter("db_query_seconds_total", "Time spent executing DB queries")
+)
+DB_SLOW_QUERIES: Counter = REGISTRY.register(
+    Counter("db_slow_queries_total", "DB queries slower than the slow query threshold")
+)
+
+# Civitai & imports
+CIVIT_FETCH_SECONDS: Histogram = REGISTRY.register(
+    Histogram("civit_fetch_seconds", "Civitai API fetch latency", ("status",))
+)
+IMPORTED_CURSORS: Counter = REGISTRY.register(
+    Counter("import_cursors_total", "Cursor pages imported from Civitai")
+)
+IMPORTED_IMAGES: Counter = REGISTRY.register(
+    Counter("import_images_total", "Images imported from Civitai")
+)
+
+# Views
+TEMPLATE_RENDER_SECONDS: Histogram = REGISTRY.register(
+    Histogram("template_render_seconds", "Jinja template render time", ("template",))
+)
+PROXY_BYTES: Counter = REGISTRY.register(
+    Counter("proxy_bytes_total", "Bytes streamed through the reverse proxy")
+)
+
+# Caches
+CACHE_REQUESTS: Counter = REGISTRY.register(
+    Counter("cache_requests_total", "In-memory cache lookups", ("cache", "result"))
+)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """
+    Count a cache lookup, for the cache hit ratio.
+
+    Args:
+        cache (str): The cache name.
+        hit (bool): Whether the lookup was a hit.
+    """
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+class MetricsMiddleware:
+    """
+    Record the latency of every HTTP request, by handler.
+
+    The DB query count and DB time of each request are recorded by
+    `app.core.query_stats.QueryStatsMiddleware`.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def wrapped_send(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, wrapped_send)
+        finally:
+            elapsed = time.perf_counter() - start
+            endpoint = scope.get("endpoint")
+            handler = getattr(endpoint, "__name__", "other")
+            HTTP_REQUEST_SECONDS.observe(
+                elapsed, method=scope["method"], handler=handler, status=status_code
+            )
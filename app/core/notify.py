@@ -2,20 +2,11 @@ from typing import Any
 
 from pathlib import Path
 
-import emails
-from emails.template import JinjaTemplate  # type: ignore
-from loguru import logger as _logger
-from telegram import Bot
-from telegram.error import BadRequest
+from app import logger, paths, settings
+from app.core.executor import run_blocking
 
-from app import paths
-from app.models.settings import Settings as _Settings
-
-settings = _Settings()
-
-# Main Logger
-logger = _logger.bind(name="logger")
-logger.add(paths.LOG_FILE, level=settings.LOG_LEVEL, rotation="10 MB")
+# The Telegram and email clients are imported when a message is sent, as importing them
+# costs more than the rest of the notification code, and both are usually disabled.
 
 
 async def notify(
@@ -37,7 +28,8 @@ async def notify(
     if telegram and settings.NOTIFY_TELEGRAM_ENABLED:
         response["telegram"] = await send_telegram_message(text=text)
     if email and settings.NOTIFY_EMAIL_ENABLED:
-        response["email"] = send_email(
+        response["email"] = await run_blocking(
+            send_email,
             email_to=settings.NOTIFY_EMAIL_TO,
             subject_template="Server Notification",
             html_template=text,
@@ -63,6 +55,9 @@ async def send_telegram_message(text: str) -> Any:
         logger.warning("TELEGRAM_API_TOKEN or TELEGRAM_CHAT_ID config variables are not set.")
         return None
 
+    from telegram import Bot
+    from telegram.error import BadRequest
+
     bot = Bot(token=settings.TELEGRAM_API_TOKEN)
 
     try:
@@ -100,6 +95,9 @@ def send_email(
     if not settings.EMAILS_ENABLED or email_to is None:
         raise ValueError("Emails are not enabled or email_to is None")
 
+    import emails
+    from emails.template import JinjaTemplate  # type: ignore
+
     # Build the email
     message = emails.Message(  # type: ignore
         subject=JinjaTemplate(subject_template),
@@ -138,8 +136,9 @@ def send_test_email(email_to: str) -> None:
     )
 
 
-def send_reset_password_email(email_to: str, username: str, token: str) -> None:
-    send_email(
+async def send_reset_password_email(email_to: str, username: str, token: str) -> None:
+    await run_blocking(
+        send_email,
         email_to=email_to,
         subject_template=f"{settings.PROJECT_NAME} - Password recovery for user {username}",
         html_template=get_html_template(
@@ -155,8 +154,9 @@ def send_reset_password_email(email_to: str, username: str, token: str) -> None:
     )
 
 
-def send_new_account_email(email_to: str, username: str, password: str) -> None:
-    send_email(
+async def send_new_account_email(email_to: str, username: str, password: str) -> None:
+    await run_blocking(
+        send_email,
         email_to=email_to,
         subject_template=f"{settings.PROJECT_NAME} - New account for user {username}",
         html_template=get_html_template(template=paths.EMAIL_TEMPLATES_PATH / "new_account.mjml"),
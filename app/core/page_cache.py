@@ -0,0 +1,195 @@
+from typing import Any
+
+import hashlib
+from collections import OrderedDict
+from threading import Lock
+
+from fastapi.requests import Request
+from fastapi.responses import HTMLResponse, Response
+from sqlmodel import Session
+
+from app import crud, settings
+from app.core import metrics
+from app.crud.data_version import GALLERY
+
+CACHE_CONTROL = "private, no-cache"
+CACHED_HEADERS = ("link",)
+
+
+class PageCache:
+    """
+    A small in-memory LRU cache of rendered pages, keyed by ETag.
+
+    ETags embed the data version the page was rendered from, so a bump of that version
+    makes every older entry unreachable; `clear` only frees the memory early.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize (int): The maximum number of pages to keep.
+        """
+        self.maxsize = maxsize
+        self._pages: OrderedDict[str, tuple[bytes, dict[str, str]]] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, etag: str) -> tuple[bytes, dict[str, str]] | None:
+        """
+        Get a rendered page.
+
+        Args:
+            etag (str): The page ETag.
+
+        Returns:
+            tuple[bytes, dict[str, str]] | None: The page body and the extra headers it was
+                served with, or None on a miss.
+        """
+        with self._lock:
+            page = self._pages.get(etag)
+            if page is not None:
+                self._pages.move_to_end(etag)
+        metrics.record_cache("page", hit=page is not None)
+        return page
+
+    def set(self, etag: str, body: bytes, headers: dict[str, str] | None = None) -> None:
+        """
+        Store a rendered page, evicting the least recently used page if full.
+
+        Args:
+            etag (str): The page ETag.
+            body (bytes): The page body.
+            headers (dict[str, str] | None): Extra headers to serve the page with.
+        """
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._pages[etag] = (body, headers or {})
+            self._pages.move_to_end(etag)
+            while len(self._pages) > self.maxsize:
+                self._pages.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every cached page."""
+        with self._lock:
+            self._pages.clear()
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+
+page_cache = PageCache(maxsize=settings.PAGE_CACHE_SIZE)
+
+
+async def invalidate_gallery(db: Session) -> int:
+    """
+    Mark the gallery data as changed after an import or repair.
+
+    Cursor pages show page numbers and neighbours, which shift whenever a cursor is
+    inserted anywhere in the chain, so the whole gallery is invalidated at once.
+
+    Args:
+        db (Session): The database session.
+
+    Returns:
+        int: The new gallery data version.
+    """
+    version = await crud.data_version.bump(db=db, key=GALLERY)
+    page_cache.clear()
+    return version
+
+
+def compute_etag(*parts: Any) -> str:
+    """
+    Compute a weak ETag from the values a rendered page depends on.
+
+    Args:
+        parts (Any): The values the page depends on.
+
+    Returns:
+        str: The ETag.
+    """
+    digest = hashlib.sha1(  # nosec B324 - not used for security
+        "\x1f".join(str(part) for part in parts).encode()
+    ).hexdigest()
+    return f'W/"{digest[:20]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Check an `If-None-Match` request header against an ETag.
+
+    Args:
+        request (Request): The request.
+        etag (str): The current ETag of the page.
+
+    Returns:
+        bool: True if the client already has this version of the page.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: ignore the W/ prefix on either side
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+class ConditionalPage:
+    """
+    Conditional GET handling for a rendered page.
+
+    Usage in a view::
+
+        if page.response:
+            return page.response
+        ...
+        return page.store(templates.TemplateResponse(...))
+    """
+
+    def __init__(self, request: Request, etag: str | None) -> None:
+        """
+        Resolve the short-circuit response for a request, if any.
+
+        Args:
+            request (Request): The request.
+            etag (str | None): The page ETag, or None if the page must not be cached.
+        """
+        self.etag = etag
+        self.response: Response | None = None
+        if etag is None:
+            return
+
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        if etag_matches(request, etag):
+            self.response = Response(status_code=304, headers=headers)
+            return
+
+        if settings.PAGE_CACHE_ENABLED:
+            page = page_cache.get(etag)
+            if page is not None:
+                body, extra_headers = page
+                self.response = HTMLResponse(content=body, headers={**extra_headers, **headers})
+
+    def store(self, response: Response) -> Response:
+        """
+        Tag a freshly rendered page with its ETag and keep it in the page cache.
+
+        Args:
+            response (Response): The rendered page.
+
+        Returns:
+            Response: The same response, with caching headers.
+        """
+        if self.etag is None or response.status_code != 200:
+            return response
+        response.headers["ETag"] = self.etag
+        response.headers["Cache-Control"] = CACHE_CONTROL
+        if settings.PAGE_CACHE_ENABLED:
+            extra_headers = {
+                key: value for key, value in response.headers.items() if key in CACHED_HEADERS
+            }
+            page_cache.set(self.etag, response.body, extra_headers)
+        return response
@@ -0,0 +1,61 @@
+from typing import Any
+
+from fastapi.requests import Request
+
+from app import logger
+
+EARLY_HINTS_EXTENSION = "http.response.early_hint"
+
+
+def build_preload_links(image_urls: list[str], page_urls: list[str] | None = None) -> list[str]:
+    """
+    Build `Link` header values that let the browser fetch upcoming images early.
+
+    Videos are skipped, as browsers do not honour `rel=preload` for them.
+
+    Args:
+        image_urls (list[str]): Image URLs to preload, most likely to be needed first.
+        page_urls (list[str] | None): Page URLs to prefetch (e.g. the next/previous image view).
+
+    Returns:
+        list[str]: The `Link` header values.
+    """
+    links = [f"<{url}>; rel=preload; as=image" for url in image_urls if not url.endswith(".mp4")]
+    links.extend(f"<{url}>; rel=prefetch" for url in page_urls or [])
+    return links
+
+
+async def send_early_hints(request: Request, links: list[str]) -> bool:
+    """
+    Send a `103 Early Hints` informational response, if the ASGI server supports it.
+
+    Servers advertise support through the `http.response.early_hint` scope extension.
+    On servers without it (e.g. uvicorn) this is a no-op and the `Link` header on the
+    final response is the only hint.
+
+    Args:
+        request (Request): The current request.
+        links (list[str]): The `Link` header values to send.
+
+    Returns:
+        bool: True if the early hints were sent.
+    """
+    extensions: dict[str, Any] = request.scope.get("extensions") or {}
+    if not links or EARLY_HINTS_EXTENSION not in extensions:
+        return False
+
+    send = getattr(request, "_send", None)
+    if send is None:  # pragma: no cover
+        return False
+
+    try:
+        await send(
+            {
+                "type": EARLY_HINTS_EXTENSION,
+                "links": [link.encode("latin-1") for link in links],
+            }
+        )
+    except Exception as e:  # pylint: disable=broad-except
+        logger.warning(f"Could not send early hints: {e}")
+        return False
+    return True
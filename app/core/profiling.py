@@ -0,0 +1,337 @@
+from typing import Any, Optional
+
+import cProfile
+import html
+import io
+import itertools
+import pstats
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+from threading import Lock
+from urllib.parse import parse_qs
+
+from fastapi import HTTPException
+from starlette.datastructures import Headers
+from starlette.requests import cookie_parser
+from starlette.responses import HTMLResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app import crud, logger
+from app.core import auth_cache
+from app.core.executor import blocking_executor
+from app.paths import PROFILES_PATH
+from app.views.deps import get_db
+
+try:
+    from pyinstrument import Profiler as SamplingProfiler
+except ImportError:  # pragma: no cover - pyinstrument is an optional dependency
+    SamplingProfiler = None
+
+PROFILE_PARAMETER = "profile"
+PROFILE_HEADER = "x-profile"
+
+# Python profilers hook the interpreter, so only one request is profiled at a time
+_active = Lock()
+
+
+class RequestProfiler:
+    """
+    Profile one request and render the result as HTML.
+
+    Uses pyinstrument's sampling profiler (flame graph / call tree) when it is installed,
+    and falls back to cProfile's function table otherwise. Only code running in the event
+    loop thread is profiled, not sync dependencies and endpoints run in the thread pool.
+    """
+
+    def __init__(self, title: str, interval: float = 0.001) -> None:
+        """
+        Initialize the profiler.
+
+        Args:
+            title (str): The title of the profile, e.g. the request method and path.
+            interval (float): The pyinstrument sampling interval, in seconds.
+        """
+        self.title = title
+        self.seconds = 0.0
+        self._start = 0.0
+        self._profiler: Any
+        if SamplingProfiler is not None:
+            self._profiler = SamplingProfiler(interval=interval, async_mode="enabled")
+        else:
+            self._profiler = cProfile.Profile()
+
+    def start(self) -> None:
+        """
+        Start profiling.
+        """
+        self._start = time.perf_counter()
+        if isinstance(self._profiler, cProfile.Profile):
+            self._profiler.enable()
+        else:
+            self._profiler.start()
+
+    def stop(self) -> None:
+        """
+        Stop profiling.
+        """
+        if isinstance(self._profiler, cProfile.Profile):
+            self._profiler.disable()
+        else:
+            self._profiler.stop()
+        self.seconds = time.perf_counter() - self._start
+
+    def render(self) -> str:
+        """
+        Render the profile.
+
+        Returns:
+            str: The profile as an HTML page.
+        """
+        if not isinstance(self._profiler, cProfile.Profile):
+            return str(self._profiler.output_html())
+
+        output = io.StringIO()
+        stats = pstats.Stats(self._profiler, stream=output)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(100)
+        title = html.escape(f"{self.title} ({self.seconds * 1000:.1f}ms)")
+        return (
+            f"<!DOCTYPE html><html><head><title>Profile: {title}</title></head><body>"
+            f"<h1>{title}</h1><p>Install pyinstrument for a flame graph.</p>"
+            f"<pre>{html.escape(output.getvalue())}</pre></body></html>"
+        )
+
+
+def is_profile_requested(scope: Scope) -> bool:
+    """
+    Check whether a request asks to be profiled, with a `?profile` query parameter or an
+    `X-Profile` header.
+
+    Args:
+        scope (Scope): The ASGI request scope.
+
+    Returns:
+        bool: Whether the request asks to be profiled.
+    """
+    if PROFILE_PARAMETER in parse_qs(scope.get("query_string", b"").decode("latin-1"), True):
+        return True
+    return PROFILE_HEADER in Headers(scope=scope)
+
+
+def get_access_token(scope: Scope) -> Optional[str]:
+    """
+    Get the access token of a request, from the `access_token` cookie of the views or the
+    `Authorization` header of the API.
+
+    Args:
+        scope (Scope): The ASGI request scope.
+
+    Returns:
+        str | None: The access token, or None if the request has none.
+    """
+    headers = Headers(scope=scope)
+    for value in (
+        cookie_parser(headers.get("cookie", "")).get("access_token"),
+        headers.get("authorization"),
+    ):
+        if value and value.startswith("Bearer "):
+            return value.split("Bearer ", 1)[1]
+    return None
+
+
+async def is_superuser(scope: Scope, app: Optional[ASGIApp] = None) -> bool:
+    """
+    Check whether a request is made by an active superuser, before it is handled.
+
+    The token and user lookups go through the auth cache, like the user dependencies, so
+    this usually costs no query.
+
+    Args:
+        scope (Scope): The ASGI request scope.
+        app (ASGIApp | None): The application whose database session dependency
+            overrides are honoured, when the scope has none yet.
+
+    Returns:
+        bool: Whether the user is an active superuser.
+    """
+    token = get_access_token(scope)
+    if token is None:
+        return False
+    try:
+        user_id = auth_cache.decode_access_token(token=token)
+    except HTTPException:
+        return False
+
+    app = scope.get("app", app)
+    session = getattr(app, "dependency_overrides", {}).get(get_db, get_db)()
+    db = next(session)
+    try:
+        user = await auth_cache.get_user(db=db, user_id=user_id)
+    except crud.RecordNotFoundError:
+        return False
+    finally:
+        session.close()
+    return bool(user.is_active and user.is_superuser)
+
+
+def profile_filename(scope: Scope, seconds: float, now: Optional[datetime] = None) -> str:
+    """
+    Build the file name of a sampled profile.
+
+    Args:
+        scope (Scope): The ASGI request scope.
+        seconds (float): The request duration.
+        now (datetime | None): The time of the request. Defaults to now.
+
+    Returns:
+        str: The file name.
+    """
+    now = now or datetime.now()
+    path = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_")[:80] or "root"
+    return f"{now:%Y%m%d-%H%M%S-%f}-{scope['method']}-{path}-{seconds * 1000:.0f}ms.html"
+
+
+def write_profile(directory: Path, filename: str, content: str, max_files: int) -> Path:
+    """
+    Write a sampled profile, removing the oldest profiles beyond `max_files`.
+
+    Args:
+        directory (Path): The profiles folder.
+        filename (str): The file name.
+        content (str): The profile HTML.
+        max_files (int): The number of profiles to keep. 0 keeps every profile.
+
+    Returns:
+        Path: The profile file.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / filename
+    path.write_text(content)
+    if max_files:
+        for old in sorted(directory.glob("*.html"))[:-max_files]:
+            old.unlink(missing_ok=True)
+    return path
+
+
+class ProfilingMiddleware:
+    """
+    Profile requests on demand, or a sample of all requests.
+
+    A request from a superuser with a `?profile` query parameter or an `X-Profile` header
+    runs under the profiler, and gets the profile instead of the page. The user is checked
+    before the request is handled, so anybody else gets the page as usual, unprofiled and
+    unbuffered. With a sample rate of N, one request in N is profiled and written to disk.
+
+    The middleware is only installed when profiling is enabled, so it costs nothing
+    otherwise.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        on_demand: bool = True,
+        sample_rate: int = 0,
+        directory: Path = PROFILES_PATH,
+        max_files: int = 100,
+    ) -> None:
+        """
+        Initialize the middleware.
+
+        Args:
+            app (ASGIApp): The wrapped application.
+            on_demand (bool): Let superusers profile a request with `?profile`.
+            sample_rate (int): Profile one request in this many, to disk. 0 disables
+                sampling.
+            directory (Path): The folder of sampled profiles.
+            max_files (int): The number of sampled profiles to keep.
+        """
+        self.app = app
+        self.on_demand = on_demand
+        self.sample_rate = sample_rate
+        self.directory = directory
+        self.max_files = max_files
+        self._counter = itertools.count(1)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        requested = (
+            self.on_demand
+            and is_profile_requested(scope)
+            and await is_superuser(scope, app=self.app)
+        )
+        sampled = (
+            not requested and self.sample_rate > 0 and next(self._counter) % self.sample_rate == 0
+        )
+        if not (requested or sampled):
+            await self.app(scope, receive, send)
+            return
+
+        profiler = RequestProfiler(title=f"{scope['method']} {scope['path']}")
+        if not _active.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+        if requested:
+            await self._profile_on_demand(profiler, scope, receive, send)
+        else:
+            await self._profile_sample(profiler, scope, receive, send)
+
+    async def _profile_on_demand(
+        self, profiler: RequestProfiler, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        """
+        Profile a request, and answer with the profile instead of the page.
+
+        Args:
+            profiler (RequestProfiler): The profiler, not started yet.
+            scope (Scope): The ASGI request scope.
+            receive (Receive): The ASGI receive channel.
+            send (Send): The ASGI send channel.
+        """
+
+        async def discard(message: Message) -> None:  # pylint: disable=unused-argument
+            pass
+
+        try:
+            profiler.start()
+            await self.app(scope, receive, discard)
+        finally:
+            profiler.stop()
+            _active.release()
+
+        logger.info(f"Profiled {profiler.title} in {profiler.seconds * 1000:.1f}ms")
+        response = HTMLResponse(profiler.render(), headers={"Cache-Control": "no-store"})
+        await response(scope, receive, send)
+
+    async def _profile_sample(
+        self, profiler: RequestProfiler, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        """
+        Profile a request and write the profile to disk.
+
+        Args:
+            profiler (RequestProfiler): The profiler, not started yet.
+            scope (Scope): The ASGI request scope.
+            receive (Receive): The ASGI receive channel.
+            send (Send): The ASGI send channel.
+        """
+        try:
+            profiler.start()
+            await self.app(scope, receive, send)
+        finally:
+            profiler.stop()
+            _active.release()
+
+        try:
+            await blocking_executor.run(
+                write_profile,
+                self.directory,
+                profile_filename(scope, profiler.seconds),
+                profiler.render(),
+                self.max_files,
+            )
+        except OSError as exc:
+            logger.warning(f"Could not write the profile of {profiler.title}: {exc}")
@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, AsyncIterator
 
 import re
 
@@ -9,6 +9,7 @@ from fastapi.responses import StreamingResponse
 from starlette.background import BackgroundTask
 
 from app import logger, settings
+from app.core import metrics
 
 client = httpx.AsyncClient()
 
@@ -47,8 +48,13 @@ async def reverse_proxy(url: str, request: Request) -> StreamingResponse:
         )
         raise HTTPException(status_code=rp_response.status_code)
 
+    async def stream() -> AsyncIterator[bytes]:
+        async for chunk in rp_response.aiter_raw():
+            metrics.PROXY_BYTES.inc(len(chunk))
+            yield chunk
+
     return StreamingResponse(
-        rp_response.aiter_raw(),
+        stream(),
         status_code=rp_response.status_code,
         headers=rp_response.headers,
         background=BackgroundTask(rp_response.aclose),
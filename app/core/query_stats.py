@@ -0,0 +1,377 @@
+from typing import Any, Iterator, Optional
+
+import re
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from threading import Lock
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app import logger, settings
+from app.core import metrics
+
+_WHITESPACE = re.compile(r"\s+")
+_IN_LIST = re.compile(r"\bIN \((?:\?|%\(\w+\)s|:\w+)(?:, ?(?:\?|%\(\w+\)s|:\w+))*\)", re.IGNORECASE)
+_EXPLAINABLE = re.compile(r"^\s*(SELECT|INSERT|UPDATE|DELETE|WITH|REPLACE)\b", re.IGNORECASE)
+
+
+def statement_shape(statement: str) -> str:
+    """
+    Normalize a SQL statement, so executions that only differ by parameters compare equal.
+
+    Args:
+        statement (str): The SQL statement, with parameter placeholders.
+
+    Returns:
+        str: The statement with whitespace collapsed and `IN (?, ?, ...)` lists shortened
+            to `IN (...)`.
+    """
+    return _IN_LIST.sub("IN (...)", _WHITESPACE.sub(" ", statement).strip())
+
+
+def parameters_shape(parameters: Any) -> str:
+    """
+    Describe the parameters of a statement by their types, without their values.
+
+    Args:
+        parameters (Any): The DBAPI parameters: a sequence, a mapping, or a list of either
+            for `executemany`.
+
+    Returns:
+        str: The parameter types, e.g. `(str, int)`, or `(str, int) x 20` for 20 rows.
+    """
+    if isinstance(parameters, list) and parameters and isinstance(parameters[0], (tuple, dict)):
+        return f"{parameters_shape(parameters[0])} x {len(parameters)}"
+    if isinstance(parameters, dict):
+        items = ", ".join(f"{name}: {type(value).__name__}" for name, value in parameters.items())
+        return f"{{{items}}}"
+    if isinstance(parameters, (tuple, list)):
+        return f"({', '.join(type(value).__name__ for value in parameters)})"
+    return ""
+
+
+def format_query_plan(rows: list[tuple[Any, ...]]) -> str:
+    """
+    Format the rows of SQLite's `EXPLAIN QUERY PLAN` as an indented tree.
+
+    Args:
+        rows (list[tuple[Any, ...]]): The `(id, parent, notused, detail)` rows.
+
+    Returns:
+        str: One line per step, indented under its parent step.
+    """
+    depths: dict[Any, int] = {0: -1}
+    lines = []
+    for node_id, parent, _, detail in rows:
+        depths[node_id] = depths.get(parent, -1) + 1
+        lines.append(f"{'  ' * depths[node_id]}{detail}")
+    return "\n".join(lines)
+
+
+def explain_query_plan(conn: Any, statement: str, parameters: Any) -> Optional[str]:
+    """
+    Get SQLite's plan for a statement, on the connection that executed it.
+
+    The raw DBAPI connection is used, so the `EXPLAIN` is not itself timed or recorded.
+
+    Args:
+        conn (Any): The SQLAlchemy connection.
+        statement (str): The SQL statement.
+        parameters (Any): The DBAPI parameters of the statement.
+
+    Returns:
+        str | None: The plan, or None if the statement cannot be explained.
+    """
+    if conn.dialect.name != "sqlite" or not _EXPLAINABLE.match(statement):
+        return None
+    if isinstance(parameters, list) and parameters and isinstance(parameters[0], (tuple, dict)):
+        parameters = parameters[0]
+    try:
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters or ())
+            return format_query_plan(cursor.fetchall())
+        finally:
+            cursor.close()
+    except Exception as exc:  # pylint: disable=broad-except
+        return f"EXPLAIN failed: {exc}"
+
+
+@dataclass
+class SlowQuery:
+    """A statement that took longer than the slow query threshold."""
+
+    statement: str
+    parameters: str
+    seconds: float
+    endpoint: str
+    plan: Optional[str]
+    recorded_at: datetime = field(default_factory=datetime.utcnow)
+
+    @property
+    def shape(self) -> str:
+        """The normalized statement, see `statement_shape`."""
+        return statement_shape(self.statement)
+
+
+class SlowQueryLog:
+    """
+    The most recent slow queries, in a fixed-size ring buffer.
+
+    Slow statements are recorded with the shape of their parameters (not their values),
+    their duration, the request that ran them and SQLite's `EXPLAIN QUERY PLAN`.
+    """
+
+    def __init__(self, threshold_seconds: float, size: int = 100, explain: bool = True) -> None:
+        """
+        Initialize the log.
+
+        Args:
+            threshold_seconds (float): Record statements taking longer than this. 0 disables
+                the log.
+            size (int): The number of slow queries to keep; the oldest are dropped first.
+            explain (bool): Capture the query plan of slow statements.
+        """
+        self.threshold_seconds = threshold_seconds
+        self.explain = explain
+        self._queries: deque[SlowQuery] = deque(maxlen=size)
+        self._lock = Lock()
+
+    def record(self, conn: Any, statement: str, parameters: Any, seconds: float) -> None:
+        """
+        Record a statement if it was slow.
+
+        Args:
+            conn (Any): The SQLAlchemy connection that executed the statement.
+            statement (str): The SQL statement.
+            parameters (Any): The DBAPI parameters of the statement.
+            seconds (float): The execution time.
+        """
+        if not self.threshold_seconds or seconds < self.threshold_seconds:
+            return
+        stats = current_query_stats.get()
+        query = SlowQuery(
+            statement=statement,
+            parameters=parameters_shape(parameters),
+            seconds=seconds,
+            endpoint=stats.endpoint if stats is not None else "",
+            plan=explain_query_plan(conn, statement, parameters) if self.explain else None,
+        )
+        metrics.DB_SLOW_QUERIES.inc()
+        with self._lock:
+            self._queries.append(query)
+
+    def entries(self) -> list[SlowQuery]:
+        """
+        Get the recorded slow queries.
+
+        Returns:
+            list[SlowQuery]: The slow queries, newest first.
+        """
+        with self._lock:
+            return list(reversed(self._queries))
+
+    def clear(self) -> None:
+        """
+        Forget the recorded slow queries.
+        """
+        with self._lock:
+            self._queries.clear()
+
+
+slow_queries = SlowQueryLog(
+    threshold_seconds=settings.SLOW_QUERY_THRESHOLD_MS / 1000,
+    size=settings.SLOW_QUERY_LOG_SIZE,
+    explain=settings.SLOW_QUERY_EXPLAIN,
+)
+
+
+@dataclass
+class QueryStats:
+    """The DB queries made while handling a request, or inside a `track_queries` block."""
+
+    queries: int = 0
+    seconds: float = 0.0
+    statements: Counter[str] = field(default_factory=Counter)
+    scope: Optional[Scope] = field(default=None, repr=False)
+
+    @property
+    def endpoint(self) -> str:
+        """The request the queries were made for, e.g. `GET /generation (view_cursors)`."""
+        if self.scope is None:
+            return ""
+        handler = getattr(self.scope.get("endpoint"), "__name__", "other")
+        return f"{self.scope['method']} {self.scope['path']} ({handler})"
+
+    def record(self, statement: str, seconds: float) -> None:
+        """
+        Record an executed statement.
+
+        Args:
+            statement (str): The SQL statement.
+            seconds (float): The execution time.
+        """
+        self.queries += 1
+        self.seconds += seconds
+        self.statements[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """
+        Get the statement shapes executed at least `threshold` times, a likely N+1 query.
+
+        Args:
+            threshold (int): The minimum number of executions.
+
+        Returns:
+            list[tuple[str, int]]: The statement shapes and their counts, most repeated first.
+        """
+        return [(shape, n) for shape, n in self.statements.most_common() if n >= threshold]
+
+
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "current_query_stats", default=None
+)
+_trackers: list[QueryStats] = []
+_trackers_lock = Lock()
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """
+    Count the queries executed inside a block, on any thread.
+
+    Unlike the per-request stats, this also sees queries made by an app running in another
+    thread (e.g. behind a `TestClient`), which is what tests and benchmarks need.
+
+    Yields:
+        QueryStats: The stats, updated as queries run.
+    """
+    stats = QueryStats()
+    with _trackers_lock:
+        _trackers.append(stats)
+    try:
+        yield stats
+    finally:
+        with _trackers_lock:
+            _trackers.remove(stats)
+
+
+def _before_cursor_execute(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, *args: Any
+) -> None:
+    # Kept on the execution, not the connection: a statement that raises never reaches
+    # `after_cursor_execute`, and its start time is dropped with its context
+    context.query_start_time = time.perf_counter()
+
+
+def _after_cursor_execute(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, *args: Any
+) -> None:
+    elapsed = time.perf_counter() - context.query_start_time
+    metrics.DB_QUERIES.inc()
+    metrics.DB_QUERY_SECONDS.inc(elapsed)
+    slow_queries.record(conn, statement, parameters, elapsed)
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+    if _trackers:
+        with _trackers_lock:
+            for tracker in _trackers:
+                tracker.record(statement, elapsed)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Count and time every query executed through an engine.
+
+    Args:
+        engine (Engine): The SQLAlchemy engine.
+    """
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class QueryStatsMiddleware:
+    """
+    Count the DB queries and DB time of every HTTP request.
+
+    The totals are recorded in the per-handler metrics, sent to the browser as a
+    `Server-Timing` header, and logged as a warning when a request makes too many queries
+    or repeats the same statement too often (an N+1 query).
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        warning_threshold: int = 0,
+        repeat_threshold: int = 0,
+        server_timing: bool = True,
+    ) -> None:
+        """
+        Initialize the middleware.
+
+        Args:
+            app (ASGIApp): The wrapped application.
+            warning_threshold (int): Warn about requests making more queries than this.
+                0 disables the warning.
+            repeat_threshold (int): Warn about requests executing the same statement shape
+                at least this many times. 0 disables the warning.
+            server_timing (bool): Add a `Server-Timing` header to responses.
+        """
+        self.app = app
+        self.warning_threshold = warning_threshold
+        self.repeat_threshold = repeat_threshold
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(scope=scope)
+
+        async def wrapped_send(message: Message) -> None:
+            if self.server_timing and message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={stats.seconds * 1000:.1f};desc="{stats.queries} queries"',
+                )
+            await send(message)
+
+        token = current_query_stats.set(stats)
+        try:
+            await self.app(scope, receive, wrapped_send)
+        finally:
+            current_query_stats.reset(token)
+            handler = getattr(scope.get("endpoint"), "__name__", "other")
+            metrics.HTTP_REQUEST_DB_QUERIES.observe(stats.queries, handler=handler)
+            metrics.HTTP_REQUEST_DB_SECONDS.observe(stats.seconds, handler=handler)
+            self._warn(scope, handler, stats)
+
+    def _warn(self, scope: Scope, handler: str, stats: QueryStats) -> None:
+        """
+        Log a warning if the request made too many queries, or repeated a statement.
+
+        Args:
+            scope (Scope): The ASGI request scope.
+            handler (str): The name of the endpoint that handled the request.
+            stats (QueryStats): The request's query stats.
+        """
+        request = f"{scope['method']} {scope['path']} ({handler})"
+        if self.warning_threshold and stats.queries > self.warning_threshold:
+            logger.warning(
+                f"{request} made {stats.queries} DB queries "
+                f"in {stats.seconds * 1000:.1f}ms (threshold {self.warning_threshold})"
+            )
+        if self.repeat_threshold:
+            for shape, count in stats.repeated(self.repeat_threshold):
+                logger.warning(f"{request} repeated a DB query {count} times: {shape[:300]}")
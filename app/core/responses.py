@@ -0,0 +1,27 @@
+from typing import Any
+
+import json
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson when it is installed.
+
+    Endpoints returning this response directly skip FastAPI's response_model validation and
+    `jsonable_encoder` pass, so content must already be made of plain dicts/lists/scalars.
+    Datetimes are serialized as ISO 8601 strings by both renderers.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(
+            content, default=lambda value: value.isoformat(), separators=(",", ":")
+        ).encode("utf-8")
@@ -0,0 +1,168 @@
+from typing import Any, Callable, Optional
+
+import hashlib
+import json
+import os
+from mimetypes import guess_type
+from pathlib import Path
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from app.core.compression import accepted_encodings, brotli, compress
+
+MANIFEST_NAME = "manifest.json"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+PRECOMPRESS_SUFFIXES = (".css", ".js", ".svg", ".json", ".webmanifest", ".txt", ".ico")
+ENCODING_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+def build_static(source: Path, destination: Path) -> dict[str, str]:
+    """
+    Build the static assets for production.
+
+    Every file in `source` is copied to `destination` under a content-hashed name
+    (`style.css` -> `style.1a2b3c4d5e.css`), text assets get `.gz` (and `.br`, if brotli is
+    installed) siblings compressed at the highest level, and a manifest mapping original to
+    hashed names is written for the `static_url` template helper.
+
+    Args:
+        source (Path): The static source folder.
+        destination (Path): The build output folder.
+
+    Returns:
+        dict[str, str]: The manifest, original relative path to hashed relative path.
+    """
+    encodings = {"gzip": 9, "br": 11} if brotli is not None else {"gzip": 9}
+    manifest = {}
+    for file in sorted(source.rglob("*")):
+        if not file.is_file():
+            continue
+        relative = file.relative_to(source)
+        content = file.read_bytes()
+        digest = hashlib.sha256(content).hexdigest()[:10]
+        hashed = relative.with_name(f"{relative.stem}.{digest}{relative.suffix}")
+
+        target = destination / hashed
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(content)
+        if relative.suffix.lower() in PRECOMPRESS_SUFFIXES:
+            for encoding, level in encodings.items():
+                compressed = compress(content, encoding, level=level)
+                if len(compressed) < len(content):
+                    target.with_name(target.name + ENCODING_SUFFIXES[encoding]).write_bytes(
+                        compressed
+                    )
+        manifest[relative.as_posix()] = hashed.as_posix()
+
+    destination.mkdir(parents=True, exist_ok=True)
+    (destination / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    return manifest
+
+
+def load_static_manifest(directory: Path) -> dict[str, str]:
+    """
+    Load the manifest written by `build_static`.
+
+    Args:
+        directory (Path): The build output folder.
+
+    Returns:
+        dict[str, str]: The manifest, or an empty dict if the assets were not built.
+    """
+    try:
+        return json.loads((directory / MANIFEST_NAME).read_text())
+    except FileNotFoundError:
+        return {}
+
+
+def get_static_url(manifest: dict[str, str], prefix: str = "/static") -> Callable[[str], str]:
+    """
+    Create the `static_url` template helper.
+
+    Args:
+        manifest (dict[str, str]): The static manifest.
+        prefix (str): The URL path the static files are mounted at.
+
+    Returns:
+        Callable[[str], str]: A function returning the URL of a static asset, hashed if it
+            was built, so it can be cached forever.
+    """
+
+    def static_url(path: str) -> str:
+        return f"{prefix}/{manifest.get(path, path)}"
+
+    return static_url
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    Static files that serves the output of `build_static` ahead of the source folder.
+
+    Hashed assets are served with an immutable `Cache-Control`, and a precompressed `.br`
+    or `.gz` sibling is served instead of the asset when the client accepts it.
+    """
+
+    def __init__(
+        self, *, directory: Path, build_directory: Optional[Path] = None, **kwargs: Any
+    ) -> None:
+        """
+        Initialize the static files app.
+
+        Args:
+            directory (Path): The static source folder.
+            build_directory (Path | None): The `build_static` output folder, if any.
+            kwargs (Any): Extra `StaticFiles` arguments.
+        """
+        super().__init__(directory=directory, **kwargs)
+        self.build_directory = build_directory
+        self.immutable: set[str] = set()
+        if build_directory is not None:
+            self.all_directories.insert(0, build_directory)
+            self.immutable = set(load_static_manifest(build_directory).values())
+
+    def file_response(
+        self,
+        full_path: Any,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        method = scope["method"]
+        response: Optional[Response] = None
+
+        encodings = accepted_encodings(
+            request_headers.get("accept-encoding", ""), available=("br", "gzip")
+        )
+        for encoding in encodings:
+            encoded_path = f"{full_path}{ENCODING_SUFFIXES[encoding]}"
+            try:
+                encoded_stat = os.stat(encoded_path)
+            except FileNotFoundError:
+                continue
+            response = FileResponse(
+                encoded_path,
+                status_code=status_code,
+                stat_result=encoded_stat,
+                method=method,
+                media_type=guess_type(str(full_path))[0] or "text/plain",
+                headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"},
+            )
+            break
+
+        if response is None:
+            response = FileResponse(
+                full_path, status_code=status_code, stat_result=stat_result, method=method
+            )
+
+        if self.build_directory is not None:
+            relative = os.path.relpath(full_path, os.path.realpath(self.build_directory))
+            if Path(relative).as_posix() in self.immutable:
+                response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
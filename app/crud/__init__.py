@@ -1,15 +1,25 @@
 from .base import BaseCRUD
+from .browse_day import browse_day
 from .cursor import cursor
+from .data_version import data_version
 from .exceptions import DeleteError, RecordAlreadyExistsError, RecordNotFoundError
 from .generated_image import generated_image
+from .generation_step import generation_step
+from .import_run import import_run
 from .settings import settings
+from .url_prefix import url_prefix
 from .user import user
 
 __all__ = [
     "BaseCRUD",
+    "browse_day",
     "cursor",
+    "data_version",
     "generated_image",
+    "generation_step",
+    "import_run",
     "settings",
+    "url_prefix",
     "user",
     "DeleteError",
     "RecordAlreadyExistsError",
@@ -1,4 +1,4 @@
-from typing import Any, Generic, TypeVar, cast
+from typing import Any, Generic, Optional, TypeVar, cast
 
 from sqlalchemy import select as sa_select
 from sqlalchemy.exc import IntegrityError
@@ -7,6 +7,7 @@ from sqlalchemy.sql.expression import func
 from sqlmodel import Session, SQLModel, select
 
 from app.crud.exceptions import DeleteError, RecordAlreadyExistsError, RecordNotFoundError
+from app.db.archive import in_store, stores
 
 ModelType = TypeVar("ModelType", bound=SQLModel)
 ModelCreateType = TypeVar("ModelCreateType", bound=SQLModel)
@@ -14,6 +15,10 @@ ModelUpdateType = TypeVar("ModelUpdateType", bound=SQLModel)
 
 
 class BaseCRUD(Generic[ModelType, ModelCreateType, ModelUpdateType]):
+    # Whether rows of the model are moved to the archive stores, see `app.db.archive`. If so,
+    # `get` and `count` read the archives too.
+    archived = False
+
     def __init__(self, model: type[ModelType]) -> None:
         """
         Initialize the CRUD object.
@@ -52,7 +57,12 @@ class BaseCRUD(Generic[ModelType, ModelCreateType, ModelUpdateType]):
             RecordNotFoundError: If no matching record is found.
         """
         statement = select(self.model).filter(*args).filter_by(**kwargs)
-        result = db.exec(statement).first()
+        result = None
+        for schema in self._stores(db):
+            result = db.exec(statement, execution_options=in_store(schema)).first()
+            if result is not None:
+                result = self._from_store(db, [result], schema)[0]
+                break
         if result is None:
             raise RecordNotFoundError(
                 f"{self.model.__name__}({args=} {kwargs=}) not found in database"
@@ -79,6 +89,26 @@ class BaseCRUD(Generic[ModelType, ModelCreateType, ModelUpdateType]):
             return None
         return result
 
+    async def get_existing_ids(self, db: Session, ids: list[Any]) -> set[Any]:
+        """
+        Get which of the given ids have a record, with one query per store.
+
+        Args:
+            db (Session): The database session.
+            ids (list[Any]): The ids to look up.
+
+        Returns:
+            set[Any]: The ids that have a record.
+        """
+        if not ids:
+            return set()
+        column = self.model.id  # type: ignore
+        statement = sa_select(column).where(column.in_(ids))
+        existing: set[Any] = set()
+        for schema in self._stores(db):
+            existing.update(db.execute(statement, execution_options=in_store(schema)).scalars())
+        return existing
+
     async def get_multi(
         self,
         *args: BinaryExpression[Any],
@@ -195,5 +225,42 @@ class BaseCRUD(Generic[ModelType, ModelCreateType, ModelUpdateType]):
         statement = select(func.count()).select_from(self.model)
         if args or kwargs:
             statement = statement.filter(*args).filter_by(**kwargs)
-        result = db.execute(statement).scalar()
-        return result or 0
+        return sum(
+            db.execute(statement, execution_options=in_store(schema)).scalar() or 0
+            for schema in self._stores(db)
+        )
+
+    def _stores(self, db: Session) -> list[Optional[str]]:
+        """
+        Get the stores the rows of the model are read from.
+
+        Args:
+            db (Session): The database session.
+
+        Returns:
+            list[str | None]: None for the main database, then the archive schemas if the
+                model is archived.
+        """
+        return stores(db) if self.archived else [None]
+
+    def _from_store(
+        self, db: Session, rows: list[ModelType], schema: Optional[str]
+    ) -> list[ModelType]:
+        """
+        Prepare the rows loaded from a store.
+
+        Archived rows are read-only: they are detached from the session, so a commit does
+        not expire them and they are never flushed to the main database.
+
+        Args:
+            db (Session): The database session.
+            rows (list[ModelType]): The loaded rows.
+            schema (str | None): The archive schema, or None for the main database.
+
+        Returns:
+            list[ModelType]: The rows.
+        """
+        if schema is not None:
+            for row in rows:
+                db.expunge(row)
+        return rows
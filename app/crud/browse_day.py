@@ -0,0 +1,180 @@
+from typing import Any, Optional
+
+from datetime import UTC, date, datetime
+
+from sqlalchemy import case, delete, desc, func
+from sqlalchemy.dialects.sqlite import insert
+from sqlmodel import Session, select
+
+from app import models
+from app.db.archive import in_store, stores
+
+from .base import BaseCRUD
+
+
+def day_of(timestamp_ms: int) -> date:
+    """
+    Get the day (UTC) of a cursor timestamp.
+
+    Args:
+        timestamp_ms (int): The timestamp, in epoch milliseconds.
+
+    Returns:
+        date: The day.
+    """
+    return datetime.fromtimestamp(timestamp_ms / 1000, UTC).date()
+
+
+class BrowseDayCRUD(BaseCRUD[models.BrowseDay, models.BrowseDayCreate, models.BrowseDayRead]):
+    async def record(
+        self,
+        db: Session,
+        *,
+        cursor_id: str,
+        timestamp_ms: int,
+        cursors: int = 0,
+        images: int = 0,
+    ) -> None:
+        """
+        Add a cursor, or images of a cursor, to the counts of their day.
+
+        The day is upserted in the current transaction, so it is committed with the rows it
+        counts.
+
+        Args:
+            db (Session): The database session.
+            cursor_id (str): The cursor.
+            timestamp_ms (int): The timestamp of the cursor, in epoch milliseconds.
+            cursors (int): The number of cursors to add.
+            images (int): The number of images to add.
+        """
+        self._add(
+            db,
+            [
+                {
+                    "day": day_of(timestamp_ms),
+                    "cursor_count": cursors,
+                    "image_count": images,
+                    "first_cursor_id": cursor_id,
+                    "first_timestamp_ms": timestamp_ms,
+                }
+            ],
+        )
+
+    def _add(self, db: Session, rows: list[dict[str, Any]]) -> None:
+        """
+        Add counts to days, creating the days that are new.
+
+        The first cursor of a day is the newest one, where browsing newest first enters it.
+
+        Args:
+            db (Session): The database session.
+            rows (list[dict[str, Any]]): The counts, with the newest cursor they include.
+        """
+        table = self.model.__table__
+        stmt = insert(table)
+        newer = stmt.excluded.first_timestamp_ms > table.c.first_timestamp_ms
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.day],
+            set_={
+                "cursor_count": table.c.cursor_count + stmt.excluded.cursor_count,
+                "image_count": table.c.image_count + stmt.excluded.image_count,
+                "first_cursor_id": case(
+                    (newer, stmt.excluded.first_cursor_id), else_=table.c.first_cursor_id
+                ),
+                "first_timestamp_ms": case(
+                    (newer, stmt.excluded.first_timestamp_ms), else_=table.c.first_timestamp_ms
+                ),
+            },
+        )
+        db.execute(stmt, rows)
+
+    async def get_month(self, db: Session, *, year: int, month: int) -> list[models.BrowseDay]:
+        """
+        Get the days of a month that have cursors.
+
+        Args:
+            db (Session): The database session.
+            year (int): The year.
+            month (int): The month, from 1 to 12.
+
+        Returns:
+            list[models.BrowseDay]: The days, in calendar order.
+        """
+        start = date(year, month, 1)
+        end = date(year + month // 12, month % 12 + 1, 1)
+        stmt = (
+            select(self.model)
+            .where(self.model.day >= start, self.model.day < end)
+            .order_by(self.model.day)
+        )
+        return db.exec(stmt).all()
+
+    async def get_latest(self, db: Session) -> Optional[models.BrowseDay]:
+        """
+        Get the most recent day with cursors.
+
+        Args:
+            db (Session): The database session.
+
+        Returns:
+            models.BrowseDay | None: The day, or None if there are no cursors.
+        """
+        return db.exec(select(self.model).order_by(desc(self.model.day)).limit(1)).first()
+
+    async def rebuild(self, db: Session) -> int:
+        """
+        Recount every day from the cursors and images, archives included.
+
+        Only needed for rows written around the CRUD layer, e.g. by bulk loads; imports
+        keep the days up to date as they go.
+
+        Args:
+            db (Session): The database session.
+
+        Returns:
+            int: The number of days.
+        """
+        cursor, image = models.Cursor, models.GeneratedImage
+        images = (
+            select(image.cursor_id, func.count().label("images"))
+            .group_by(image.cursor_id)
+            .subquery()
+        )
+        day = func.date(cursor.timestamp_ms / 1000, "unixepoch")
+        # SQLite returns the bare `cursor.id` of the row with the max() timestamp
+        stmt = (
+            select(
+                func.count(cursor.id),
+                func.coalesce(func.sum(images.c.images), 0),
+                cursor.id,
+                func.max(cursor.timestamp_ms),
+            )
+            .outerjoin(images, images.c.cursor_id == cursor.id)
+            .group_by(day)
+        )
+
+        # Archives can only be attached outside of a transaction, so before any write
+        schemas = stores(db)
+        db.execute(delete(self.model))
+        for schema in schemas:
+            rows = db.execute(stmt, execution_options=in_store(schema)).all()
+            if rows:
+                self._add(
+                    db,
+                    [
+                        {
+                            "day": day_of(timestamp_ms),
+                            "cursor_count": cursor_count,
+                            "image_count": image_count,
+                            "first_cursor_id": cursor_id,
+                            "first_timestamp_ms": timestamp_ms,
+                        }
+                        for cursor_count, image_count, cursor_id, timestamp_ms in rows
+                    ],
+                )
+        db.commit()
+        return await self.count(db=db)
+
+
+browse_day = BrowseDayCRUD(models.BrowseDay)
@@ -1,11 +1,17 @@
-from datetime import datetime
+from typing import Any, Optional
 
-from sqlalchemy import desc, func
+from datetime import UTC, datetime
+
+from sqlalchemy import desc, func, literal, tuple_, update
+from sqlalchemy.orm import aliased
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlmodel import Session, select
 
 from app import models
+from app.db.archive import in_store
 
 from .base import BaseCRUD
+from .browse_day import browse_day
 
 
 def extract_timestamp_from_cursor_id(cursor_id: str) -> datetime:
@@ -15,30 +21,257 @@ def extract_timestamp_from_cursor_id(cursor_id: str) -> datetime:
     return datetime.strptime(timestamp_str[:14], "%Y%m%d%H%M%S")
 
 
+def parse_cursor_id(cursor_id: str) -> tuple[int, int]:
+    """
+    Parse the model id and the timestamp of a cursor ID.
+
+    Args:
+        cursor_id (str): The cursor ID, formatted `modelid-YYYYMMDDHHmmssSSS`.
+
+    Returns:
+        tuple[int, int]: The model id, and the timestamp in epoch milliseconds (UTC),
+            milliseconds included.
+
+    Raises:
+        ValueError: If the cursor ID is not in this format.
+    """
+    model_id, separator, timestamp_str = cursor_id.partition("-")
+    if not separator:
+        raise ValueError(f"Invalid cursor ID: {cursor_id}")
+    timestamp = extract_timestamp_from_cursor_id(cursor_id).replace(tzinfo=UTC)
+    milliseconds = int(timestamp_str[14:17] or 0)
+    return int(model_id), int(timestamp.timestamp()) * 1000 + milliseconds
+
+
+# Cursors newest first
+NEWEST_FIRST = (desc(models.Cursor.timestamp_ms), desc(models.Cursor.id))
+
+
+def older_than(cursor_id: str) -> Any:
+    """
+    Build the filter for the cursors that come after a cursor, newest first.
+
+    Args:
+        cursor_id (str): The cursor ID. The cursor does not have to exist.
+
+    Returns:
+        Any: The filter, served by the `(timestamp_ms, id)` index.
+
+    Raises:
+        ValueError: If the cursor ID is malformed.
+    """
+    timestamp_ms = parse_cursor_id(cursor_id)[1]
+    return tuple_(models.Cursor.timestamp_ms, models.Cursor.id) < tuple_(timestamp_ms, cursor_id)
+
+
 class CursorCRUD(BaseCRUD[models.Cursor, models.CursorCreate, models.CursorRead]):
+    archived = True
+
+    def _from_store(
+        self, db: Session, rows: list[models.Cursor], schema: Optional[str]
+    ) -> list[models.Cursor]:
+        """
+        Detach archived cursors and give them their page number in the whole history.
+
+        Archives store page numbers counted from their newest cursor, so that imports
+        never write to them, and the cursors of the main database come first.
+
+        Args:
+            db (Session): The database session.
+            rows (list[models.Cursor]): The loaded cursors.
+            schema (str | None): The archive schema, or None for the main database.
+
+        Returns:
+            list[models.Cursor]: The cursors.
+        """
+        rows = super()._from_store(db, rows, schema)
+        if schema is None or not rows:
+            return rows
+        offset = db.execute(select(func.count()).select_from(models.Cursor)).scalar_one()
+        for cursor in rows:
+            set_committed_value(cursor, "page_number", (cursor.page_number or 0) + offset)
+        return rows
+
     async def get_multi(
         self, db: Session, *, skip: int = 0, limit: int = 100
     ) -> list[models.Cursor]:
-        """Get multiple cursors ordered by timestamp in ID descending"""
-        stmt = select(models.Cursor).order_by(desc(models.Cursor.id)).offset(skip).limit(limit)
-        result = db.execute(stmt).all()
-        return [r[0] for r in result]
+        """Get multiple cursors, newest first, from the main database then the archives"""
+        stmt = select(models.Cursor).order_by(*NEWEST_FIRST)
+        schemas = self._stores(db)
+        cursors: list[models.Cursor] = []
+        for schema in schemas:
+            if skip and schema != schemas[-1]:
+                total = db.execute(
+                    select(func.count()).select_from(models.Cursor),
+                    execution_options=in_store(schema),
+                ).scalar_one()
+                if skip >= total:
+                    skip -= total
+                    continue
+            found = db.exec(
+                stmt.offset(skip).limit(limit - len(cursors)), execution_options=in_store(schema)
+            ).all()
+            cursors.extend(self._from_store(db, found, schema))
+            skip = 0
+            if len(cursors) >= limit:
+                break
+        return cursors
+
+    async def get_before(
+        self, db: Session, *, before: str | None = None, limit: int = 100, archived: bool = True
+    ) -> list[models.Cursor]:
+        """
+        Get a keyset page of cursors, newest first.
+
+        Archived cursors are all older than the cursors of the main database, so the page
+        continues in the archives once the main database is exhausted.
+
+        Args:
+            db (Session): The database session.
+            before (str | None): Only return cursors older than this cursor id.
+            limit (int): The maximum number of cursors to return.
+            archived (bool): Include the archived cursors.
+
+        Returns:
+            list[models.Cursor]: The cursors.
+
+        Raises:
+            ValueError: If `before` is not a valid cursor id.
+        """
+        stmt = select(models.Cursor)
+        if before:
+            stmt = stmt.where(older_than(before))
+        stmt = stmt.order_by(*NEWEST_FIRST)
+        cursors: list[models.Cursor] = []
+        for schema in self._stores(db) if archived else [None]:
+            found = db.exec(
+                stmt.limit(limit - len(cursors)), execution_options=in_store(schema)
+            ).all()
+            cursors.extend(self._from_store(db, found, schema))
+            if len(cursors) >= limit:
+                break
+        return cursors
+
+    async def get_chain(
+        self, db: Session, *, cursor_id: str, steps: int, reverse: bool = False
+    ) -> list[models.Cursor]:
+        """
+        Follow the `next_cursor_id` chain from a cursor, across the main database and the
+        archives.
+
+        Within a store the chain is followed in a single recursive query. Where it leaves
+        the store, the next cursor is looked up in the other stores and followed from there.
+
+        Args:
+            db (Session): The database session.
+            cursor_id (str): The cursor to start from (not included in the result).
+            steps (int): The maximum number of cursors to follow.
+            reverse (bool): Follow the chain backwards, to the cursors whose
+                `next_cursor_id` leads to `cursor_id`.
+
+        Returns:
+            list[models.Cursor]: The cursors, nearest first. The chain stops early at its
+                end, or at a `next_cursor_id` that is not in the database.
+        """
+        if steps < 1:
+            return []
+
+        schemas = self._stores(db)
+        cursors = self._get_chain_in(db, None, cursor_id, steps, reverse)
+        while len(schemas) > 1 and len(cursors) < steps:
+            current = cursors[-1] if cursors else await self.get_or_none(db=db, id=cursor_id)
+            if current is None:
+                break
+            found: list[models.Cursor] = []
+            if not reverse:
+                following = (
+                    await self.get_or_none(db=db, id=current.next_cursor_id)
+                    if current.next_cursor_id
+                    else None
+                )
+                if following is None:
+                    break
+                cursors.append(following)
+                current = following
+            for schema in schemas:
+                found = self._get_chain_in(db, schema, current.id, steps - len(cursors), reverse)
+                if found:
+                    break
+            if not found and reverse:
+                break
+            cursors.extend(found)
+        return cursors[:steps]
+
+    def _get_chain_in(
+        self, db: Session, schema: Optional[str], cursor_id: str, steps: int, reverse: bool
+    ) -> list[models.Cursor]:
+        """
+        Follow the `next_cursor_id` chain from a cursor in a single recursive query.
+
+        Args:
+            db (Session): The database session.
+            schema (str | None): The archive schema, or None for the main database.
+            cursor_id (str): The cursor to start from (not included in the result).
+            steps (int): The maximum number of cursors to follow.
+            reverse (bool): Follow the chain backwards.
+
+        Returns:
+            list[models.Cursor]: The cursors of the store, nearest first.
+        """
+        if steps < 1:
+            return []
+
+        link = aliased(models.Cursor)
+        if reverse:
+            chain = (
+                select(models.Cursor.id.label("id"), literal(1).label("depth"))  # type: ignore
+                .where(models.Cursor.next_cursor_id == cursor_id)
+                .cte("chain", recursive=True)
+            )
+            chain = chain.union_all(
+                select(link.id, chain.c.depth + 1).where(
+                    link.next_cursor_id == chain.c.id, chain.c.depth < steps
+                )
+            )
+        else:
+            chain = (
+                select(
+                    models.Cursor.next_cursor_id.label("id"),  # type: ignore
+                    literal(1).label("depth"),
+                )
+                .where(models.Cursor.id == cursor_id)
+                .cte("chain", recursive=True)
+            )
+            chain = chain.union_all(
+                select(link.next_cursor_id, chain.c.depth + 1).where(
+                    link.id == chain.c.id, chain.c.depth < steps
+                )
+            )
+
+        stmt = (
+            select(models.Cursor, chain.c.depth)
+            .join(chain, models.Cursor.id == chain.c.id)
+            .order_by(chain.c.depth, *NEWEST_FIRST)
+        )
+        cursors: list[models.Cursor] = []
+        for cursor, depth in db.execute(stmt, execution_options=in_store(schema)).all():
+            # Keep one cursor per step, and stop at the first gap in the chain
+            if depth == len(cursors) + 1:
+                cursors.append(cursor)
+            elif depth > len(cursors) + 1:
+                break
+        return self._from_store(db, cursors, schema)
 
     async def get_latest(self, db: Session) -> models.Cursor:
-        """Get the most recent cursor based on the timestamp in the ID"""
-        # Extract timestamp from cursor ID and order by it
-        stmt = select(models.Cursor).order_by(desc(models.Cursor.id))
-        result = db.execute(stmt).first()
-        if not result:
+        """Get the most recent cursor"""
+        cursors = await self.get_before(db=db, limit=1)
+        if not cursors:
             raise ValueError("No cursors found")
-        return result[0]
+        return cursors[0]
 
     async def get_page(self, db: Session, page: int, per_page: int = 10) -> list[models.Cursor]:
-        """Get a page of cursors ordered by timestamp in ID descending"""
-        skip = (page - 1) * per_page
-        stmt = select(models.Cursor).order_by(desc(models.Cursor.id)).offset(skip).limit(per_page)
-        result = db.execute(stmt).all()
-        return [r[0] for r in result]
+        """Get a page of cursors, newest first"""
+        return await self.get_multi(db=db, skip=(page - 1) * per_page, limit=per_page)
 
     async def get_total_pages(self, db: Session, per_page: int = 10) -> int:
         """Get total number of pages"""
@@ -46,46 +279,46 @@ class CursorCRUD(BaseCRUD[models.Cursor, models.CursorCreate, models.CursorRead]
         return (total + per_page - 1) // per_page
 
     async def create(self, db: Session, *, obj_in: models.CursorCreate) -> models.Cursor:
-        # Get all cursors ordered by ID (which contains timestamp) descending
-        stmt = select(models.Cursor).order_by(desc(models.Cursor.id))
-        existing_cursors = db.execute(stmt).all()
-        existing_cursors = [r[0] for r in existing_cursors]
-
-        # If this is the first cursor, its page number will be 1
-        if not existing_cursors:
-            page_number = 1
-        else:
-            # Find where this cursor should be inserted based on its ID
-            # The ID format is: modelid-YYYYMMDDHHmmssSSS
-            new_cursor_timestamp = obj_in.id.split("-")[1]
-            insert_position = 0
-
-            for i, cursor in enumerate(existing_cursors):
-                existing_timestamp = cursor.id.split("-")[1]
-                if new_cursor_timestamp > existing_timestamp:
-                    insert_position = i
-                    break
-                insert_position = i + 1
+        """
+        Create a cursor, inserting it at its place in the page order.
 
-            # Page number will be insert_position + 1
-            page_number = insert_position + 1
+        The page number is the number of newer cursors plus one, and the page numbers of the
+        older cursors are shifted by a single UPDATE, both served by the
+        `(timestamp_ms, id)` index. The cursor is counted in its browse day.
 
-            # Update page numbers for all cursors that come after this one
-            for cursor in existing_cursors[insert_position:]:
-                cursor.page_number = cursor.page_number + 1
-                db.add(cursor)
+        Args:
+            db (Session): The database session.
+            obj_in (models.CursorCreate): The cursor.
 
-        # Extract timestamp from cursor ID
-        created_at = extract_timestamp_from_cursor_id(obj_in.id)
+        Returns:
+            models.Cursor: The created cursor.
+
+        Raises:
+            ValueError: If the cursor ID is malformed.
+        """
+        model_id, timestamp_ms = parse_cursor_id(obj_in.id)
+        newer = db.execute(
+            select(func.count()).where(
+                tuple_(models.Cursor.timestamp_ms, models.Cursor.id) > (timestamp_ms, obj_in.id)
+            )
+        ).scalar_one()
+        db.execute(
+            update(models.Cursor)
+            .where(older_than(obj_in.id))
+            .values(page_number=models.Cursor.page_number + 1)
+        )
 
-        # Create new cursor with calculated page number and extracted timestamp
+        # Create new cursor with calculated page number and parsed timestamp
         db_obj = models.Cursor(
             id=obj_in.id,
             next_cursor_id=obj_in.next_cursor_id,
-            created_at=created_at,
-            page_number=page_number,
+            created_at=extract_timestamp_from_cursor_id(obj_in.id),
+            page_number=newer + 1,
+            model_id=model_id,
+            timestamp_ms=timestamp_ms,
         )
         db.add(db_obj)
+        await browse_day.record(db, cursor_id=obj_in.id, timestamp_ms=timestamp_ms, cursors=1)
         db.commit()
         db.refresh(db_obj)
         return db_obj
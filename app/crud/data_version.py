@@ -0,0 +1,53 @@
+from datetime import UTC, datetime
+
+from sqlmodel import Session
+
+from app import models
+
+from .base import BaseCRUD
+
+GALLERY = "gallery"
+SETTINGS = "settings"
+
+
+class DataVersionCRUD(
+    BaseCRUD[models.DataVersion, models.DataVersionCreate, models.DataVersionRead]
+):
+    async def get_version(self, db: Session, key: str) -> int:
+        """
+        Get the current version of a named piece of data.
+
+        Args:
+            db (Session): The database session.
+            key (str): The data version key, e.g. `GALLERY`.
+
+        Returns:
+            int: The current version, 0 if it was never bumped.
+        """
+        data_version = db.get(self.model, key)
+        return data_version.version if data_version else 0
+
+    async def bump(self, db: Session, key: str) -> int:
+        """
+        Increment the version of a named piece of data, marking every copy derived from
+        the previous version (ETags, cached pages, cached rows) as stale.
+
+        Args:
+            db (Session): The database session.
+            key (str): The data version key, e.g. `GALLERY`.
+
+        Returns:
+            int: The new version.
+        """
+        data_version = db.get(self.model, key)
+        if not data_version:
+            data_version = self.model(id=key, version=0)
+        data_version.version += 1
+        data_version.updated_at = datetime.now(UTC)
+        db.add(data_version)
+        db.commit()
+        db.refresh(data_version)
+        return data_version.version
+
+
+data_version = DataVersionCRUD(models.DataVersion)
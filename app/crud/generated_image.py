@@ -1,18 +1,206 @@
-from sqlmodel import Session
+from typing import Any, Optional
+
+from sqlalchemy import asc, desc, or_, tuple_
+from sqlmodel import Session, select
 
 from app import models
+from app.db.archive import in_store
+from app.models.url_prefix import split_url
 
 from .base import BaseCRUD
+from .browse_day import browse_day
+from .cursor import NEWEST_FIRST, parse_cursor_id
+from .url_prefix import url_prefix
 
 
 class GeneratedImageCRUD(
     BaseCRUD[models.GeneratedImage, models.GeneratedImageCreate, models.GeneratedImageRead]
 ):
+    archived = True
+
+    async def create(
+        self,
+        db: Session,
+        *,
+        obj_in: models.GeneratedImageCreate,
+        record_day: bool = True,
+        **kwargs: Any,
+    ) -> models.GeneratedImage:
+        """
+        Create an image, storing its URL as a shared prefix and its own suffix, and count it
+        in the browse day of its cursor.
+
+        Args:
+            db (Session): The database session.
+            obj_in (models.GeneratedImageCreate): The image.
+            record_day (bool): Count the image in its browse day. Bulk callers turn this off
+                and count a cursor's images with one `browse_day.record` call.
+            kwargs (Any): Other column values.
+
+        Returns:
+            models.GeneratedImage: The created image.
+
+        Raises:
+            RecordAlreadyExistsError: If the image already exists.
+        """
+        prefix, suffix = split_url(obj_in.url)
+        prefix_id = await url_prefix.get_id(db=db, prefix=prefix) if prefix else None
+        if record_day:
+            try:
+                timestamp_ms = parse_cursor_id(obj_in.cursor_id)[1]
+            except ValueError:
+                # Not the id of a cursor, which could not have been created
+                pass
+            else:
+                await browse_day.record(
+                    db, cursor_id=obj_in.cursor_id, timestamp_ms=timestamp_ms, images=1
+                )
+        return await super().create(
+            db, obj_in=obj_in, url_prefix_id=prefix_id, url_suffix=suffix, **kwargs
+        )
+
     async def get_by_cursor(
         self, db: Session, cursor_id: str, skip: int = 0, limit: int = 100
     ) -> list[models.GeneratedImage]:
-        """Get all images for a cursor"""
-        return await self.get_multi(db=db, cursor_id=cursor_id, skip=skip, limit=limit)
+        """Get all images for a cursor, in gallery order, from the store that holds them"""
+        stmt = (
+            select(self.model)
+            .where(self.model.cursor_id == cursor_id)
+            .order_by(asc(self.model.position), asc(self.model.id))
+            .offset(skip)
+            .limit(limit)
+        )
+        for schema in self._stores(db):
+            images = db.exec(stmt, execution_options=in_store(schema)).all()
+            if images:
+                return self._from_store(db, images, schema)
+        return []
+
+    async def get_after(
+        self, db: Session, image: Optional[models.GeneratedImage], limit: int = 10
+    ) -> list[models.GeneratedImage]:
+        """
+        Get the images that follow an image in gallery order, across cursor boundaries.
+
+        Gallery order is the order of the cursor listing, newest (timestamp_ms, id) first,
+        then the API order of the images within a cursor. The cursors are walked on their
+        (timestamp_ms, id) index and their images read from the (cursor_id, position, id)
+        index. The archives follow the main database.
+
+        Args:
+            db (Session): The database session.
+            image (models.GeneratedImage | None): The image to start after, or None to start
+                from the newest image.
+            limit (int): The maximum number of images to return.
+
+        Returns:
+            list[models.GeneratedImage]: The following images, nearest first.
+        """
+        cursor = models.Cursor
+        stmt = select(self.model).join(cursor, cursor.id == self.model.cursor_id)
+        if image is not None:
+            stmt = stmt.where(
+                tuple_(cursor.timestamp_ms, cursor.id) <= self._cursor_key(image),
+                or_(
+                    self.model.cursor_id != image.cursor_id,
+                    tuple_(self.model.position, self.model.id) > tuple_(image.position, image.id),
+                ),
+            )
+        stmt = stmt.order_by(*NEWEST_FIRST, asc(self.model.position), asc(self.model.id))
+        return self._get_in_stores(db, stmt, self._stores(db), limit)
+
+    async def get_timeline(
+        self, db: Session, after_id: Optional[str] = None, limit: int = 24
+    ) -> list[models.GeneratedImage]:
+        """
+        Get the next batch of the global image timeline, regardless of cursor boundaries.
+
+        Args:
+            db (Session): The database session.
+            after_id (str | None): The id of the last image of the previous batch, or None to
+                start from the newest image.
+            limit (int): The maximum number of images to return.
+
+        Returns:
+            list[models.GeneratedImage]: The next images, in gallery order.
+
+        Raises:
+            RecordNotFoundError: If `after_id` does not exist.
+        """
+        after = await self.get(db=db, id=after_id) if after_id else None
+        return await self.get_after(db=db, image=after, limit=limit)
+
+    async def get_before(
+        self, db: Session, image: models.GeneratedImage, limit: int = 10
+    ) -> list[models.GeneratedImage]:
+        """
+        Get the images that precede an image in gallery order, across cursor boundaries.
+
+        Args:
+            db (Session): The database session.
+            image (models.GeneratedImage): The image to start before.
+            limit (int): The maximum number of images to return.
+
+        Returns:
+            list[models.GeneratedImage]: The preceding images, nearest first.
+        """
+        cursor = models.Cursor
+        stmt = (
+            select(self.model)
+            .join(cursor, cursor.id == self.model.cursor_id)
+            .where(
+                tuple_(cursor.timestamp_ms, cursor.id) >= self._cursor_key(image),
+                or_(
+                    self.model.cursor_id != image.cursor_id,
+                    tuple_(self.model.position, self.model.id) < tuple_(image.position, image.id),
+                ),
+            )
+            .order_by(
+                asc(cursor.timestamp_ms),
+                asc(cursor.id),
+                desc(self.model.position),
+                desc(self.model.id),
+            )
+        )
+        return self._get_in_stores(db, stmt, self._stores(db)[::-1], limit)
+
+    @staticmethod
+    def _cursor_key(image: models.GeneratedImage) -> Any:
+        """
+        Get the (timestamp_ms, id) key of an image's cursor, which orders the gallery.
+
+        Args:
+            image (models.GeneratedImage): The image.
+
+        Returns:
+            Any: The key, to compare with `tuple_(Cursor.timestamp_ms, Cursor.id)`.
+        """
+        return tuple_(parse_cursor_id(image.cursor_id)[1], image.cursor_id)
+
+    def _get_in_stores(
+        self, db: Session, stmt: Any, schemas: list[Optional[str]], limit: int
+    ) -> list[models.GeneratedImage]:
+        """
+        Run a query in several stores in turn, until `limit` images are found.
+
+        Args:
+            db (Session): The database session.
+            stmt (Any): The select statement, ordered.
+            schemas (list[str | None]): The stores, in the order of the results.
+            limit (int): The maximum number of images to return.
+
+        Returns:
+            list[models.GeneratedImage]: The images.
+        """
+        images: list[models.GeneratedImage] = []
+        for schema in schemas:
+            found = db.exec(
+                stmt.limit(limit - len(images)), execution_options=in_store(schema)
+            ).all()
+            images.extend(self._from_store(db, found, schema))
+            if len(images) >= limit:
+                break
+        return images
 
 
 generated_image = GeneratedImageCRUD(models.GeneratedImage)
@@ -0,0 +1,151 @@
+from typing import Optional
+
+import heapq
+
+from sqlalchemy import and_, desc, or_, text
+from sqlmodel import Session, select
+
+from app import models
+from app.db.archive import in_store, stores
+
+from .base import BaseCRUD
+
+
+def build_fts_query(query: str) -> str:
+    """
+    Turn free text into an FTS5 MATCH expression.
+
+    Every whitespace separated term is quoted so that characters with a special meaning in
+    the FTS5 query syntax (``-``, ``:``, ``(`` ...) are matched literally. A trailing ``*``
+    on a term is kept as a prefix search.
+
+    Args:
+        query (str): The free text query.
+
+    Returns:
+        str: The FTS5 MATCH expression.
+    """
+    terms = []
+    for term in query.split():
+        prefix = term.endswith("*") and len(term) > 1
+        term = term.rstrip("*").replace('"', '""')
+        if term:
+            terms.append(f'"{term}"*' if prefix else f'"{term}"')
+    return " ".join(terms)
+
+
+class GenerationStepCRUD(
+    BaseCRUD[models.GenerationStep, models.GenerationStepCreate, models.GenerationStepRead]
+):
+    async def search_images(
+        self,
+        db: Session,
+        *,
+        query: Optional[str] = None,
+        base_model: Optional[str] = None,
+        model_id: Optional[int] = None,
+        sampler: Optional[str] = None,
+        seed: Optional[int] = None,
+        before: Optional[models.GeneratedImage] = None,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> list[tuple[models.GeneratedImage, models.GenerationStep]]:
+        """
+        Search generated images by the parameters of the step that produced them.
+
+        The main database and every archive are searched, each through its own full-text
+        index, and the results are merged.
+
+        Args:
+            db (Session): The database session.
+            query (str | None): Free text matched against the prompt and negative prompt.
+            base_model (str | None): Exact base model to filter by.
+            model_id (int | None): Exact checkpoint model version id to filter by.
+            sampler (str | None): Exact sampler to filter by.
+            seed (int | None): Exact image seed to filter by.
+            before (GeneratedImage | None): Keyset pagination, only return images that come
+                after this one in the results.
+            skip (int): The number of rows to skip.
+            limit (int): The maximum number of rows to return.
+
+        Returns:
+            list[tuple[GeneratedImage, GenerationStep]]: Matching images with their step,
+                newest first.
+        """
+        statement = select(models.GeneratedImage, models.GenerationStep).join(
+            models.GenerationStep,
+            models.GeneratedImage.step_id == models.GenerationStep.id,  # type: ignore
+        )
+
+        if base_model:
+            statement = statement.where(models.GenerationStep.base_model == base_model)
+        if model_id is not None:
+            statement = statement.where(models.GenerationStep.model_id == model_id)
+        if sampler:
+            statement = statement.where(models.GenerationStep.sampler == sampler)
+        if seed is not None:
+            statement = statement.where(models.GeneratedImage.seed == seed)
+        if before is not None:
+            statement = statement.where(
+                or_(
+                    models.GeneratedImage.created_at < before.created_at,
+                    and_(
+                        models.GeneratedImage.created_at == before.created_at,
+                        models.GeneratedImage.id < before.id,
+                    ),
+                )
+            )
+
+        statement = statement.order_by(
+            desc(models.GeneratedImage.created_at), desc(models.GeneratedImage.id)
+        ).limit(skip + limit)
+
+        fts_query = build_fts_query(query) if query else ""
+        found: list[list[tuple[models.GeneratedImage, models.GenerationStep]]] = []
+        for schema in stores(db):
+            store_statement = statement
+            if fts_query:
+                # Raw SQL is not schema translated, so the index of the store is named here
+                fts_table = f"{schema}.generation_step_fts" if schema else "generation_step_fts"
+                store_statement = statement.where(
+                    text(
+                        f"generation_step.rowid IN (SELECT rowid FROM {fts_table} "
+                        "WHERE generation_step_fts MATCH :fts_query)"
+                    ).bindparams(fts_query=fts_query)
+                )
+            rows = db.execute(store_statement, execution_options=in_store(schema)).all()
+            if schema is not None:
+                # Archived rows are read-only, see `BaseCRUD._from_store`; a step can come
+                # with several of its images
+                for row in rows:
+                    for obj in row:
+                        if obj in db:
+                            db.expunge(obj)
+            found.append([(row[0], row[1]) for row in rows])
+
+        results = heapq.merge(*found, key=lambda row: (row[0].created_at, row[0].id), reverse=True)
+        return list(results)[skip : skip + limit]
+
+    async def get_distinct_values(self, db: Session, column: str) -> list[str]:
+        """
+        Get the distinct non-null values of an indexed column, for search filters, from the
+        main database and the archives.
+
+        Args:
+            db (Session): The database session.
+            column (str): The column name, e.g. ``sampler`` or ``base_model``.
+
+        Returns:
+            list[str]: The sorted distinct values.
+        """
+        model_column = getattr(models.GenerationStep, column)
+        statement = (
+            select(model_column).where(model_column.isnot(None)).distinct().order_by(model_column)
+        )
+        values = set()
+        for schema in stores(db):
+            values.update(db.execute(statement, execution_options=in_store(schema)).scalars())
+        return sorted(values)
+
+
+generation_step = GenerationStepCRUD(models.GenerationStep)
@@ -0,0 +1,64 @@
+from typing import Optional
+
+from dataclasses import asdict
+from datetime import UTC, datetime
+
+from sqlalchemy import desc
+from sqlmodel import Session, select
+
+from app import models
+from app.core.civit import ImportStats
+
+from .base import BaseCRUD
+
+
+class ImportRunCRUD(BaseCRUD[models.ImportRun, models.ImportRunCreate, models.ImportRunUpdate]):
+    async def get_recent(
+        self, db: Session, *, before: Optional[int] = None, limit: int = 50
+    ) -> list[models.ImportRun]:
+        """
+        Get a keyset page of import runs, newest first.
+
+        Args:
+            db (Session): The database session.
+            before (int | None): Only return runs older than this run id.
+            limit (int): The maximum number of runs to return.
+
+        Returns:
+            list[models.ImportRun]: The import runs.
+        """
+        stmt = select(models.ImportRun)
+        if before:
+            stmt = stmt.where(models.ImportRun.id < before)
+        stmt = stmt.order_by(desc(models.ImportRun.id)).limit(limit)
+        return db.exec(stmt).all()
+
+    async def finish(
+        self,
+        db: Session,
+        *,
+        run_id: int,
+        stats: ImportStats,
+        status: models.ImportStatus,
+        error: Optional[str] = None,
+    ) -> models.ImportRun:
+        """
+        Record the outcome and stats of an import run.
+
+        Args:
+            db (Session): The database session.
+            run_id (int): The import run id.
+            stats (ImportStats): What the import did.
+            status (models.ImportStatus): How the import ended.
+            error (str | None): The error of a failed import.
+
+        Returns:
+            models.ImportRun: The finished import run.
+        """
+        obj_in = models.ImportRunUpdate(
+            status=status.value, finished_at=datetime.now(UTC), error=error, **asdict(stats)
+        )
+        return await self.update(db=db, id=run_id, obj_in=obj_in)
+
+
+import_run = ImportRunCRUD(models.ImportRun)
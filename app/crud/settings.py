@@ -1,13 +1,71 @@
+from typing import Any, Optional
+
+import time
+from threading import Lock
+
+from sqlalchemy.sql.elements import BinaryExpression
 from sqlmodel import Session
 
 from app import models
+from app import settings as app_settings
+from app.core import metrics
 
 from .base import BaseCRUD
+from .data_version import SETTINGS, data_version
 
 
 class SettingsCRUD(BaseCRUD[models.Settings, models.SettingsCreate, models.SettingsRead]):
+    """
+    Settings CRUD, with an in-memory copy of the current settings row.
+
+    The copy is trusted for `SETTINGS_CACHE_TTL_SECONDS`, then revalidated against the
+    `settings` data version, which `update` bumps. An update in this process applies
+    immediately; other workers pick it up within the TTL, including a running import.
+    """
+
+    def __init__(self, model: type[models.Settings]) -> None:
+        super().__init__(model=model)
+        self._cached: Optional[models.Settings] = None
+        self._cached_version = 0
+        self._checked_at = 0.0
+        self._lock = Lock()
+
     async def get_current(self, db: Session) -> models.Settings:
-        """Get current settings"""
+        """
+        Get current settings.
+
+        Args:
+            db (Session): The database session.
+
+        Returns:
+            models.Settings: A detached copy of the current settings.
+        """
+        with self._lock:
+            cached, cached_version, checked_at = (
+                self._cached,
+                self._cached_version,
+                self._checked_at,
+            )
+        now = time.monotonic()
+        if cached is not None and now - checked_at < app_settings.SETTINGS_CACHE_TTL_SECONDS:
+            metrics.record_cache("settings", hit=True)
+            return cached
+
+        version = await data_version.get_version(db=db, key=SETTINGS)
+        if cached is not None and version == cached_version:
+            with self._lock:
+                self._checked_at = now
+            metrics.record_cache("settings", hit=True)
+            return cached
+
+        metrics.record_cache("settings", hit=False)
+        current = await self._get_or_create_current(db=db)
+        snapshot = self.model(**current.dict())
+        with self._lock:
+            self._cached, self._cached_version, self._checked_at = snapshot, version, now
+        return snapshot
+
+    async def _get_or_create_current(self, db: Session) -> models.Settings:
         results = await self.get_multi(db=db, skip=0, limit=1)
         if not results:
             # Create default settings
@@ -15,5 +73,46 @@ class SettingsCRUD(BaseCRUD[models.Settings, models.SettingsCreate, models.Setti
             return await self.create(db, obj_in=settings_create)
         return results[0]
 
+    async def update(
+        self,
+        db: Session,
+        *args: BinaryExpression[Any],
+        obj_in: models.SettingsRead,
+        exclude_none: bool = True,
+        exclude_unset: bool = True,
+        **kwargs: Any,
+    ) -> models.Settings:
+        """
+        Update the settings, and invalidate every cached copy of them.
+
+        Args:
+            db (Session): The database session.
+            args (BinaryExpression): Binary expressions to filter by.
+            obj_in (models.SettingsRead): The updated settings.
+            exclude_none (bool): Whether to exclude None values from the update.
+            exclude_unset (bool): Whether to exclude unset values from the update.
+            kwargs (Any): Keyword arguments to filter by.
+
+        Returns:
+            models.Settings: The updated settings.
+        """
+        db_settings = await super().update(
+            db,
+            *args,
+            obj_in=obj_in,
+            exclude_none=exclude_none,
+            exclude_unset=exclude_unset,
+            **kwargs,
+        )
+        await data_version.bump(db=db, key=SETTINGS)
+        self.clear_cache()
+        return db_settings
+
+    def clear_cache(self) -> None:
+        """Drop the cached copy of the current settings in this process."""
+        with self._lock:
+            self._cached = None
+            self._checked_at = 0.0
+
 
 settings = SettingsCRUD(models.Settings)
@@ -0,0 +1,65 @@
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session as SASession
+from sqlmodel import Session, select
+
+from app import models
+
+from .base import BaseCRUD
+
+# Session info key of the prefix -> id map of the URL prefixes seen in the session
+PREFIX_IDS = "url_prefix_ids"
+
+
+class UrlPrefixCRUD(BaseCRUD[models.UrlPrefix, models.UrlPrefixCreate, models.UrlPrefixRead]):
+    async def get_or_create(self, db: Session, prefix: str) -> models.UrlPrefix:
+        """
+        Get the row of a URL prefix, adding it if it is new.
+
+        The new row is flushed, not committed, so it is saved with the image that uses it.
+
+        Args:
+            db (Session): The database session.
+            prefix (str): The URL prefix, from `split_url`.
+
+        Returns:
+            models.UrlPrefix: The URL prefix.
+        """
+        url_prefix = db.exec(select(self.model).where(self.model.prefix == prefix)).first()
+        if url_prefix is None:
+            url_prefix = self.model(prefix=prefix)
+            db.add(url_prefix)
+            db.flush()
+        return url_prefix
+
+    async def get_id(self, db: Session, prefix: str) -> int:
+        """
+        Get the id of a URL prefix, adding it if it is new.
+
+        Ids are kept in the session, so an import, which shares one session and a handful
+        of prefixes across all its images, looks every prefix up once. The ids are dropped
+        on any rollback, savepoints included, which may undo a new prefix.
+
+        Args:
+            db (Session): The database session.
+            prefix (str): The URL prefix, from `split_url`.
+
+        Returns:
+            int: The id of the URL prefix.
+        """
+        ids: dict[str, int] = db.info.setdefault(PREFIX_IDS, {})
+        prefix_id = ids.get(prefix)
+        if prefix_id is None:
+            prefix_id = ids[prefix] = (await self.get_or_create(db=db, prefix=prefix)).id
+        return prefix_id
+
+
+@event.listens_for(SASession, "after_soft_rollback")  # type: ignore
+def _forget_prefix_ids(
+    session: SASession, previous_transaction: Any  # pylint: disable=unused-argument
+) -> None:
+    session.info.pop(PREFIX_IDS, None)
+
+
+url_prefix = UrlPrefixCRUD(models.UrlPrefix)
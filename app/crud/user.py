@@ -1,7 +1,12 @@
+from typing import Any
+
+from sqlalchemy.sql.elements import BinaryExpression
 from sqlmodel import Session
 
 from app import models
 from app.core import security
+from app.core.auth_cache import auth_cache
+from app.core.executor import run_blocking
 
 from .base import BaseCRUD
 
@@ -21,7 +26,9 @@ class UserCRUD(BaseCRUD[models.User, models.UserCreate, models.UserUpdate]):
             models.User: The created user.
         """
         obj_in_data = obj_in.dict(exclude_unset=True)
-        obj_in_data["hashed_password"] = security.get_password_hash(obj_in_data["password"])
+        obj_in_data["hashed_password"] = await run_blocking(
+            security.get_password_hash, obj_in_data["password"]
+        )
         del obj_in_data["password"]
 
         out_obj = models.UserCreate(**obj_in_data)
@@ -45,12 +52,61 @@ class UserCRUD(BaseCRUD[models.User, models.UserCreate, models.UserUpdate]):
         _user = await self.get_or_none(db, username=username)
         if not _user:
             return None
-        if not security.verify_password(
-            plain_password=password, hashed_password=_user.hashed_password
+        if not await run_blocking(
+            security.verify_password,
+            plain_password=password,
+            hashed_password=_user.hashed_password,
         ):
             return None
         return _user
 
+    async def update(
+        self,
+        db: Session,
+        *args: BinaryExpression[Any],
+        obj_in: models.UserUpdate,
+        exclude_none: bool = True,
+        exclude_unset: bool = True,
+        **kwargs: Any,
+    ) -> models.User:
+        """
+        Update a user, and drop its cached snapshot so the change applies on the next request.
+
+        Args:
+            db (Session): The database session.
+            args (BinaryExpression): Binary expressions to filter by.
+            obj_in (models.UserUpdate): The updated user.
+            exclude_none (bool): Whether to exclude None values from the update.
+            exclude_unset (bool): Whether to exclude unset values from the update.
+            kwargs (Any): Keyword arguments to filter by.
+
+        Returns:
+            models.User: The updated user.
+        """
+        db_user = await super().update(
+            db,
+            *args,
+            obj_in=obj_in,
+            exclude_none=exclude_none,
+            exclude_unset=exclude_unset,
+            **kwargs,
+        )
+        auth_cache.invalidate_user(db_user.id)
+        return db_user
+
+    async def remove(self, db: Session, *args: BinaryExpression[Any], **kwargs: Any) -> None:
+        """
+        Delete a user, and drop its cached snapshot.
+
+        Args:
+            db (Session): The database session.
+            args (BinaryExpression): Binary expressions to filter by.
+            kwargs (Any): Keyword arguments to filter by.
+        """
+        db_user = await self.get(*args, db=db, **kwargs)
+        await super().remove(db, self.model.id == db_user.id)
+        auth_cache.invalidate_user(db_user.id)
+
     def is_active(self, _user: models.User) -> bool:
         return _user.is_active
 
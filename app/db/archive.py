@@ -0,0 +1,196 @@
+from typing import Any, Optional
+
+import re
+import sqlite3
+from pathlib import Path
+
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, SQLModel, create_engine
+
+from app import logger, models, paths
+
+ARCHIVE_SCHEMA_PREFIX = "archive_"
+ARCHIVE_FILE = re.compile(r"^archive-(\d{4})\.sqlite3$")
+
+
+class ArchiveLimitError(RuntimeError):
+    """There are more archive files than SQLite can attach to a connection."""
+
+
+def archive_file(year: int) -> Path:
+    """
+    Get the archive file of a year.
+
+    Args:
+        year (int): The year of the archived cursors.
+
+    Returns:
+        Path: The file, in `paths.ARCHIVE_PATH`.
+    """
+    return paths.ARCHIVE_PATH / f"archive-{year}.sqlite3"
+
+
+def archive_schema(year: int) -> str:
+    """
+    Get the schema name an archive file is attached as.
+
+    Args:
+        year (int): The year of the archived cursors.
+
+    Returns:
+        str: The schema name, e.g. `archive_2023`.
+    """
+    return f"{ARCHIVE_SCHEMA_PREFIX}{year}"
+
+
+def archive_years() -> list[int]:
+    """
+    Get the years that have an archive file.
+
+    Returns:
+        list[int]: The years, newest first.
+    """
+    if not paths.ARCHIVE_PATH.is_dir():
+        return []
+    matches = (ARCHIVE_FILE.match(path.name) for path in paths.ARCHIVE_PATH.iterdir())
+    return sorted((int(match.group(1)) for match in matches if match), reverse=True)
+
+
+def attach_limit(connection: Connection) -> int:
+    """
+    Get the number of databases SQLite lets a connection attach.
+
+    Args:
+        connection (Connection): The connection.
+
+    Returns:
+        int: The limit, `SQLITE_MAX_ATTACHED`, which is 10 unless SQLite was built with
+            another value.
+    """
+    return int(connection.connection.dbapi_connection.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED))
+
+
+def create_archive(year: int) -> Path:
+    """
+    Create the archive file of a year, with the tables of the archived rows.
+
+    Args:
+        year (int): The year of the archived cursors.
+
+    Returns:
+        Path: The archive file. An existing file is left as it is.
+    """
+    path = archive_file(year)
+    if path.exists():
+        return path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    engine = create_engine(f"sqlite:///{path}")
+    try:
+        SQLModel.metadata.create_all(
+            bind=engine,
+            tables=[
+                models.Cursor.__table__,
+                models.GenerationStep.__table__,
+                models.UrlPrefix.__table__,
+                models.GeneratedImage.__table__,
+            ],
+        )
+    finally:
+        engine.dispose()
+    logger.info(f"Created archive {path}")
+    return path
+
+
+def attach_archives(connection: Connection) -> list[str]:
+    """
+    Attach the archive files that are not attached to a connection yet.
+
+    The archive directory is only listed when its modification time changed since the
+    last call on this connection, so in the common case this costs a single `stat`.
+    SQLite refuses to ATTACH inside a write transaction; the files left out are attached by
+    a later call. Any other failure is raised, as the rows of an archive that is not
+    attached would silently be missing from every read.
+
+    Args:
+        connection (Connection): The connection.
+
+    Returns:
+        list[str]: The attached archive schemas, newest year first.
+
+    Raises:
+        ArchiveLimitError: If there are more archive files than SQLite can attach.
+        OperationalError: If an archive file cannot be attached.
+    """
+    try:
+        state = (str(paths.ARCHIVE_PATH), paths.ARCHIVE_PATH.stat().st_mtime_ns)
+    except FileNotFoundError:
+        return connection.info.get("archives", [])
+    if connection.info.get("archive_state") == state:
+        return connection.info["archives"]
+
+    years = archive_years()
+    limit = attach_limit(connection)
+    if len(years) > limit:
+        # Reading some of the history but not the rest would silently drop the rest
+        message = (
+            f"{len(years)} archive files in {paths.ARCHIVE_PATH}, but SQLite attaches at "
+            f"most {limit}, so the archived history cannot be read"
+        )
+        logger.error(message)
+        raise ArchiveLimitError(message)
+
+    attached = {row[1] for row in connection.exec_driver_sql("PRAGMA database_list")}
+    complete = True
+    for year in years:
+        schema = archive_schema(year)
+        if schema in attached:
+            continue
+        path = archive_file(year)
+        try:
+            connection.exec_driver_sql(f"ATTACH DATABASE ? AS {schema}", (str(path),))
+        except OperationalError as exc:
+            if "within transaction" not in str(exc):
+                logger.error("Could not attach archive {}: {}", path, exc)
+                raise
+            logger.debug("Could not attach archive {} yet: {}", path, exc)
+            complete = False
+            continue
+        attached.add(schema)
+
+    archives = sorted(
+        (schema for schema in attached if schema.startswith(ARCHIVE_SCHEMA_PREFIX)), reverse=True
+    )
+    connection.info["archives"] = archives
+    if complete:
+        connection.info["archive_state"] = state
+    return archives
+
+
+def stores(db: Session) -> list[Optional[str]]:
+    """
+    Get the stores rows are read from: the main database, then the archives.
+
+    Args:
+        db (Session): The database session.
+
+    Returns:
+        list[str | None]: None for the main database, then the archive schemas, newest
+            year first, so the stores are in newest-first order.
+    """
+    return [None, *attach_archives(db.connection())]
+
+
+def in_store(schema: Optional[str]) -> dict[str, Any]:
+    """
+    Get the execution options that run a statement against a store.
+
+    Args:
+        schema (str | None): The archive schema, or None for the main database.
+
+    Returns:
+        dict[str, Any]: The execution options.
+    """
+    if schema is None:
+        return {}
+    return {"schema_translate_map": {None: schema}}
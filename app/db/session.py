@@ -2,6 +2,7 @@ from sqlalchemy.orm import sessionmaker
 from sqlmodel import Session, create_engine
 
 from app import paths, settings
+from app.core.query_stats import instrument_engine
 
 db_url = f"sqlite:///{paths.DATABASE_FILE}"
 engine = create_engine(
@@ -11,4 +12,6 @@ engine = create_engine(
     pool_pre_ping=True,
 )
 
+instrument_engine(engine)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=Session)
@@ -1,22 +1,54 @@
 """Models package."""
 
-from .alerts import Alerts
-from .cursor import Cursor, CursorCreate, CursorRead
-from .generated_image import GeneratedImage, GeneratedImageCreate, GeneratedImageRead
-from .msg import Msg
-from .server import HealthCheck
-from .settings_store import Settings, SettingsCreate, SettingsRead
-from .tokens import TokenPayload, Tokens
-from .user import User, UserCreate, UserCreateWithPassword, UserLogin, UserRead, UserUpdate
+from typing import TYPE_CHECKING, Any
+
+import importlib
+
+if TYPE_CHECKING:
+    from .alerts import Alerts
+    from .browse_day import BrowseDay, BrowseDayCreate, BrowseDayRead
+    from .cursor import Cursor, CursorCreate, CursorRead
+    from .data_version import DataVersion, DataVersionCreate, DataVersionRead
+    from .generated_image import GeneratedImage, GeneratedImageCreate, GeneratedImageRead
+    from .generation_step import GenerationStep, GenerationStepCreate, GenerationStepRead
+    from .import_run import (
+        ImportRun,
+        ImportRunCreate,
+        ImportRunRead,
+        ImportRunUpdate,
+        ImportStatus,
+        ImportTrigger,
+    )
+    from .msg import Msg
+    from .server import HealthCheck
+    from .settings_store import Settings, SettingsCreate, SettingsRead
+    from .tokens import TokenPayload, Tokens
+    from .url_prefix import UrlPrefix, UrlPrefixCreate, UrlPrefixRead
+    from .user import User, UserCreate, UserCreateWithPassword, UserLogin, UserRead, UserUpdate
 
 __all__ = [
     "Alerts",
+    "BrowseDay",
+    "BrowseDayCreate",
+    "BrowseDayRead",
     "Cursor",
     "CursorCreate",
     "CursorRead",
+    "DataVersion",
+    "DataVersionCreate",
+    "DataVersionRead",
     "GeneratedImage",
     "GeneratedImageCreate",
     "GeneratedImageRead",
+    "GenerationStep",
+    "GenerationStepCreate",
+    "GenerationStepRead",
+    "ImportRun",
+    "ImportRunCreate",
+    "ImportRunRead",
+    "ImportRunUpdate",
+    "ImportStatus",
+    "ImportTrigger",
     "Msg",
     "HealthCheck",
     "Settings",
@@ -24,6 +56,9 @@ __all__ = [
     "SettingsRead",
     "TokenPayload",
     "Tokens",
+    "UrlPrefix",
+    "UrlPrefixCreate",
+    "UrlPrefixRead",
     "User",
     "UserCreate",
     "UserCreateWithPassword",
@@ -31,3 +66,49 @@ __all__ = [
     "UserRead",
     "UserUpdate",
 ]
+
+# The models are imported on first use. `app.models.settings` is imported on every start-up
+# for the app settings, and importing every model with it loads SQLModel and FastAPI, which
+# most CLI commands never use.
+_MODULES = (
+    "alerts",
+    "browse_day",
+    "cursor",
+    "data_version",
+    "generated_image",
+    "generation_step",
+    "import_run",
+    "msg",
+    "server",
+    "settings_store",
+    "tokens",
+    "url_prefix",
+    "user",
+)
+
+
+def __getattr__(name: str) -> Any:
+    """
+    Import the models on first use.
+
+    Every model module is imported at once, so relationships between the tables always
+    resolve.
+
+    Args:
+        name (str): The attribute name.
+
+    Returns:
+        Any: The model.
+
+    Raises:
+        AttributeError: If `name` is not a model.
+    """
+    if name not in __all__:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    for module_name in _MODULES:
+        module = importlib.import_module(f".{module_name}", __name__)
+        for export in __all__:
+            value = vars(module).get(export)
+            if getattr(value, "__module__", None) == module.__name__:
+                globals()[export] = value
+    return globals()[name]
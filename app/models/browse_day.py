@@ -0,0 +1,34 @@
+from datetime import date
+
+from sqlmodel import Field, SQLModel
+
+
+class BrowseDayBase(SQLModel):
+    """
+    Base model for browse days: the image and cursor counts of one day of the history (UTC),
+    and the cursor the day starts at when browsing newest first.
+    """
+
+    day: date = Field(primary_key=True)
+    cursor_count: int = Field(default=0, nullable=False)
+    image_count: int = Field(default=0, nullable=False)
+    first_cursor_id: str = Field(nullable=False)
+    first_timestamp_ms: int = Field(nullable=False)
+
+
+class BrowseDay(BrowseDayBase, table=True):
+    """Browse day model for database."""
+
+    __tablename__ = "browse_day"
+
+
+class BrowseDayCreate(BrowseDayBase):
+    """Model for creating browse days."""
+
+    pass
+
+
+class BrowseDayRead(BrowseDayBase):
+    """Model for reading browse days."""
+
+    pass
@@ -2,6 +2,7 @@ from typing import TYPE_CHECKING, Optional
 
 from datetime import UTC, datetime
 
+from sqlalchemy import Index
 from sqlmodel import Field, Relationship, SQLModel
 
 from .common import TimestampModel
@@ -19,7 +20,15 @@ class CursorBase(SQLModel):
 
 
 class Cursor(CursorBase, TimestampModel, table=True):
-    """Cursor model for database."""
+    """
+    Cursor model for database.
+
+    The model id and the timestamp in the cursor id (`modelid-YYYYMMDDHHmmssSSS`) are
+    parsed on insert into `model_id` and `timestamp_ms` (epoch milliseconds). Cursors are
+    ordered by `(timestamp_ms, id)`, which sorts chronologically whatever the model id.
+    """
+
+    __table_args__ = (Index("ix_cursor_timestamp_ms_id", "timestamp_ms", "id"),)
 
     images: list["GeneratedImage"] = Relationship(back_populates="cursor")
     next_cursor: Optional["Cursor"] = Relationship(
@@ -34,6 +43,8 @@ class Cursor(CursorBase, TimestampModel, table=True):
         sa_relationship_kwargs={"remote_side": lambda: [Cursor.next_cursor_id]},
     )
     page_number: Optional[int] = Field(default=None)
+    model_id: int = Field(nullable=False, index=True)
+    timestamp_ms: int = Field(nullable=False)
 
 
 class CursorCreate(CursorBase):
@@ -0,0 +1,28 @@
+from sqlmodel import Field, SQLModel
+
+from .common import TimestampModel
+
+
+class DataVersionBase(SQLModel):
+    """Base model for data versions (a named counter bumped whenever that data changes)."""
+
+    id: str = Field(primary_key=True)
+    version: int = Field(default=0, nullable=False)
+
+
+class DataVersion(DataVersionBase, TimestampModel, table=True):
+    """Data version model for database."""
+
+    __tablename__ = "data_version"
+
+
+class DataVersionCreate(DataVersionBase):
+    """Model for creating data versions."""
+
+    pass
+
+
+class DataVersionRead(DataVersionBase):
+    """Model for reading data versions."""
+
+    pass
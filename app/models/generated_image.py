@@ -1,40 +1,67 @@
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 from datetime import UTC, datetime
 
+from sqlalchemy import Index
 from sqlmodel import Field, Relationship, SQLModel
 
 from .common import TimestampModel
 
 if TYPE_CHECKING:
     from .cursor import Cursor
+    from .generation_step import GenerationStep
+    from .url_prefix import UrlPrefix
 
 
 class GeneratedImageBase(SQLModel):
     """Base model for generated images."""
 
     id: str = Field(primary_key=True)
-    url: str = Field(index=True)
     width: int
     height: int
     cursor_id: str = Field(foreign_key="cursor.id")
+    step_id: Optional[str] = Field(default=None, foreign_key="generation_step.id", index=True)
+    seed: Optional[int] = Field(default=None, index=True)
+    position: int = Field(default=0)
     created_at: datetime = Field(default_factory=lambda: datetime.now(UTC), nullable=False)
 
 
 class GeneratedImage(GeneratedImageBase, TimestampModel, table=True):
-    """Generated image model for database."""
+    """
+    Generated image model for database.
+
+    The URL is stored as a shared `url_prefix` row plus the image's own `url_suffix`, since
+    all images on the Civitai CDN have the same long prefix. The prefix is loaded with the
+    image, in the same query.
+
+    `position` is the place of the image in its cursor's page, in the order of the Civitai
+    API, which is the order images are shown in within a cursor.
+    """
 
     __tablename__ = "generated_image"
+    __table_args__ = (
+        Index("ix_generated_image_cursor_id_position", "cursor_id", "position", "id"),
+    )
+    url_prefix_id: Optional[int] = Field(default=None, foreign_key="url_prefix.id")
+    url_suffix: str = Field(nullable=False)
     cursor: "Cursor" = Relationship(back_populates="images")
+    step: Optional["GenerationStep"] = Relationship(back_populates="images")
+    url_prefix: Optional["UrlPrefix"] = Relationship(sa_relationship_kwargs={"lazy": "joined"})
+
+    @property
+    def url(self) -> str:
+        """The full URL of the image."""
+        prefix = self.url_prefix.prefix if self.url_prefix else ""
+        return prefix + self.url_suffix
 
 
 class GeneratedImageCreate(GeneratedImageBase):
     """Model for creating generated images."""
 
-    pass
+    url: str
 
 
 class GeneratedImageRead(GeneratedImageBase):
     """Model for reading generated images."""
 
-    pass
+    url: str
@@ -0,0 +1,73 @@
+from typing import TYPE_CHECKING, Optional
+
+from datetime import UTC, datetime
+
+from sqlalchemy import DDL, event
+from sqlmodel import Field, Relationship, SQLModel
+
+from .common import TimestampModel
+
+if TYPE_CHECKING:
+    from .generated_image import GeneratedImage
+
+
+class GenerationStepBase(SQLModel):
+    """Base model for generation steps (the parameters an image was generated with)."""
+
+    id: str = Field(primary_key=True)
+    workflow_id: str = Field(index=True)
+    cursor_id: str = Field(foreign_key="cursor.id", index=True)
+    prompt: Optional[str] = Field(default=None)
+    negative_prompt: Optional[str] = Field(default=None)
+    base_model: Optional[str] = Field(default=None, index=True)
+    model_id: Optional[int] = Field(default=None, index=True)
+    sampler: Optional[str] = Field(default=None, index=True)
+    seed: Optional[int] = Field(default=None)
+    steps: Optional[int] = Field(default=None)
+    cfg_scale: Optional[float] = Field(default=None)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(UTC), nullable=False)
+
+
+class GenerationStep(GenerationStepBase, TimestampModel, table=True):
+    """Generation step model for database."""
+
+    __tablename__ = "generation_step"
+    images: list["GeneratedImage"] = Relationship(back_populates="step")
+
+
+class GenerationStepCreate(GenerationStepBase):
+    """Model for creating generation steps."""
+
+    pass
+
+
+class GenerationStepRead(GenerationStepBase):
+    """Model for reading generation steps."""
+
+    pass
+
+
+# Full-text index over the prompt text. It is an external-content FTS5 table kept in sync
+# with `generation_step` by triggers, so the prompt text is only stored once.
+FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS generation_step_fts USING fts5("
+    "prompt, negative_prompt, content='generation_step', content_rowid='rowid')",
+    "CREATE TRIGGER IF NOT EXISTS generation_step_fts_ai AFTER INSERT ON generation_step BEGIN "
+    "INSERT INTO generation_step_fts(rowid, prompt, negative_prompt) "
+    "VALUES (new.rowid, new.prompt, new.negative_prompt); END",
+    "CREATE TRIGGER IF NOT EXISTS generation_step_fts_ad AFTER DELETE ON generation_step BEGIN "
+    "INSERT INTO generation_step_fts(generation_step_fts, rowid, prompt, negative_prompt) "
+    "VALUES ('delete', old.rowid, old.prompt, old.negative_prompt); END",
+    "CREATE TRIGGER IF NOT EXISTS generation_step_fts_au AFTER UPDATE ON generation_step BEGIN "
+    "INSERT INTO generation_step_fts(generation_step_fts, rowid, prompt, negative_prompt) "
+    "VALUES ('delete', old.rowid, old.prompt, old.negative_prompt); "
+    "INSERT INTO generation_step_fts(rowid, prompt, negative_prompt) "
+    "VALUES (new.rowid, new.prompt, new.negative_prompt); END",
+]
+
+for _statement in FTS_DDL:
+    event.listen(
+        GenerationStep.__table__,  # type: ignore
+        "after_create",
+        DDL(_statement).execute_if(dialect="sqlite"),
+    )
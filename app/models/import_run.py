@@ -0,0 +1,108 @@
+from typing import Optional
+
+from datetime import UTC, datetime
+from enum import Enum
+
+from sqlmodel import Field, SQLModel
+
+from .common import TimestampModel
+
+
+class ImportTrigger(str, Enum):
+    """What started an import."""
+
+    MANUAL = "manual"
+    SCHEDULED = "scheduled"
+    API = "api"
+
+
+class ImportStatus(str, Enum):
+    """The state of an import."""
+
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class ImportRunBase(SQLModel):
+    """
+    Base model for import runs: one row per import from Civitai.
+
+    The time of an import is split across four stages: `fetch` (waiting for Civitai),
+    `parse` (decoding the responses), `db` (looking up and inserting rows) and `relink`
+    (repointing `next_cursor_id` to keep the cursor chain intact).
+    """
+
+    trigger: str = Field(default=ImportTrigger.MANUAL.value, nullable=False)
+    status: str = Field(default=ImportStatus.RUNNING.value, nullable=False)
+    start_cursor_id: Optional[str] = Field(default=None)
+    started_at: datetime = Field(default_factory=lambda: datetime.now(UTC), nullable=False)
+    finished_at: Optional[datetime] = Field(default=None)
+    error: Optional[str] = Field(default=None)
+    pages_fetched: int = Field(default=0, nullable=False)
+    cursors_imported: int = Field(default=0, nullable=False)
+    images_inserted: int = Field(default=0, nullable=False)
+    images_skipped: int = Field(default=0, nullable=False)
+    bytes_downloaded: int = Field(default=0, nullable=False)
+    fetch_seconds: float = Field(default=0.0, nullable=False)
+    parse_seconds: float = Field(default=0.0, nullable=False)
+    db_seconds: float = Field(default=0.0, nullable=False)
+    relink_seconds: float = Field(default=0.0, nullable=False)
+
+
+class ImportRun(ImportRunBase, TimestampModel, table=True):
+    """Import run model for database."""
+
+    __tablename__ = "import_run"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+
+    @property
+    def duration_seconds(self) -> Optional[float]:
+        """The wall-clock time of the import, or None while it runs."""
+        if not self.finished_at:
+            return None
+        return (self.finished_at - self.started_at).total_seconds()
+
+    @property
+    def images_per_second(self) -> Optional[float]:
+        """The import throughput, or None while it runs."""
+        duration = self.duration_seconds
+        return self.images_inserted / duration if duration else None
+
+    @property
+    def bound(self) -> Optional[str]:
+        """Whether the import spent most of its time on the `network` or the `disk`."""
+        local_seconds = self.parse_seconds + self.db_seconds + self.relink_seconds
+        if not self.fetch_seconds and not local_seconds:
+            return None
+        return "network" if self.fetch_seconds >= local_seconds else "disk"
+
+
+class ImportRunCreate(ImportRunBase):
+    """Model for creating import runs."""
+
+    pass
+
+
+class ImportRunUpdate(SQLModel):
+    """Model for finishing import runs."""
+
+    status: Optional[str] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+    pages_fetched: Optional[int] = None
+    cursors_imported: Optional[int] = None
+    images_inserted: Optional[int] = None
+    images_skipped: Optional[int] = None
+    bytes_downloaded: Optional[int] = None
+    fetch_seconds: Optional[float] = None
+    parse_seconds: Optional[float] = None
+    db_seconds: Optional[float] = None
+    relink_seconds: Optional[float] = None
+
+
+class ImportRunRead(ImportRunBase):
+    """Model for reading import runs."""
+
+    id: int
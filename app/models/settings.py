@@ -8,9 +8,18 @@ class Settings(BaseSettings):
 
     # Log
     LOG_LEVEL: str = "INFO"
+    LOG_ENQUEUE: bool = True
 
     # Database
     DATABASE_ECHO: bool = False
+    QUERY_WARNING_THRESHOLD: int = 50
+    QUERY_REPEAT_THRESHOLD: int = 10
+    SERVER_TIMING_ENABLED: bool = True
+    SLOW_QUERY_THRESHOLD_MS: int = 100
+    SLOW_QUERY_LOG_SIZE: int = 100
+    SLOW_QUERY_EXPLAIN: bool = True
+    CURSOR_BATCH_SIZE: int = 1000
+    ARCHIVE_AFTER_DAYS: int = 365
 
     # Server
     SERVER_HOST: str = "0.0.0.0"
@@ -21,6 +30,29 @@ class Settings(BaseSettings):
     UVICORN_RELOAD: bool = True
     UVICORN_ENTRYPOINT: str = "app.core.app:app"
     UVICORN_WORKERS: int = 1
+    BLOCKING_EXECUTOR_WORKERS: int = 4
+    BLOCKING_EXECUTOR_QUEUE_WARNING: int = 8
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 500
+    METRICS_ENABLED: bool = True
+    METRICS_TOKEN: str = ""
+    PROFILING_ENABLED: bool = False
+    PROFILING_SAMPLE_RATE: int = 0
+    PROFILING_MAX_FILES: int = 100
+
+    # Templates
+    JINJA_BYTECODE_CACHE_ENABLED: bool = True
+    JINJA_PRECOMPILE_ON_STARTUP: bool = True
+
+    # Civitai
+    SETTINGS_CACHE_TTL_SECONDS: int = 5
+    IMPORT_RUNS_PER_PAGE: int = 50
+
+    # Gallery
+    IMAGE_PRELOAD_WINDOW: int = 5
+    TIMELINE_BATCH_SIZE: int = 24
+    PAGE_CACHE_ENABLED: bool = True
+    PAGE_CACHE_SIZE: int = 256
 
     # API
     API_V1_PREFIX: str = "/api/v1"
@@ -28,6 +60,9 @@ class Settings(BaseSettings):
     JWT_REFRESH_SECRET_KEY: str = "jwt_refresh_secret_key"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_MINUTES: int = 10080
+    AUTH_CACHE_ENABLED: bool = True
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    AUTH_CACHE_SIZE: int = 1024
     ALGORITHM: str = "HS256"
 
     # Email
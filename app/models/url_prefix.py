@@ -0,0 +1,53 @@
+from typing import Optional
+
+from sqlmodel import Field, SQLModel
+
+
+def split_url(url: str) -> tuple[str, str]:
+    """
+    Split a URL into a prefix shared by many URLs and the rest.
+
+    The prefix is the scheme, host and first path segment, e.g.
+    `https://image.civitai.com/xG1nkqKTMzGDvpLrqFT7WA/`, which every image on the Civitai
+    CDN has in common.
+
+    Args:
+        url (str): The URL.
+
+    Returns:
+        tuple[str, str]: The prefix and the suffix; joined, they are the URL.
+    """
+    scheme, separator, rest = url.partition("://")
+    if not separator:
+        return "", url
+    parts = rest.split("/", 2)
+    if len(parts) < 3:
+        return "", url
+    prefix = f"{scheme}://{parts[0]}/{parts[1]}/"
+    return prefix, url[len(prefix) :]
+
+
+class UrlPrefixBase(SQLModel):
+    """Base model for URL prefixes, stored once and shared by the image URLs."""
+
+    prefix: str = Field(unique=True, nullable=False)
+
+
+class UrlPrefix(UrlPrefixBase, table=True):
+    """URL prefix model for database."""
+
+    __tablename__ = "url_prefix"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+
+
+class UrlPrefixCreate(UrlPrefixBase):
+    """Model for creating URL prefixes."""
+
+    pass
+
+
+class UrlPrefixRead(UrlPrefixBase):
+    """Model for reading URL prefixes."""
+
+    id: int
@@ -17,9 +17,13 @@ TEMPLATES_PATH = VIEWS_PATH / "templates"
 # Data Folder
 LOGS_PATH = DATA_PATH / "logs"
 CACHE_PATH = DATA_PATH / "cache"
+PROFILES_PATH = DATA_PATH / "profiles"
+ARCHIVE_PATH = DATA_PATH / "archive"
 
 # Cache Folders
 # IMAGES_INFO_CACHE_PATH = CACHE_PATH / "images_info"
+JINJA_CACHE_PATH = CACHE_PATH / "jinja"
+STATIC_BUILD_PATH = CACHE_PATH / "static"
 
 # Files
 ENV_FILE = DATA_PATH / ".env"
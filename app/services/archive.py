@@ -0,0 +1,218 @@
+from typing import Optional
+
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import Integer, MetaData, Table, cast, delete, func, insert, select, update
+from sqlmodel import Session
+
+from app import logger, models, settings
+from app.core.page_cache import invalidate_gallery
+from app.db.archive import (
+    ArchiveLimitError,
+    archive_schema,
+    archive_years,
+    attach_limit,
+    create_archive,
+    in_store,
+    stores,
+)
+
+
+@dataclass
+class ArchiveResult:
+    """What an archive run moved out of the main database."""
+
+    cursors: int = 0
+    steps: int = 0
+    images: int = 0
+    schemas: list[str] = field(default_factory=list)
+
+
+def archive_tables(schema: Optional[str] = None) -> dict[str, Table]:
+    """
+    Get the archived tables.
+
+    Args:
+        schema (str | None): The archive schema, or None for the tables of the main
+            database.
+
+    Returns:
+        dict[str, Table]: The tables, by name.
+    """
+    tables = (
+        models.UrlPrefix.__table__,
+        models.Cursor.__table__,
+        models.GenerationStep.__table__,
+        models.GeneratedImage.__table__,
+    )
+    if schema is None:
+        return {table.name: table for table in tables}
+    metadata = MetaData()
+    return {table.name: table.to_metadata(metadata, schema=schema) for table in tables}
+
+
+def _copy_to_archive(db: Session, schema: str, cursor_ids: list[str], remaining: int) -> None:
+    """
+    Copy cursors, with their generation steps, images and URL prefixes, to an archive.
+
+    Args:
+        db (Session): The database session.
+        schema (str): The archive schema.
+        cursor_ids (list[str]): The cursors.
+        remaining (int): The number of cursors left in the main database, which the page
+            numbers of the archive are counted after.
+    """
+    tables = archive_tables(schema)
+    main = archive_tables()
+    image, url_prefix = main["generated_image"], main["url_prefix"]
+
+    prefix_ids = select(image.c.url_prefix_id).where(image.c.cursor_id.in_(cursor_ids))
+    db.execute(
+        insert(tables["url_prefix"])
+        .prefix_with("OR IGNORE")
+        .from_select(
+            list(url_prefix.c.keys()), url_prefix.select().where(url_prefix.c.id.in_(prefix_ids))
+        )
+    )
+    for name, column in (
+        ("cursor", main["cursor"].c.id),
+        ("generation_step", main["generation_step"].c.cursor_id),
+        ("generated_image", image.c.cursor_id),
+    ):
+        db.execute(
+            insert(tables[name])
+            .prefix_with("OR REPLACE")
+            .from_select(
+                list(main[name].c.keys()), main[name].select().where(column.in_(cursor_ids))
+            )
+        )
+
+    cursor = tables["cursor"]
+    db.execute(
+        update(cursor)
+        .where(cursor.c.id.in_(cursor_ids))
+        .values(page_number=cursor.c.page_number - remaining)
+    )
+
+
+async def archive_cursors(
+    db: Session,
+    before: Optional[datetime] = None,
+    batch_size: Optional[int] = None,
+    vacuum: bool = True,
+) -> ArchiveResult:
+    """
+    Move the cursors older than a date, with their generation steps and images, from the
+    main database into one archive file per year.
+
+    The archives are attached on demand and read transparently by the CRUD layer (see
+    `app.db.archive`), so the main database only holds the recent history that browsing
+    mostly touches, and stays small enough to sit in the page cache. Archived page numbers
+    are counted from the newest archived cursor, so imports never write to the archives.
+
+    Cursors are moved in batches of `batch_size`, each committed on its own together with
+    the renumbering of the cursors archived before it, so a run that fails leaves a
+    consistent history, which running it again completes. Nothing is moved if the run would
+    need more archive files than SQLite can attach, as the history in the files beyond the
+    limit could not be read.
+
+    Args:
+        db (Session): The database session.
+        before (datetime | None): Archive the cursors older than this date. Defaults to
+            `ARCHIVE_AFTER_DAYS` ago.
+        batch_size (int | None): The number of cursors moved per batch. Defaults to
+            `CURSOR_BATCH_SIZE`.
+        vacuum (bool): Shrink the main database file once the rows are moved.
+
+    Returns:
+        ArchiveResult: What was moved.
+
+    Raises:
+        ArchiveLimitError: If the run would need more archive files than SQLite can attach.
+    """
+    if before is None:
+        before = datetime.now(UTC) - timedelta(days=settings.ARCHIVE_AFTER_DAYS)
+    elif before.tzinfo is None:
+        before = before.replace(tzinfo=UTC)
+    cutoff_ms = int(before.timestamp() * 1000)
+    batch_size = batch_size or settings.CURSOR_BATCH_SIZE
+    result = ArchiveResult()
+
+    cursor = models.Cursor
+    count = select(func.count()).select_from(cursor)
+    moving = db.execute(count.where(cursor.timestamp_ms < cutoff_ms)).scalar_one()
+    if not moving:
+        return result
+
+    year = cast(func.strftime("%Y", cursor.timestamp_ms / 1000, "unixepoch"), Integer)
+    years = db.execute(select(year).where(cursor.timestamp_ms < cutoff_ms).distinct()).scalars()
+    needed = set(archive_years()) | set(years)
+    limit = attach_limit(db.connection())
+    if len(needed) > limit:
+        raise ArchiveLimitError(
+            f"Archiving before {before:%Y-%m-%d} needs {len(needed)} archive files, but SQLite "
+            f"attaches at most {limit}"
+        )
+
+    while True:
+        rows = db.execute(
+            select(cursor.id, cursor.timestamp_ms)
+            .where(cursor.timestamp_ms < cutoff_ms)
+            .order_by(cursor.timestamp_ms, cursor.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+
+        by_year: dict[int, list[str]] = {}
+        for cursor_id, timestamp_ms in rows:
+            year = datetime.fromtimestamp(timestamp_ms / 1000, UTC).year
+            by_year.setdefault(year, []).append(cursor_id)
+        for year in by_year:
+            create_archive(year)
+        # Archives can only be attached outside of a transaction, so before any write
+        attached = stores(db)
+        for year in by_year:
+            if archive_schema(year) not in attached:
+                raise RuntimeError(f"The archive {archive_schema(year)} could not be attached")
+
+        # The batch is newer than the cursors already archived, which move down the pages in
+        # the same transaction, so a failed batch leaves the numbering as it was
+        for schema in attached[1:]:
+            db.execute(
+                update(cursor).values(page_number=cursor.page_number + len(rows)),
+                execution_options=in_store(schema),
+            )
+        remaining = db.execute(count).scalar_one() - len(rows)
+
+        for year, cursor_ids in by_year.items():
+            schema = archive_schema(year)
+            _copy_to_archive(db=db, schema=schema, cursor_ids=cursor_ids, remaining=remaining)
+            main = archive_tables()
+            result.images += db.execute(
+                delete(main["generated_image"]).where(
+                    main["generated_image"].c.cursor_id.in_(cursor_ids)
+                )
+            ).rowcount
+            result.steps += db.execute(
+                delete(main["generation_step"]).where(
+                    main["generation_step"].c.cursor_id.in_(cursor_ids)
+                )
+            ).rowcount
+            result.cursors += db.execute(
+                delete(main["cursor"]).where(main["cursor"].c.id.in_(cursor_ids))
+            ).rowcount
+            if schema not in result.schemas:
+                result.schemas.append(schema)
+        db.commit()
+        logger.info(f"Archived {result.cursors}/{moving} cursors")
+
+    if vacuum:
+        db.connection().exec_driver_sql("VACUUM main")
+    await invalidate_gallery(db=db)
+    logger.info(
+        f"Archived {result.cursors} cursors, {result.steps} generation steps and "
+        f"{result.images} images into {', '.join(result.schemas)}"
+    )
+    return result
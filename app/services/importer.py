@@ -0,0 +1,266 @@
+from typing import Any, Optional
+
+import httpx
+from fastapi import HTTPException
+from sqlmodel import Session
+
+from app import crud, logger, models
+from app.core import civit, metrics
+from app.core.civit import ImportStats
+
+
+async def import_cursor_content(
+    db: Session,
+    cursor: models.Cursor,
+    cursor_data: dict[str, Any],
+    stats: Optional[ImportStats] = None,
+) -> int:
+    """
+    Import the generation steps and images of a fetched cursor page.
+
+    Steps and images that already exist are skipped, and images keep their position in the
+    page, so every import path stores a cursor the same way.
+
+    Args:
+        db (Session): The database session.
+        cursor (models.Cursor): The imported cursor.
+        cursor_data (dict[str, Any]): The page, from `civit.fetch_cursor_data`.
+        stats (ImportStats | None): The stats of the import run, if any.
+
+    Returns:
+        int: The number of images imported.
+    """
+    if stats is None:
+        stats = ImportStats()
+
+    # Import generation parameters for this cursor, looking up the existing ones at once
+    steps = cursor_data.get("steps", [])
+    existing = await crud.generation_step.get_existing_ids(
+        db=db, ids=[step_data["id"] for step_data in steps]
+    )
+    for step_data in steps:
+        if step_data["id"] in existing:
+            continue
+        step_create = models.GenerationStepCreate(cursor_id=cursor.id, **step_data)
+        await crud.generation_step.create(db=db, obj_in=step_create)
+        existing.add(step_data["id"])
+
+    # Import images for this cursor, looking up the existing ones at once
+    images = cursor_data.get("images", [])
+    existing = await crud.generated_image.get_existing_ids(
+        db=db, ids=[image_data["id"] for image_data in images]
+    )
+    cursor_images = 0
+    for position, image_data in enumerate(images):
+        # Skip if image already exists
+        if image_data["id"] in existing:
+            stats.images_skipped += 1
+            logger.debug("Image {} already exists, skipping...", image_data["id"])
+            continue
+
+        # Create image record
+        image_create = models.GeneratedImageCreate(
+            id=image_data["id"],
+            url=image_data["url"],
+            cursor_id=cursor.id,
+            step_id=image_data.get("step_id"),
+            seed=image_data.get("seed"),
+            position=position,
+            width=image_data["width"],
+            height=image_data["height"],
+            created_at=image_data["completed"],
+        )
+        await crud.generated_image.create(db=db, obj_in=image_create, record_day=False)
+        existing.add(image_data["id"])
+        cursor_images += 1
+        stats.images_inserted += 1
+        metrics.IMPORTED_IMAGES.inc()
+        logger.debug("Imported image {}", image_data["id"])
+
+    # Count the cursor's images in its browse day at once, rather than per image
+    if cursor_images:
+        await crud.browse_day.record(
+            db, cursor_id=cursor.id, timestamp_ms=cursor.timestamp_ms, images=cursor_images
+        )
+        db.commit()
+    return cursor_images
+
+
+async def import_cursor_recursive(
+    cursor_id: Optional[str],
+    db: Session,
+    client: Optional[httpx.AsyncClient] = None,
+    stats: Optional[ImportStats] = None,
+) -> tuple[int, int]:
+    """
+    Recursively import cursor and its images, following the next_cursor chain.
+    If cursor_id is None, starts from the most recent cursor.
+    Stops after encountering 5 consecutive existing cursors.
+    Pages are fetched with `client`, or with one client kept open for the whole import.
+    What the import did and where its time went is added to `stats`.
+    Returns tuple of (cursors_imported, images_imported)
+    """
+    if client is None:
+        async with civit.get_client() as client:
+            return await import_cursor_recursive(
+                cursor_id=cursor_id, db=db, client=client, stats=stats
+            )
+    if stats is None:
+        stats = ImportStats()
+
+    cursors_imported = 0
+    images_imported = 0
+    current_cursor_id = cursor_id
+    visited_cursors = set()  # Keep track of cursors we've seen to avoid loops
+    consecutive_existing = 0  # Counter for consecutive existing cursors
+    previous_cursor = None  # Keep track of the previous cursor to maintain chain
+
+    # Get first cursor data - this will be the latest if cursor_id is None
+    cursor_data = await civit.fetch_cursor_data(
+        cursor=current_cursor_id, db=db, client=client, stats=stats
+    )
+    if not cursor_data:
+        logger.warning("No data found for cursor {}", current_cursor_id)
+        return cursors_imported, images_imported
+
+    # If we requested latest (null cursor), get the actual cursor ID from the response
+    if current_cursor_id is None:
+        current_cursor_id = cursor_data["current_cursor_id"]
+        logger.info("Starting import from latest cursor: {}", current_cursor_id)
+
+        # Find the current most recent cursor and update its next_cursor_id
+        with stats.stage("relink"):
+            newest = await crud.cursor.get_before(db=db, limit=1)
+            most_recent_cursor = newest[0] if newest else None
+            if most_recent_cursor and most_recent_cursor.id != current_cursor_id:
+                most_recent_cursor.next_cursor_id = current_cursor_id
+                db.add(most_recent_cursor)
+                db.commit()
+                logger.info(
+                    "Updated next_cursor_id of {} to {}", most_recent_cursor.id, current_cursor_id
+                )
+                previous_cursor = most_recent_cursor
+
+    while current_cursor_id and current_cursor_id not in visited_cursors:
+        visited_cursors.add(current_cursor_id)
+
+        # Check if cursor exists
+        with stats.stage("db"):
+            existing_cursor = await crud.cursor.get_or_none(db=db, id=current_cursor_id)
+        if existing_cursor:
+            consecutive_existing += 1
+            logger.info("Cursor {} already exists ({}/5)", current_cursor_id, consecutive_existing)
+
+            # Update the next_cursor_id of the previous cursor if needed
+            if previous_cursor and previous_cursor.next_cursor_id != current_cursor_id:
+                with stats.stage("relink"):
+                    previous_cursor.next_cursor_id = current_cursor_id
+                    db.add(previous_cursor)
+                    db.commit()
+                logger.info(
+                    "Updated next_cursor_id of {} to {}", previous_cursor.id, current_cursor_id
+                )
+
+            if consecutive_existing >= 5:
+                logger.info("Found 5 consecutive existing cursors, stopping import")
+                break
+
+            previous_cursor = existing_cursor
+            current_cursor_id = existing_cursor.next_cursor_id
+            continue
+
+        # Reset consecutive counter since we found a new cursor
+        consecutive_existing = 0
+
+        # Create cursor record
+        cursor_create = models.CursorCreate(
+            id=current_cursor_id,
+            next_cursor_id=cursor_data.get("next_cursor"),
+        )
+        with stats.stage("db"):
+            cursor = await crud.cursor.create(db=db, obj_in=cursor_create)
+        cursors_imported += 1
+        stats.cursors_imported += 1
+        metrics.IMPORTED_CURSORS.inc()
+        logger.info("Imported cursor {}", cursor.id)
+
+        # Update the next_cursor_id of the previous cursor if needed
+        if previous_cursor and previous_cursor.next_cursor_id != cursor.id:
+            with stats.stage("relink"):
+                previous_cursor.next_cursor_id = cursor.id
+                db.add(previous_cursor)
+                db.commit()
+            logger.info("Updated next_cursor_id of {} to {}", previous_cursor.id, cursor.id)
+
+        with stats.stage("db"):
+            images_imported += await import_cursor_content(
+                db=db, cursor=cursor, cursor_data=cursor_data, stats=stats
+            )
+
+        # Update previous cursor reference and move to next cursor
+        previous_cursor = cursor
+        current_cursor_id = cursor_data.get("next_cursor")
+        if current_cursor_id:
+            cursor_data = await civit.fetch_cursor_data(
+                cursor=current_cursor_id, db=db, client=client, stats=stats
+            )
+            if not cursor_data:
+                logger.warning("No data found for cursor {}", current_cursor_id)
+                break
+        else:
+            logger.info("No more cursors to import")
+            break
+
+    return cursors_imported, images_imported
+
+
+async def run_import(
+    db: Session,
+    trigger: models.ImportTrigger,
+    cursor_id: Optional[str] = None,
+    client: Optional[httpx.AsyncClient] = None,
+) -> models.ImportRun:
+    """
+    Import from Civitai, recording the run in the import run ledger.
+
+    The run is recorded as failed if the import raises, and the exception is re-raised.
+
+    Args:
+        db (Session): The database session.
+        trigger (models.ImportTrigger): What started the import.
+        cursor_id (str | None): The cursor to start from, or None for the latest page.
+        client (httpx.AsyncClient | None): The client to fetch with, from
+            `civit.get_client`.
+
+    Returns:
+        models.ImportRun: The finished import run.
+    """
+    run = await crud.import_run.create(
+        db=db,
+        obj_in=models.ImportRunCreate(trigger=trigger.value, start_cursor_id=cursor_id),
+    )
+    run_id = run.id
+    stats = ImportStats()
+    status, error = models.ImportStatus.FAILED, None
+    try:
+        await import_cursor_recursive(cursor_id=cursor_id, db=db, client=client, stats=stats)
+        status = models.ImportStatus.SUCCEEDED
+    except HTTPException as exc:
+        error = str(exc.detail)
+        raise
+    except Exception as exc:
+        error = str(exc) or type(exc).__name__
+        raise
+    finally:
+        if status != models.ImportStatus.SUCCEEDED:
+            db.rollback()
+        run = await crud.import_run.finish(
+            db=db, run_id=run_id, stats=stats, status=status, error=error
+        )
+        logger.info(
+            f"Import run {run_id} {status.value}: {stats.pages_fetched} pages, "
+            f"{stats.images_inserted} images in {run.duration_seconds or 0:.1f}s "
+            f"(fetch {stats.fetch_seconds:.2f}s, parse {stats.parse_seconds:.2f}s, "
+            f"db {stats.db_seconds:.2f}s, relink {stats.relink_seconds:.2f}s)"
+        )
+    return run
@@ -1,11 +1,13 @@
 from collections.abc import Generator
 
-from fastapi import Cookie, Depends, HTTPException, status
+from fastapi import Cookie, Depends, HTTPException, Request, status
 from fastapi.responses import RedirectResponse
 from sqlmodel import Session
 
 from app import crud, models, settings
-from app.core import security
+from app.core import auth_cache, security
+from app.core.page_cache import ConditionalPage, compute_etag
+from app.crud.data_version import GALLERY
 from app.db.session import SessionLocal
 
 
@@ -93,7 +95,7 @@ async def get_current_tokens(
     """
     try:
         # Try to decode the access token
-        security.decode_token(token=str(tokens.access_token), key=settings.JWT_ACCESS_SECRET_KEY)
+        auth_cache.decode_access_token(token=str(tokens.access_token))
     except HTTPException:
         # If the access token is invalid, regenerate new tokens from refresh token
         if not tokens.refresh_token:
@@ -118,6 +120,9 @@ async def get_current_user(
     Gets the current user. If the access token is
     invalid or not found in cookie, returns None.
 
+    Verified tokens and user snapshots are cached, so most requests skip both the token
+    decode and the user query.
+
     Args:
         tokens (models.Tokens): The tokens.
         db (Session): The database session.
@@ -127,13 +132,11 @@ async def get_current_user(
     """
     # Get the user_id from the new access token
     try:
-        user_id = security.decode_token(
-            token=str(tokens.access_token), key=settings.JWT_ACCESS_SECRET_KEY
-        )
+        user_id = auth_cache.decode_access_token(token=str(tokens.access_token))
     except HTTPException:
         return None
 
-    return await crud.user.get(db=db, id=user_id)
+    return await auth_cache.get_user(db=db, user_id=user_id)
 
 
 async def get_current_user_or_raise(
@@ -199,3 +202,39 @@ async def get_current_active_superuser(
     if not crud.user.is_superuser(user_=current_user):
         raise RedirectException(url="/login")
     return current_user
+
+
+async def get_conditional_page(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user),
+) -> ConditionalPage:
+    """
+    Gets the conditional GET state of a gallery page.
+
+    The page ETag is derived from the URL, the user the page is rendered for and the
+    gallery data version, which is bumped by every import or repair. Pages carrying
+    one-off alerts are never cached.
+
+    Args:
+        request (Request): The request.
+        db (Session): The database session.
+        current_user (models.User): The current active user.
+
+    Returns:
+        ConditionalPage: The conditional page state.
+    """
+    if request.cookies.get("alerts"):
+        return ConditionalPage(request=request, etag=None)
+
+    gallery_version = await crud.data_version.get_version(db=db, key=GALLERY)
+    etag = compute_etag(
+        request.url.path,
+        request.url.query,
+        current_user.id,
+        current_user.updated_at,
+        current_user.is_superuser,
+        gallery_version,
+        settings.VERSION,
+    )
+    return ConditionalPage(request=request, etag=etag)
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import HTMLResponse, RedirectResponse, Response
+
+from app import models
+from app.core.query_stats import slow_queries
+from app.views import deps, templates
+
+router = APIRouter()
+
+
+@router.get("/slow-queries", response_class=HTMLResponse)
+async def view_slow_queries(
+    request: Request,
+    current_user: models.User = Depends(deps.get_current_active_superuser),
+) -> Response:
+    """The most recent slow DB queries, with their query plans"""
+    context = {
+        "request": request,
+        "current_user": current_user,
+        "queries": slow_queries.entries(),
+        "threshold_ms": slow_queries.threshold_seconds * 1000,
+        "alerts": models.Alerts.from_cookies(request.cookies),
+    }
+    return templates.TemplateResponse("admin/slow_queries.html", context=context)
+
+
+@router.post("/slow-queries/clear")
+async def clear_slow_queries(
+    current_user: models.User = Depends(deps.get_current_active_superuser),
+) -> Response:
+    """Forget the recorded slow DB queries"""
+    slow_queries.clear()
+    alerts = models.Alerts()
+    alerts.success.append("Slow query log cleared")
+    response = RedirectResponse("/admin/slow-queries", status_code=302)
+    response.set_cookie(key="alerts", value=alerts.json(), httponly=True, max_age=5)
+    return response
@@ -1,13 +1,18 @@
-from typing import Annotated, Optional
+from typing import Annotated, Any, Optional
 
-from fastapi import APIRouter, Depends, Form, Request
+import calendar
+from datetime import UTC, date, datetime
+from itertools import zip_longest
+
+from fastapi import APIRouter, Depends, Form, HTTPException, Query, Request
 from fastapi.responses import HTMLResponse, RedirectResponse, Response
-from sqlalchemy import text
 from sqlmodel import Session
 
-from app import crud, logger, models
-from app.core import civit
+from app import crud, logger, models, settings
+from app.core import preload
+from app.core.page_cache import ConditionalPage, invalidate_gallery
 from app.crud.cursor import extract_timestamp_from_cursor_id
+from app.services.importer import run_import
 from app.views import deps, templates
 
 router = APIRouter()
@@ -19,8 +24,12 @@ async def view_generation(
     page: int = 1,
     db: Session = Depends(deps.get_db),
     current_user: models.User = Depends(deps.get_current_active_user),
+    page_state: ConditionalPage = Depends(deps.get_conditional_page),
 ) -> Response:
     """Generation page view"""
+    if page_state.response:
+        return page_state.response
+
     # Get paginated cursors
     page_size = 10
     skip = (page - 1) * page_size
@@ -37,7 +46,168 @@ async def view_generation(
         "total_pages": total_pages,
         "alerts": alerts,
     }
-    return templates.TemplateResponse("generation/list.html", context=context)
+    return page_state.store(templates.TemplateResponse("generation/list.html", context=context))
+
+
+@router.get("/generation/search", response_class=HTMLResponse)
+async def search_generation(
+    request: Request,
+    q: Optional[str] = None,
+    base_model: Optional[str] = None,
+    sampler: Optional[str] = None,
+    seed: Optional[int] = None,
+    page: int = 1,
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Response:
+    """Search images by prompt text and generation parameters"""
+    page_size = 48
+    results: list[tuple[models.GeneratedImage, models.GenerationStep]] = []
+    searched = bool(q or base_model or sampler or seed is not None)
+    if searched:
+        results = await crud.generation_step.search_images(
+            db=db,
+            query=q,
+            base_model=base_model,
+            sampler=sampler,
+            seed=seed,
+            skip=(page - 1) * page_size,
+            limit=page_size,
+        )
+
+    alerts = models.Alerts.from_cookies(request.cookies)
+    context = {
+        "request": request,
+        "current_user": current_user,
+        "results": results,
+        "searched": searched,
+        "q": q or "",
+        "base_model": base_model or "",
+        "sampler": sampler or "",
+        "seed": seed,
+        "page": page,
+        "has_next": len(results) == page_size,
+        "base_models": await crud.generation_step.get_distinct_values(db=db, column="base_model"),
+        "samplers": await crud.generation_step.get_distinct_values(db=db, column="sampler"),
+        "alerts": alerts,
+    }
+    return templates.TemplateResponse("generation/search.html", context=context)
+
+
+async def get_timeline_context(
+    request: Request, db: Session, after: Optional[str]
+) -> dict[str, Any]:
+    """Get the template context for a batch of the image timeline"""
+    try:
+        images = await crud.generated_image.get_timeline(
+            db=db, after_id=after, limit=settings.TIMELINE_BATCH_SIZE
+        )
+    except crud.RecordNotFoundError as exc:
+        raise HTTPException(status_code=400, detail="Invalid 'after' token") from exc
+    next_after = images[-1].id if len(images) == settings.TIMELINE_BATCH_SIZE else None
+    return {"request": request, "images": images, "next_after": next_after}
+
+
+@router.get("/generation/timeline", response_class=HTMLResponse)
+async def view_timeline(
+    request: Request,
+    after: Optional[str] = None,
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Response:
+    """Infinite-scroll timeline of images across all cursors"""
+    context = await get_timeline_context(request=request, db=db, after=after)
+    context["current_user"] = current_user
+    context["alerts"] = models.Alerts.from_cookies(request.cookies)
+    return templates.TemplateResponse("generation/timeline.html", context=context)
+
+
+@router.get("/generation/timeline/items", response_class=HTMLResponse)
+async def view_timeline_items(
+    request: Request,
+    after: Optional[str] = None,
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Response:
+    """Next batch of the image timeline, as an HTML fragment for infinite scroll"""
+    context = await get_timeline_context(request=request, db=db, after=after)
+    return templates.TemplateResponse("generation/timeline_items.html", context=context)
+
+
+@router.get("/generation/imports", response_class=HTMLResponse)
+async def view_imports(
+    request: Request,
+    before: Optional[int] = None,
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Response:
+    """History of import runs, newest first, with their per-stage timings"""
+    runs = await crud.import_run.get_recent(
+        db=db, before=before, limit=settings.IMPORT_RUNS_PER_PAGE
+    )
+    next_before = runs[-1].id if len(runs) == settings.IMPORT_RUNS_PER_PAGE else None
+    context = {
+        "request": request,
+        "current_user": current_user,
+        "runs": runs,
+        "next_before": next_before,
+        "alerts": models.Alerts.from_cookies(request.cookies),
+    }
+    return templates.TemplateResponse("generation/imports.html", context=context)
+
+
+@router.get("/generation/calendar", response_class=HTMLResponse)
+async def view_calendar(
+    request: Request,
+    year: Optional[int] = None,
+    month: Optional[int] = Query(default=None, ge=1, le=12),
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Response:
+    """Calendar of a month, with the image and cursor counts of each day"""
+    if year is None or month is None:
+        latest = await crud.browse_day.get_latest(db=db)
+        today = latest.day if latest else datetime.now(UTC).date()
+        year, month = year or today.year, month or today.month
+    if not date.min.year < year < date.max.year:
+        raise HTTPException(status_code=400, detail="Invalid year")
+
+    days = {day.day: day for day in await crud.browse_day.get_month(db=db, year=year, month=month)}
+    context = {
+        "request": request,
+        "current_user": current_user,
+        "year": year,
+        "month": month,
+        "month_name": calendar.month_name[month],
+        "weekdays": list(calendar.day_abbr),
+        "weeks": calendar.Calendar().monthdatescalendar(year, month),
+        "days": days,
+        "previous_month": (year - 1, 12) if month == 1 else (year, month - 1),
+        "next_month": (year + 1, 1) if month == 12 else (year, month + 1),
+        "image_count": sum(day.image_count for day in days.values()),
+        "alerts": models.Alerts.from_cookies(request.cookies),
+    }
+    return templates.TemplateResponse("generation/calendar.html", context=context)
+
+
+@router.get("/generation/day")
+async def jump_to_day(
+    day: date,
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Response:
+    """Jump to the first cursor of a day, newest first"""
+    browse_day = await crud.browse_day.get_or_none(db=db, day=day)
+    if browse_day is not None:
+        return RedirectResponse(f"/generation/{browse_day.first_cursor_id}", status_code=302)
+
+    alerts = models.Alerts()
+    alerts.warning.append(f"No images on {day:%B %-d, %Y}")
+    response = RedirectResponse(
+        f"/generation/calendar?year={day.year}&month={day.month}", status_code=302
+    )
+    response.set_cookie(key="alerts", value=alerts.json(), httponly=True, max_age=5)
+    return response
 
 
 @router.get("/generation/{cursor_id}", response_class=HTMLResponse)
@@ -46,38 +216,19 @@ async def view_cursor(
     cursor_id: str,
     db: Session = Depends(deps.get_db),
     current_user: models.User = Depends(deps.get_current_active_user),
+    page_state: ConditionalPage = Depends(deps.get_conditional_page),
 ) -> Response:
     """View cursor details"""
+    if page_state.response:
+        return page_state.response
+
     cursor = await crud.cursor.get(db=db, id=cursor_id)
-    images = await crud.generated_image.get_multi(db=db, cursor_id=cursor_id)
-
-    # Get 5 cursors before and 5 after
-    pagination_cursors = []
-    current_cursor = cursor
-
-    # Get previous 5 cursors
-    prev_cursors: list[models.Cursor] = []
-    prev_cursor = await crud.cursor.get_or_none(db=db, next_cursor_id=current_cursor.id)
-    for _ in range(3):
-        if prev_cursor:
-            prev_cursors.insert(0, prev_cursor)
-            prev_cursor = await crud.cursor.get_or_none(db=db, next_cursor_id=prev_cursor.id)
-        else:
-            break
+    images = await crud.generated_image.get_by_cursor(db=db, cursor_id=cursor_id)
 
-    # Get next 5 cursors
-    next_cursors: list[models.Cursor] = []
-    next_cursor = cursor.next_cursor_id
-    for _ in range(3):
-        if next_cursor:
-            next_cursor_obj = await crud.cursor.get_or_none(db=db, id=next_cursor)
-            if next_cursor_obj:
-                next_cursors.append(next_cursor_obj)
-                next_cursor = next_cursor_obj.next_cursor_id
-            else:
-                break
-        else:
-            break
+    # Get 3 cursors before and 3 after
+    prev_cursors = await crud.cursor.get_chain(db=db, cursor_id=cursor.id, steps=3, reverse=True)
+    prev_cursors.reverse()
+    next_cursors = await crud.cursor.get_chain(db=db, cursor_id=cursor.id, steps=3)
 
     # Combine all cursors for pagination
     pagination_cursors = prev_cursors + [cursor] + next_cursors
@@ -90,122 +241,11 @@ async def view_cursor(
         "images": images,
         "alerts": alerts,
         "pagination_cursors": pagination_cursors,
+        # From the chain, which also crosses into the archives
+        "previous_cursor": prev_cursors[-1] if prev_cursors else None,
+        "next_cursor": next_cursors[0] if next_cursors else None,
     }
-    return templates.TemplateResponse("generation/view.html", context=context)
-
-
-async def import_cursor_recursive(cursor_id: Optional[str], db: Session) -> tuple[int, int]:
-    """
-    Recursively import cursor and its images, following the next_cursor chain.
-    If cursor_id is None, starts from the most recent cursor.
-    Stops after encountering 5 consecutive existing cursors.
-    Returns tuple of (cursors_imported, images_imported)
-    """
-    cursors_imported = 0
-    images_imported = 0
-    current_cursor_id = cursor_id
-    visited_cursors = set()  # Keep track of cursors we've seen to avoid loops
-    consecutive_existing = 0  # Counter for consecutive existing cursors
-    previous_cursor = None  # Keep track of the previous cursor to maintain chain
-
-    # Get first cursor data - this will be the latest if cursor_id is None
-    cursor_data = await civit.fetch_cursor_data(cursor=current_cursor_id, db=db)
-    if not cursor_data:
-        logger.warning(f"No data found for cursor {current_cursor_id}")
-        return cursors_imported, images_imported
-
-    # If we requested latest (null cursor), get the actual cursor ID from the response
-    if current_cursor_id is None:
-        current_cursor_id = cursor_data["current_cursor_id"]
-        logger.info(f"Starting import from latest cursor: {current_cursor_id}")
-
-        # Find the current most recent cursor and update its next_cursor_id
-        most_recent_cursor = await crud.cursor.get_latest(db=db)
-        if most_recent_cursor and most_recent_cursor.id != current_cursor_id:
-            most_recent_cursor.next_cursor_id = current_cursor_id
-            db.add(most_recent_cursor)
-            db.commit()
-            logger.info(f"Updated next_cursor_id of {most_recent_cursor.id} to {current_cursor_id}")
-            previous_cursor = most_recent_cursor
-
-    while current_cursor_id and current_cursor_id not in visited_cursors:
-        visited_cursors.add(current_cursor_id)
-
-        # Check if cursor exists
-        existing_cursor = await crud.cursor.get_or_none(db=db, id=current_cursor_id)
-        if existing_cursor:
-            consecutive_existing += 1
-            logger.info(f"Cursor {current_cursor_id} already exists ({consecutive_existing}/5)")
-
-            # Update the next_cursor_id of the previous cursor if needed
-            if previous_cursor and previous_cursor.next_cursor_id != current_cursor_id:
-                previous_cursor.next_cursor_id = current_cursor_id
-                db.add(previous_cursor)
-                db.commit()
-                logger.info(
-                    f"Updated next_cursor_id of {previous_cursor.id} to {current_cursor_id}"
-                )
-
-            if consecutive_existing >= 5:
-                logger.info("Found 5 consecutive existing cursors, stopping import")
-                break
-
-            previous_cursor = existing_cursor
-            current_cursor_id = existing_cursor.next_cursor_id
-            continue
-
-        # Reset consecutive counter since we found a new cursor
-        consecutive_existing = 0
-
-        # Create cursor record
-        cursor_create = models.CursorCreate(
-            id=current_cursor_id,
-            next_cursor_id=cursor_data.get("next_cursor"),
-        )
-        cursor = await crud.cursor.create(db=db, obj_in=cursor_create)
-        cursors_imported += 1
-        logger.info(f"Imported cursor {cursor.id}")
-
-        # Update the next_cursor_id of the previous cursor if needed
-        if previous_cursor and previous_cursor.next_cursor_id != cursor.id:
-            previous_cursor.next_cursor_id = cursor.id
-            db.add(previous_cursor)
-            db.commit()
-            logger.info(f"Updated next_cursor_id of {previous_cursor.id} to {cursor.id}")
-
-        # Import images for this cursor
-        for image_data in cursor_data["images"]:
-            # Skip if image already exists
-            if await crud.generated_image.get_or_none(db=db, id=image_data["id"]):
-                logger.debug(f"Image {image_data['id']} already exists, skipping...")
-                continue
-
-            # Create image record
-            image_create = models.GeneratedImageCreate(
-                id=image_data["id"],
-                url=image_data["url"],
-                cursor_id=cursor.id,
-                width=image_data["width"],
-                height=image_data["height"],
-                created_at=image_data["completed"],
-            )
-            await crud.generated_image.create(db=db, obj_in=image_create)
-            images_imported += 1
-            logger.debug(f"Imported image {image_data['id']}")
-
-        # Update previous cursor reference and move to next cursor
-        previous_cursor = cursor
-        current_cursor_id = cursor_data.get("next_cursor")
-        if current_cursor_id:
-            cursor_data = await civit.fetch_cursor_data(cursor=current_cursor_id, db=db)
-            if not cursor_data:
-                logger.warning(f"No data found for cursor {current_cursor_id}")
-                break
-        else:
-            logger.info("No more cursors to import")
-            break
-
-    return cursors_imported, images_imported
+    return page_state.store(templates.TemplateResponse("generation/view.html", context=context))
 
 
 @router.post("/generation/import")
@@ -219,16 +259,19 @@ async def import_cursor(
     alerts = models.Alerts()
 
     try:
-        cursors_imported, images_imported = await import_cursor_recursive(
-            cursor_id=cursor_id, db=db
-        )
+        run = await run_import(db=db, trigger=models.ImportTrigger.MANUAL, cursor_id=cursor_id)
         alerts.success.append(
-            f"Successfully imported {cursors_imported} cursors and {images_imported} images"
+            f"Successfully imported {run.cursors_imported} cursors and "
+            f"{run.images_inserted} images"
         )
 
     except Exception as e:
+        db.rollback()
         alerts.danger.append(f"Error importing cursor: {str(e)}")
 
+    finally:
+        await invalidate_gallery(db=db)
+
     response = RedirectResponse("/generation", status_code=302)
     response.set_cookie(key="alerts", value=alerts.json(), httponly=True, max_age=5)
     return response
@@ -240,41 +283,30 @@ async def view_image(
     image_id: str,
     db: Session = Depends(deps.get_db),
     current_user: models.User = Depends(deps.get_current_active_user),
+    page_state: ConditionalPage = Depends(deps.get_conditional_page),
 ) -> Response:
     """View a single image in fullscreen with navigation"""
+    if page_state.response:
+        return page_state.response
+
     image = await crud.generated_image.get(db=db, id=image_id)
-    cursor = await crud.cursor.get(db=db, id=image.cursor_id)
-
-    # Get all images from current cursor
-    cursor_images = await crud.generated_image.get_multi(db=db, cursor_id=image.cursor_id)
-    cursor_image_ids = [img.id for img in cursor_images]
-    current_index = cursor_image_ids.index(image_id)
-
-    # Get immediate prev/next images for navigation
-    prev_image = None
-    if current_index > 0:
-        prev_image = cursor_images[current_index - 1]
-    else:
-        # Check previous cursor
-        prev_cursor = await crud.cursor.get_or_none(db=db, next_cursor_id=image.cursor_id)
-        if prev_cursor:
-            prev_cursor_images = await crud.generated_image.get_multi(
-                db=db, cursor_id=prev_cursor.id
-            )
-            if prev_cursor_images:
-                prev_image = prev_cursor_images[-1]  # Get last image of previous cursor
-
-    next_image = None
-    if current_index < len(cursor_images) - 1:
-        next_image = cursor_images[current_index + 1]
-    else:
-        # Check next cursor
-        if cursor.next_cursor_id:
-            next_cursor_images = await crud.generated_image.get_multi(
-                db=db, cursor_id=cursor.next_cursor_id
-            )
-            if next_cursor_images:
-                next_image = next_cursor_images[0]  # Get first image of next cursor
+
+    # Prefetch window: the next/previous images in gallery order, across cursors
+    window = settings.IMAGE_PRELOAD_WINDOW
+    next_images = await crud.generated_image.get_after(db=db, image=image, limit=window)
+    prev_images = await crud.generated_image.get_before(db=db, image=image, limit=window)
+    next_image = next_images[0] if next_images else None
+    prev_image = prev_images[0] if prev_images else None
+
+    # Interleave so the images closest to the current one are fetched first
+    preload_images = [
+        img for pair in zip_longest(next_images, prev_images) for img in pair if img is not None
+    ]
+    links = preload.build_preload_links(
+        image_urls=[img.url for img in preload_images],
+        page_urls=[f"/generation/image/{img.id}" for img in (next_image, prev_image) if img],
+    )
+    await preload.send_early_hints(request, links)
 
     context = {
         "request": request,
@@ -282,9 +314,12 @@ async def view_image(
         "image": image,
         "prev_image": prev_image,
         "next_image": next_image,
-        "cursor_images": cursor_images,  # Send all cursor images for preloading
+        "preload_images": preload_images,
     }
-    return templates.TemplateResponse("generation/image_view.html", context=context)
+    response = templates.TemplateResponse("generation/image_view.html", context=context)
+    if links:
+        response.headers["Link"] = ", ".join(links)
+    return page_state.store(response)
 
 
 @router.post("/generation/jump")
@@ -301,10 +336,9 @@ async def jump_cursor(
         cursor = await crud.cursor.get(db=db, id=current_cursor)
 
         # Follow next_cursor chain for jump_count steps
-        for _ in range(jump_count):
-            if not cursor.next_cursor_id:
-                break
-            cursor = await crud.cursor.get(db=db, id=cursor.next_cursor_id)
+        chain = await crud.cursor.get_chain(db=db, cursor_id=cursor.id, steps=jump_count)
+        if chain:
+            cursor = chain[-1]
 
         # Redirect to the final cursor we found
         return RedirectResponse(f"/generation/{cursor.id}", status_code=302)
@@ -316,66 +350,83 @@ async def jump_cursor(
         return response
 
 
-async def repair_cursor_chain(db: Session) -> tuple[int, list[str]]:
+async def repair_cursor_chain(
+    db: Session, batch_size: Optional[int] = None, max_fixed_ids: int = 1000
+) -> tuple[int, list[str]]:
     """
     Repair the cursor chain by fixing NULL next_cursor_id values and updating timestamps.
     Returns a tuple of (number of fixes made, list of fixed cursor IDs).
+
+    The cursors are read and fixed in keyset batches of `batch_size`, newest first, and each
+    batch is committed before the next is read, so memory stays flat however long the
+    history is. Only the first `max_fixed_ids` fixed cursor IDs are returned.
     """
+    batch_size = batch_size or settings.CURSOR_BATCH_SIZE
     fixes_made = 0
-    fixed_cursors = []
-
-    # Get all cursors ordered by timestamp in ID (ascending)
-    all_cursors = (
-        db.query(models.Cursor)
-        .order_by(text("id DESC"))  # Order by ID which contains timestamps, newest first
-        .all()
-    )
+    fixed_cursors: list[str] = []
+    page_number = 0
+    previous_cursor = None
+    before = None
 
-    # Fix page numbers and timestamps while we're at it
-    for i, cursor in enumerate(all_cursors, 1):
-        needs_update = False
-
-        # Fix page number if needed
-        if cursor.page_number != i:
-            cursor.page_number = i
-            needs_update = True
-            logger.info(f"Fixed page number for cursor {cursor.id} to {i}")
-
-        # Fix timestamp if needed
-        correct_timestamp = extract_timestamp_from_cursor_id(cursor.id)
-        if cursor.created_at != correct_timestamp:
-            cursor.created_at = correct_timestamp
-            needs_update = True
-            logger.info(f"Fixed timestamp for cursor {cursor.id} to {correct_timestamp}")
-
-        if needs_update:
-            db.add(cursor)
-            fixes_made += 1
-            fixed_cursors.append(cursor.id)
-
-    # Iterate through cursors (except the last one) to fix next_cursor_id
-    for i in range(len(all_cursors) - 1):
-        current_cursor = all_cursors[i]
-        next_cursor = all_cursors[i + 1]
-
-        # If current cursor has no next_cursor_id or incorrect next_cursor_id
-        if not current_cursor.next_cursor_id or current_cursor.next_cursor_id != next_cursor.id:
-            current_cursor.next_cursor_id = next_cursor.id
-            db.add(current_cursor)
-            fixes_made += 1
-            fixed_cursors.append(current_cursor.id)
-            logger.info(f"Fixed cursor chain: {current_cursor.id} -> {next_cursor.id}")
-
-    # The last cursor should have next_cursor_id set to NULL
-    if all_cursors[-1].next_cursor_id is not None:
-        all_cursors[-1].next_cursor_id = None
-        db.add(all_cursors[-1])
+    def record_fix(cursor_id: str) -> None:
+        nonlocal fixes_made
         fixes_made += 1
-        fixed_cursors.append(all_cursors[-1].id)
-        logger.info(f"Set last cursor {all_cursors[-1].id} next_cursor_id to NULL")
+        if len(fixed_cursors) < max_fixed_ids:
+            fixed_cursors.append(cursor_id)
+
+    while True:
+        # Get a batch of cursors ordered by their parsed timestamp, newest first
+        batch = await crud.cursor.get_before(db=db, before=before, limit=batch_size, archived=False)
+        if not batch:
+            break
+
+        for cursor in batch:
+            page_number += 1
+            needs_update = False
+
+            # Fix page number if needed
+            if cursor.page_number != page_number:
+                cursor.page_number = page_number
+                needs_update = True
+                logger.debug("Fixed page number for cursor {} to {}", cursor.id, page_number)
+
+            # Fix timestamp if needed
+            correct_timestamp = extract_timestamp_from_cursor_id(cursor.id)
+            if cursor.created_at != correct_timestamp:
+                cursor.created_at = correct_timestamp
+                needs_update = True
+                logger.debug("Fixed timestamp for cursor {} to {}", cursor.id, correct_timestamp)
+
+            if needs_update:
+                db.add(cursor)
+                record_fix(cursor.id)
+
+            # The previous (newer) cursor must point to this one
+            if previous_cursor is not None and previous_cursor.next_cursor_id != cursor.id:
+                logger.debug("Fixed cursor chain: {} -> {}", previous_cursor.id, cursor.id)
+                previous_cursor.next_cursor_id = cursor.id
+                db.add(previous_cursor)
+                record_fix(previous_cursor.id)
+            previous_cursor = cursor
+
+        before = batch[-1].id
+        if db.dirty:
+            db.commit()
+
+    # The last cursor should point to the newest archived cursor, or to NULL
+    if previous_cursor is not None:
+        archived = await crud.cursor.get_before(db=db, before=previous_cursor.id, limit=1)
+        last_next_cursor_id = archived[0].id if archived else None
+        if previous_cursor.next_cursor_id != last_next_cursor_id:
+            previous_cursor.next_cursor_id = last_next_cursor_id
+            db.add(previous_cursor)
+            record_fix(previous_cursor.id)
+            db.commit()
+            logger.info(
+                f"Set last cursor {previous_cursor.id} next_cursor_id to {last_next_cursor_id}"
+            )
 
     if fixes_made > 0:
-        db.commit()
         logger.info(f"Made {fixes_made} fixes to cursor chain")
 
     return fixes_made, fixed_cursors
@@ -393,6 +444,7 @@ async def repair_chain(
     try:
         fixes_made, fixed_cursors = await repair_cursor_chain(db=db)
         if fixes_made > 0:
+            await invalidate_gallery(db=db)
             alerts.success.append(
                 f"Successfully repaired cursor chain. Fixed {fixes_made} broken links."
             )
@@ -0,0 +1,61 @@
+import secrets
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import Response
+
+from app import crud, models, settings
+from app.core.metrics import CONTENT_TYPE, REGISTRY
+from app.views import deps
+
+router = APIRouter()
+
+
+def is_metrics_request_authorized(request: Request, current_user: models.User | None) -> bool:
+    """
+    Check if a request may read the metrics.
+
+    Scrapers authenticate with `Authorization: Bearer <METRICS_TOKEN>`; logged in
+    superusers can read them from the browser.
+
+    Args:
+        request (Request): The request.
+        current_user (models.User | None): The user logged in through the cookie, if any.
+
+    Returns:
+        bool: True if the request may read the metrics.
+    """
+    authorization = request.headers.get("authorization", "")
+    if settings.METRICS_TOKEN and authorization.startswith("Bearer "):
+        return secrets.compare_digest(
+            authorization.removeprefix("Bearer ").strip(), settings.METRICS_TOKEN
+        )
+    return bool(
+        current_user
+        and crud.user.is_active(current_user)
+        and crud.user.is_superuser(user_=current_user)
+    )
+
+
+@router.get("/metrics")
+async def view_metrics(
+    request: Request,
+    current_user: models.User | None = Depends(deps.get_current_user),
+) -> Response:
+    """
+    Metrics in the Prometheus text format.
+
+    Args:
+        request (Request): The request.
+        current_user (models.User | None): The user logged in through the cookie, if any.
+
+    Returns:
+        Response: The metrics.
+
+    Raises:
+        HTTPException: If the request is not authorized.
+    """
+    if not is_metrics_request_authorized(request=request, current_user=current_user):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, headers={"WWW-Authenticate": "Bearer"}
+        )
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.views.pages import account, generation, login, root, settings, user
+from app.views.pages import account, admin, generation, login, metrics, root, settings, user
 
 views_router = APIRouter(include_in_schema=False)
 views_router.include_router(root.router, tags=["Views"])
@@ -9,3 +9,5 @@ views_router.include_router(account.router, prefix="/account", tags=["Account"])
 views_router.include_router(user.router, prefix="/user", tags=["Users"])
 views_router.include_router(settings.router, tags=["Settings"])
 views_router.include_router(generation.router, tags=["Generation"])
+views_router.include_router(metrics.router, tags=["Metrics"])
+views_router.include_router(admin.router, prefix="/admin", tags=["Admin"])
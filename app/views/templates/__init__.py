@@ -1,25 +1,51 @@
+from typing import Any
+
 from fastapi.templating import Jinja2Templates
+from jinja2 import FileSystemBytecodeCache, Template
 
-from app import paths
-from app.models.settings import Settings as _Settings
+from app import paths, settings
+from app.core.metrics import TEMPLATE_RENDER_SECONDS
+from app.core.static import get_static_url, load_static_manifest
 from app.views.templates.filters import filter_humanize
 
-settings = _Settings()  # type: ignore
+
+class TimedTemplate(Template):
+    """Jinja template that records its render time in the metrics."""
+
+    def render(self, *args: Any, **kwargs: Any) -> str:
+        with TEMPLATE_RENDER_SECONDS.time(template=self.name or "<string>"):
+            return super().render(*args, **kwargs)
 
 
 def get_templates() -> Jinja2Templates:
     """
     Create Jinja2Templates object and add global variables to templates.
 
+    Compiled templates are cached on disk so a fresh worker does not recompile them, and
+    templates are only checked for changes on disk in DEBUG.
+
     Returns:
         Jinja2Templates: Jinja2Templates object.
     """
+    env_options = {"auto_reload": settings.DEBUG}
+    if settings.JINJA_BYTECODE_CACHE_ENABLED:
+        paths.JINJA_CACHE_PATH.mkdir(parents=True, exist_ok=True)
+        env_options["bytecode_cache"] = FileSystemBytecodeCache(
+            directory=str(paths.JINJA_CACHE_PATH)
+        )
+
     # Create Jinja2Templates object
-    templates = Jinja2Templates(directory=paths.TEMPLATES_PATH)
+    templates = Jinja2Templates(directory=paths.TEMPLATES_PATH, **env_options)
+    templates.env.template_class = TimedTemplate
 
     # Add custom filters to templates
     templates.env.filters["humanize"] = filter_humanize
 
+    # Add the static asset URL helper, resolving built assets to their hashed names
+    templates.env.globals["static_url"] = get_static_url(
+        load_static_manifest(paths.STATIC_BUILD_PATH)
+    )
+
     # Add global variables to templates
     templates.env.globals["PROJECT_NAME"] = settings.PROJECT_NAME
     templates.env.globals["ENV_NAME"] = settings.ENV_NAME
@@ -30,3 +56,20 @@ def get_templates() -> Jinja2Templates:
     templates.env.globals["VERSION"] = settings.VERSION
 
     return templates
+
+
+def precompile_templates(templates: Jinja2Templates) -> int:
+    """
+    Load every template up front, so the first request after a deploy does not pay for
+    compiling it (and its bytecode lands in the bytecode cache).
+
+    Args:
+        templates (Jinja2Templates): Jinja2Templates object.
+
+    Returns:
+        int: The number of templates compiled.
+    """
+    names = templates.env.list_templates(extensions=["html"])
+    for name in names:
+        templates.env.get_template(name)
+    return len(names)
@@ -0,0 +1,425 @@
+from typing import Any, Optional
+
+import asyncio
+import json
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+import typer
+from rich.console import Console
+from rich.table import Table
+from sqlmodel import Session, create_engine
+
+from app import logger, settings
+from app.core.app import app
+from app.core.query_stats import instrument_engine
+from benchmarks.datagen import SCALES, copy_dataset, get_dataset
+from benchmarks.harness import BenchmarkResult, compare, load_results, write_results
+from benchmarks.loadtest import STEPS, LoadTestResult, run_load_test, serve_dataset
+from benchmarks.memory import (
+    MEMORY_TASKS,
+    MemoryResult,
+    measure_memory,
+    memory_growth,
+    probe_memory,
+)
+from benchmarks.startup import LAZY_MODULES, import_report
+from benchmarks.suite import BENCHMARKS, benchmark_context
+
+console = Console()
+typer_app = typer.Typer(
+    name="benchmarks",
+    help="Benchmarks against large synthetic datasets.",
+    add_completion=False,
+)
+
+
+@typer_app.command()
+def generate(
+    scale: str = typer.Option("small", help=f"Dataset scale: {', '.join(SCALES)}."),
+    seed: int = typer.Option(0, help="Random seed."),
+) -> None:
+    """
+    Generate (or reuse) a cached synthetic dataset.
+
+    Args:
+        scale: str : The dataset scale.
+        seed: int : The random seed.
+    """
+    start = time.perf_counter()
+    path = asyncio.run(get_dataset(scale, seed=seed))
+    console.print(f"Dataset [bold blue]{path}[/] ready in {time.perf_counter() - start:.1f}s")
+
+
+async def _run(
+    scale: str,
+    seed: int,
+    iterations: int,
+    import_pages: int,
+    only: list[str],
+    civitai_options: dict[str, float],
+) -> list[BenchmarkResult]:
+    dataset = await get_dataset(scale, seed=seed)
+    with tempfile.TemporaryDirectory() as directory:
+        # The import and repair benchmarks write, so they work on a copy
+        path = copy_dataset(dataset, Path(directory) / dataset.name)
+        engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+        instrument_engine(engine)
+        results = []
+        try:
+            with Session(engine) as db, benchmark_context(
+                db=db,
+                iterations=iterations,
+                import_pages=import_pages,
+                seed=seed,
+                civitai_options=civitai_options,
+            ) as ctx:
+                for name, runner in BENCHMARKS.items():
+                    if only and name not in only:
+                        continue
+                    console.print(f"Running [bold]{name}[/]...")
+                    results.append(await runner(ctx))
+        finally:
+            engine.dispose()
+    return results
+
+
+@typer_app.command()
+def run(
+    scale: str = typer.Option("small", help=f"Dataset scale: {', '.join(SCALES)}."),
+    seed: int = typer.Option(0, help="Random seed."),
+    iterations: int = typer.Option(50, help="Measured calls per view benchmark."),
+    import_pages: int = typer.Option(20, help="Pages imported per import benchmark call."),
+    only: Optional[list[str]] = typer.Option(None, help="Only run these benchmarks."),
+    civitai_latency: float = typer.Option(0.0, help="Civitai stand-in latency, in seconds."),
+    civitai_jitter: float = typer.Option(0.0, help="Civitai stand-in random extra latency."),
+    civitai_error_rate: float = typer.Option(0.0, help="Fraction of Civitai 500 responses."),
+    civitai_rate_limit_rate: float = typer.Option(0.0, help="Fraction of Civitai 429 responses."),
+    save: bool = typer.Option(True, help="Write the results to benchmarks/results."),
+    verbose: bool = typer.Option(False, help="Keep the application logs."),
+) -> None:
+    """
+    Run the benchmarks and report p50/p99 latency and DB queries per call.
+
+    Args:
+        scale: str : The dataset scale.
+        seed: int : The random seed.
+        iterations: int : Measured calls per view benchmark.
+        import_pages: int : Pages imported per import benchmark call.
+        only: list[str] | None : Only run these benchmarks.
+        civitai_latency: float : Civitai stand-in latency, in seconds.
+        civitai_jitter: float : Civitai stand-in random extra latency, in seconds.
+        civitai_error_rate: float : Fraction of Civitai stand-in 500 responses.
+        civitai_rate_limit_rate: float : Fraction of Civitai stand-in 429 responses.
+        save: bool : Write the results to a JSON file.
+        verbose: bool : Keep the application logs.
+    """
+    if not verbose:
+        logger.disable("app")
+    civitai_options = {
+        "latency": civitai_latency,
+        "jitter": civitai_jitter,
+        "error_rate": civitai_error_rate,
+        "rate_limit_rate": civitai_rate_limit_rate,
+    }
+    results = asyncio.run(_run(scale, seed, iterations, import_pages, only or [], civitai_options))
+
+    table = Table(title=f"Benchmarks ({scale}, {SCALES[scale][0]:,} cursors)")
+    for column in ("benchmark", "n", "p50 ms", "p99 ms", "queries", "extra"):
+        table.add_column(column, justify="left" if column in ("benchmark", "extra") else "right")
+    for result in results:
+        table.add_row(
+            result.name,
+            str(result.iterations),
+            f"{result.p50_ms:.2f}",
+            f"{result.p99_ms:.2f}",
+            f"{result.queries:g}",
+            ", ".join(f"{key}={value:g}" for key, value in result.extra.items()),
+        )
+    console.print(table)
+
+    if save:
+        cursors, images_per_cursor = SCALES[scale]
+        dataset = {
+            "scale": scale,
+            "seed": seed,
+            "cursors": cursors,
+            "images": cursors * images_per_cursor,
+            "civitai": civitai_options,
+        }
+        console.print(f"Results written to [bold blue]{write_results(results, dataset)}[/]")
+
+
+@typer_app.command("compare")
+def compare_command(
+    base: Path = typer.Argument(..., help="Baseline results file."),
+    head: Path = typer.Argument(..., help="New results file."),
+    threshold: float = typer.Option(0.1, help="Tolerated relative p50 increase."),
+    fail: bool = typer.Option(False, help="Exit with an error if a benchmark regressed."),
+) -> None:
+    """
+    Compare two results files, e.g. of two commits.
+
+    Args:
+        base: Path : Baseline results file.
+        head: Path : New results file.
+        threshold: float : Tolerated relative p50 increase.
+        fail: bool : Exit with an error if a benchmark regressed.
+
+    Raises:
+        Exit: If `fail` is set and a benchmark regressed.
+    """
+    base_report, head_report = load_results(base), load_results(head)
+    if base_report["dataset"] != head_report["dataset"]:
+        console.print("[yellow]Warning: the results are for different datasets[/]")
+
+    table = Table(
+        title=f"{base_report['environment']['commit']} -> {head_report['environment']['commit']}"
+    )
+    for column in ("benchmark", "p50 ms", "change", "queries", "change"):
+        table.add_column(column, justify="left" if column == "benchmark" else "right")
+
+    def change(value: Optional[float]) -> str:
+        return "" if value is None else f"{value:+.1%}"
+
+    comparisons = compare(base_report, head_report, threshold=threshold)
+    for comparison in comparisons:
+        old, new = comparison.base or {}, comparison.head or {}
+        style = "red" if comparison.regressed else None
+        table.add_row(
+            comparison.name,
+            f"{old.get('p50_ms', '-')} -> {new.get('p50_ms', '-')}",
+            change(comparison.p50_change),
+            f"{old.get('queries', '-')} -> {new.get('queries', '-')}",
+            change(comparison.queries_change),
+            style=style,
+        )
+    console.print(table)
+
+    if fail and any(comparison.regressed for comparison in comparisons):
+        raise typer.Exit(code=1)
+
+
+@typer_app.command()
+def startup(
+    module: str = typer.Option("app.core.app", help="The module to import."),
+    runs: int = typer.Option(5, help="Timed imports, each in a fresh interpreter."),
+    top: int = typer.Option(25, help="Number of slowest imports to list."),
+    own: bool = typer.Option(False, help="Only list the project's own modules."),
+    fail: bool = typer.Option(False, help="Exit with an error if a lazy module is imported."),
+) -> None:
+    """
+    Report the start-up import time of the app, and its slowest imports.
+
+    Args:
+        module: str : The module to import.
+        runs: int : Timed imports, each in a fresh interpreter.
+        top: int : Number of slowest imports to list.
+        own: bool : Only list the project's own modules.
+        fail: bool : Exit with an error if a lazy module is imported.
+
+    Raises:
+        Exit: If `fail` is set and a lazy module is imported.
+    """
+    report = import_report(module, runs=runs)
+
+    table = Table(title=f"Slowest imports of {module}")
+    for column in ("module", "self ms", "cumulative ms"):
+        table.add_column(column, justify="left" if column == "module" else "right")
+    for item in report.slowest(top, own=own):
+        table.add_row(
+            "  " * item.depth + item.module,
+            f"{item.self_us / 1000:.1f}",
+            f"{item.cumulative_us / 1000:.1f}",
+        )
+    console.print(table)
+
+    times = ", ".join(f"{seconds * 1000:.0f}" for seconds in report.seconds)
+    console.print(
+        f"Imported [bold]{module}[/] in [bold blue]{report.median_seconds * 1000:.0f}ms[/] "
+        f"(median of {runs}: {times} ms), {len(report.modules)} modules"
+    )
+    loaded = [name for name in LAZY_MODULES if name in report.modules]
+    if loaded:
+        console.print(f"[red]Imported at start-up, but should be lazy: {', '.join(loaded)}[/]")
+        if fail:
+            raise typer.Exit(code=1)
+
+
+async def _load_test(url: Optional[str], scale: str, seed: int, **options: Any) -> LoadTestResult:
+    if url:
+        return await run_load_test(base_url=url, seed=seed, **options)
+    dataset = await get_dataset(scale, seed=seed)
+    with tempfile.TemporaryDirectory() as directory:
+        path = copy_dataset(dataset, Path(directory) / dataset.name)
+        engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+        instrument_engine(engine)
+        try:
+            with serve_dataset(app, engine):
+                return await run_load_test(app=app, seed=seed, **options)
+        finally:
+            engine.dispose()
+
+
+@typer_app.command()
+def loadtest(
+    url: Optional[str] = typer.Option(
+        None, help="A running server. Defaults to the app in-process."
+    ),
+    scale: str = typer.Option("small", help=f"Dataset scale, in-process: {', '.join(SCALES)}."),
+    seed: int = typer.Option(0, help="Random seed."),
+    concurrency: int = typer.Option(10, help="Simultaneous viewers."),
+    duration: float = typer.Option(30.0, help="How long to browse, in seconds."),
+    images: int = typer.Option(10, help="Images viewed in a row per browsing session."),
+    jump_rate: float = typer.Option(0.2, help="Fraction of sessions that jump ahead."),
+    think_time: float = typer.Option(0.0, help="Mean pause before each request, in seconds."),
+    username: str = typer.Option(settings.FIRST_SUPERUSER_USERNAME, help="Login username."),
+    password: str = typer.Option(settings.FIRST_SUPERUSER_PASSWORD, help="Login password."),
+    verbose: bool = typer.Option(False, help="Keep the application logs."),
+) -> None:
+    """
+    Simulate concurrent viewers browsing the gallery, and report throughput and latency.
+
+    Args:
+        url: str | None : A running server. Defaults to the app in-process.
+        scale: str : The dataset scale, when running in-process.
+        seed: int : The random seed.
+        concurrency: int : Simultaneous viewers.
+        duration: float : How long to browse, in seconds.
+        images: int : Images viewed in a row per browsing session.
+        jump_rate: float : Fraction of sessions that jump ahead.
+        think_time: float : Mean pause before each request, in seconds.
+        username: str : Login username.
+        password: str : Login password.
+        verbose: bool : Keep the application logs.
+
+    Raises:
+        Exit: If any request failed.
+    """
+    if not verbose:
+        logger.disable("app")
+    result = asyncio.run(
+        _load_test(
+            url,
+            scale,
+            seed,
+            concurrency=concurrency,
+            duration=duration,
+            images_per_session=images,
+            jump_rate=jump_rate,
+            think_time=think_time,
+            username=username,
+            password=password,
+        )
+    )
+
+    table = Table(title=f"Load test ({url or scale}, {concurrency} viewers, {duration:g}s)")
+    for column in ("step", "requests", "p50 ms", "p90 ms", "p99 ms", "max ms"):
+        table.add_column(column, justify="left" if column == "step" else "right")
+    for step in (*STEPS, None):
+        count = len(result.latencies_ms.get(step, [])) if step else result.requests
+        if count:
+            table.add_row(
+                step or "all",
+                str(count),
+                *(f"{result.percentile(q, step):.1f}" for q in (50, 90, 99, 100)),
+                style=None if step else "bold",
+            )
+    console.print(table)
+    console.print(
+        f"[bold blue]{result.throughput:.1f}[/] requests/s, {result.sessions} sessions "
+        f"in {result.seconds:.1f}s"
+    )
+    if result.errors:
+        for error, count in result.errors.most_common():
+            console.print(f"[red]{count} x {error}[/]")
+        raise typer.Exit(code=1)
+
+
+@typer_app.command()
+def memory(
+    scales: list[str] = typer.Option(
+        ["small", "medium", "large"], "--scale", help=f"Dataset scales: {', '.join(SCALES)}."
+    ),
+    seed: int = typer.Option(0, help="Random seed."),
+    tasks: list[str] = typer.Option(
+        list(MEMORY_TASKS), "--task", help=f"Tasks: {', '.join(MEMORY_TASKS)}."
+    ),
+    import_pages: int = typer.Option(20, help="Pages imported by the import task."),
+    tolerance: float = typer.Option(16.0, help="Tolerated memory growth, in MiB."),
+    fail: bool = typer.Option(False, help="Exit with an error if memory grows with the data."),
+) -> None:
+    """
+    Report the peak memory of the import and the chain repair on growing datasets.
+
+    Every task runs in a fresh interpreter on a copy of the dataset. Memory should stay
+    flat as the history grows: the peak traced by tracemalloc and the peak RSS on the
+    largest dataset should be within `tolerance` of those on the smallest.
+
+    Args:
+        scales: list[str] : Dataset scales.
+        seed: int : Random seed.
+        tasks: list[str] : Tasks.
+        import_pages: int : Pages imported by the import task.
+        tolerance: float : Tolerated memory growth, in MiB.
+        fail: bool : Exit with an error if memory grows with the data.
+
+    Raises:
+        Exit: If `fail` is set and the memory of a task grows with the data.
+    """
+    results: list[MemoryResult] = []
+    for scale in scales:
+        dataset = asyncio.run(get_dataset(scale, seed=seed))
+        for task in tasks:
+            console.print(f"Running [bold]{task}[/] on {scale}...")
+            with tempfile.TemporaryDirectory() as directory:
+                path = copy_dataset(dataset, Path(directory) / dataset.name)
+                results.append(probe_memory(task, path, pages=import_pages))
+
+    table = Table(title="Peak memory")
+    for column in ("task", "cursors", "images", "traced MiB", "RSS MiB", "seconds"):
+        table.add_column(column, justify="left" if column == "task" else "right")
+    for result in results:
+        table.add_row(
+            result.task,
+            f"{result.cursors:,}",
+            f"{result.images:,}",
+            f"{result.peak_mb:.2f}",
+            f"{result.max_rss_mb:.1f}",
+            f"{result.seconds:.2f}",
+        )
+    console.print(table)
+
+    grown = False
+    for task, (traced, rss) in memory_growth(results).items():
+        flat = traced <= tolerance and rss <= tolerance
+        grown = grown or not flat
+        style = "green" if flat else "red"
+        console.print(f"[{style}]{task}: traced {traced:+.2f} MiB, RSS {rss:+.1f} MiB[/]")
+    if fail and grown:
+        raise typer.Exit(code=1)
+
+
+@typer_app.command("memory-probe", hidden=True)
+def memory_probe(
+    task: str = typer.Argument(..., help=f"Task: {', '.join(MEMORY_TASKS)}."),
+    path: Path = typer.Argument(..., help="Dataset database file. It is modified."),
+    pages: int = typer.Option(20, help="Pages imported by the import task."),
+) -> None:
+    """
+    Measure the peak memory of one task, and print the result as JSON.
+
+    Args:
+        task: str : Task.
+        path: Path : Dataset database file.
+        pages: int : Pages imported by the import task.
+    """
+    logger.disable("app")
+    result = asyncio.run(measure_memory(task, path, pages=pages))
+    print(json.dumps(asdict(result)))
+
+
+if __name__ == "__main__":
+    typer_app()
@@ -0,0 +1,206 @@
+from typing import Any, Optional
+
+import asyncio
+import json
+import random
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+
+import httpx
+
+from benchmarks.datagen import Page, PageFactory
+
+
+@dataclass
+class StubStats:
+    """What the stand-in served."""
+
+    requests: int = 0
+    pages: int = 0
+    errors: int = 0
+    rate_limited: int = 0
+    bytes_sent: int = 0
+
+
+class CivitaiStub:
+    """
+    A local stand-in for Civitai's `orchestrator.queryGeneratedImages` tRPC endpoint.
+
+    It serves synthetic pages in the real payload shape through an `httpx.MockTransport`,
+    so the importer runs unchanged (request building, JSON parsing, step parsing) without
+    network access. Latency, server errors and rate limiting (429 with `Retry-After`) can
+    be injected to measure retries and pipelining.
+    """
+
+    def __init__(
+        self,
+        pages: list[Page],
+        tail_cursor: Optional[str] = None,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: int = 1,
+        seed: int = 0,
+    ) -> None:
+        """
+        Initialize the stand-in.
+
+        Args:
+            pages (list[Page]): The pages to serve, newest first.
+            tail_cursor (str | None): The `nextCursor` of the last page, e.g. the newest
+                cursor already in the database, so an import stops there.
+            latency (float): The delay before every response, in seconds.
+            jitter (float): A random extra delay of up to this many seconds.
+            error_rate (float): The fraction of requests answered with a 500.
+            rate_limit_rate (float): The fraction of requests answered with a 429.
+            retry_after (int): The `Retry-After` of 429 responses, in seconds.
+            seed (int): The random seed for jitter and failures.
+        """
+        self.pages = {page.cursor["id"]: page for page in pages}
+        self.next_cursors = {page.cursor["id"]: page.cursor["next_cursor_id"] for page in pages}
+        if pages:
+            self.next_cursors[pages[-1].cursor["id"]] = tail_cursor
+        self.latest = pages[0].cursor["id"] if pages else None
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.stats = StubStats()
+
+    @classmethod
+    def generate(
+        cls,
+        count: int,
+        images_per_page: int = 10,
+        newest: Optional[datetime] = None,
+        seed: int = 0,
+        **kwargs: Any,
+    ) -> "CivitaiStub":
+        """
+        Create a stand-in serving freshly generated pages.
+
+        Args:
+            count (int): The number of pages.
+            images_per_page (int): The number of images on every page.
+            newest (datetime | None): The timestamp of the newest page.
+            seed (int): The random seed for the pages.
+            kwargs (Any): Other `CivitaiStub` arguments.
+
+        Returns:
+            CivitaiStub: The stand-in.
+        """
+        factory_kwargs = {"newest": newest} if newest else {}
+        factory = PageFactory(images_per_cursor=images_per_page, seed=seed, **factory_kwargs)
+        return cls(list(factory.pages(count)), seed=seed, **kwargs)
+
+    def transport(self) -> httpx.MockTransport:
+        """
+        Get a transport serving the stand-in, for `civit.get_client(transport=...)`.
+
+        Returns:
+            httpx.MockTransport: The transport.
+        """
+        return httpx.MockTransport(self.handle)
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        """
+        Answer a `queryGeneratedImages` request.
+
+        Args:
+            request (httpx.Request): The request.
+
+        Returns:
+            httpx.Response: The response.
+        """
+        self.stats.requests += 1
+        if self.latency or self.jitter:
+            await asyncio.sleep(self.latency + self.random.uniform(0, self.jitter))
+
+        roll = self.random.random()
+        if roll < self.rate_limit_rate:
+            self.stats.rate_limited += 1
+            return httpx.Response(
+                429,
+                headers={"Retry-After": str(self.retry_after)},
+                json={"error": {"json": {"message": "Too Many Requests", "code": -32029}}},
+            )
+        if roll < self.rate_limit_rate + self.error_rate:
+            self.stats.errors += 1
+            return httpx.Response(
+                500, json={"error": {"json": {"message": "Internal server error"}}}
+            )
+
+        cursor = json.loads(request.url.params["input"])["json"]["cursor"]
+        if cursor in (None, "null"):
+            cursor = self.latest
+        body = json.dumps(self.payload(cursor)).encode()
+        self.stats.pages += 1
+        self.stats.bytes_sent += len(body)
+        return httpx.Response(200, content=body, headers={"Content-Type": "application/json"})
+
+    def payload(self, cursor: Optional[str]) -> dict[str, Any]:
+        """
+        Build the tRPC response for a page.
+
+        Args:
+            cursor (str | None): The requested cursor. Unknown cursors get an empty page.
+
+        Returns:
+            dict[str, Any]: The response body.
+        """
+        page = self.pages.get(cursor) if cursor else None
+        items = to_items(page) if page else []
+        next_cursor = self.next_cursors.get(cursor) if page else None
+        return {"result": {"data": {"json": {"items": items, "nextCursor": next_cursor}}}}
+
+
+def to_items(page: Page) -> list[dict[str, Any]]:
+    """
+    Convert a synthetic page to tRPC workflow items, one step per workflow.
+
+    Args:
+        page (Page): The page.
+
+    Returns:
+        list[dict[str, Any]]: The workflow items.
+    """
+    images = defaultdict(list)
+    for image in page.images:
+        images[image["step_id"]].append(
+            {
+                "id": image["id"],
+                "url": image["url"],
+                "width": image["width"],
+                "height": image["height"],
+                "seed": image["seed"],
+                "completed": image["created_at"].isoformat(),
+            }
+        )
+
+    return [
+        {
+            "id": step["workflow_id"],
+            "createdAt": step["created_at"].isoformat(),
+            "steps": [
+                {
+                    "name": step["id"].rsplit("-", 1)[1],
+                    "params": {
+                        "prompt": step["prompt"],
+                        "negativePrompt": step["negative_prompt"],
+                        "baseModel": step["base_model"],
+                        "sampler": step["sampler"],
+                        "seed": step["seed"],
+                        "steps": step["steps"],
+                        "cfgScale": step["cfg_scale"],
+                    },
+                    "resources": [{"id": step["model_id"]}],
+                    "images": images[step["id"]],
+                }
+            ],
+        }
+        for step in page.steps
+    ]
@@ -0,0 +1,297 @@
+from typing import Any, Iterator, Optional
+
+import hashlib
+import random
+import shutil
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import CreateTable
+from sqlmodel import Session, SQLModel, create_engine
+
+from app import crud, models
+from app.crud.cursor import parse_cursor_id
+from app.db.init_db import init_initial_data
+from app.models.url_prefix import split_url
+
+DATA_PATH = Path(__file__).parent / ".data"
+
+# Bump when the generated content changes, so cached datasets are rebuilt
+DATASET_VERSION = 2
+
+# Named dataset sizes: (cursors, images per cursor)
+SCALES = {
+    "tiny": (100, 10),
+    "small": (1_000, 10),
+    "medium": (10_000, 10),
+    "large": (100_000, 10),
+}
+
+# Cursors are ordered by the timestamp parsed from their id, whatever the model id prefix.
+# Pass several `model_ids` to `PageFactory` to benchmark a history that mixes them.
+MODEL_IDS = (1001440,)
+BASE_MODELS = ("SDXL 1.0", "Pony", "Illustrious", "Flux.1 D")
+SAMPLERS = ("Euler a", "DPM++ 2M Karras", "DPM++ SDE Karras", "Euler")
+PROMPT_WORDS = (
+    "portrait of a woman, castle on a hill, red fox in the snow, cyberpunk city at night, "
+    "watercolor, oil painting, cinematic lighting, highly detailed, 8k, masterpiece, "
+    "golden hour, misty forest, dragon, astronaut, koi pond, neon, bokeh, film grain"
+).split(", ")
+IMAGE_SIZES = ((832, 1216), (1216, 832), (1024, 1024), (896, 1152))
+NEWEST_TIMESTAMP = datetime(2024, 10, 30, 19, 59, 10, 517000)
+
+
+def make_cursor_id(model_id: int, timestamp: datetime) -> str:
+    """
+    Build a Civitai-style cursor / workflow id.
+
+    Args:
+        model_id (int): The model id prefix.
+        timestamp (datetime): The workflow creation time.
+
+    Returns:
+        str: The id, formatted `modelid-YYYYMMDDHHmmssSSS`.
+    """
+    return f"{model_id}-{timestamp:%Y%m%d%H%M%S}{timestamp.microsecond // 1000:03d}"
+
+
+@dataclass
+class Page:
+    """One synthetic Civitai page: a cursor, its generation steps and its images."""
+
+    cursor: dict[str, Any]
+    steps: list[dict[str, Any]]
+    images: list[dict[str, Any]]
+
+
+class PageFactory:
+    """
+    Generate realistic cursor pages, newest first, with deterministic content.
+
+    Cursor timestamps go back in time by a random gap per page, every page holds a few
+    workflows (one generation step each) and the images are spread over them.
+    """
+
+    def __init__(
+        self,
+        images_per_cursor: int = 10,
+        seed: int = 0,
+        newest: datetime = NEWEST_TIMESTAMP,
+        model_ids: tuple[int, ...] = MODEL_IDS,
+    ) -> None:
+        """
+        Initialize the factory.
+
+        Args:
+            images_per_cursor (int): The number of images on every page.
+            seed (int): The random seed, so the same seed yields the same pages.
+            newest (datetime): The timestamp of the first (newest) page.
+            model_ids (tuple[int, ...]): The model ids the cursor ids are prefixed with.
+        """
+        self.images_per_cursor = images_per_cursor
+        self.random = random.Random(seed)
+        self.timestamp = newest
+        self.model_ids = model_ids
+
+    def pages(self, count: int) -> Iterator[Page]:
+        """
+        Generate pages, newest first. Every page links to the next, older, one.
+
+        Args:
+            count (int): The number of pages.
+
+        Yields:
+            Page: The pages.
+        """
+        cursor_id = self._next_id()
+        for page_number in range(1, count + 1):
+            next_cursor_id = self._next_id() if page_number < count else None
+            yield self._page(cursor_id, next_cursor_id, page_number)
+            cursor_id = next_cursor_id  # type: ignore
+
+    def _next_id(self) -> str:
+        self.timestamp -= timedelta(milliseconds=self.random.randint(20_000, 3_600_000))
+        return make_cursor_id(self.random.choice(self.model_ids), self.timestamp)
+
+    def _page(self, cursor_id: str, next_cursor_id: Optional[str], page_number: int) -> Page:
+        rng = self.random
+        model_id, timestamp = cursor_id.split("-")
+        created_at = datetime.strptime(timestamp, "%Y%m%d%H%M%S%f")
+        workflows = max(1, self.images_per_cursor // 4)
+
+        steps = []
+        for n in range(workflows):
+            workflow_created_at = created_at - timedelta(milliseconds=n * 1500)
+            workflow_id = (
+                cursor_id if n == 0 else make_cursor_id(int(model_id), workflow_created_at)
+            )
+            steps.append(
+                {
+                    "id": f"{workflow_id}-0",
+                    "workflow_id": workflow_id,
+                    "cursor_id": cursor_id,
+                    "prompt": ", ".join(rng.sample(PROMPT_WORDS, 5)),
+                    "negative_prompt": "lowres, bad anatomy, blurry",
+                    "base_model": rng.choice(BASE_MODELS),
+                    "model_id": int(model_id),
+                    "sampler": rng.choice(SAMPLERS),
+                    "seed": rng.getrandbits(31),
+                    "steps": rng.choice((20, 25, 30)),
+                    "cfg_scale": rng.choice((3.5, 5.0, 7.0)),
+                    "created_at": workflow_created_at,
+                    "updated_at": workflow_created_at,
+                }
+            )
+
+        images = []
+        for n in range(self.images_per_cursor):
+            step = steps[n % workflows]
+            width, height = rng.choice(IMAGE_SIZES)
+            token = uuid.UUID(int=rng.getrandbits(128))
+            images.append(
+                {
+                    "id": f"{step['workflow_id']}-{n // workflows}",
+                    "url": f"https://image.civitai.com/xG1nkqKTMzGDvpLrqFT7WA/{token}/"
+                    f"original=true/{token}.jpeg",
+                    "width": width,
+                    "height": height,
+                    "cursor_id": cursor_id,
+                    "step_id": step["id"],
+                    "seed": step["seed"] + n // workflows,
+                    "position": n,
+                    "created_at": step["created_at"],
+                    "updated_at": step["created_at"],
+                }
+            )
+
+        cursor = {
+            "id": cursor_id,
+            "next_cursor_id": next_cursor_id,
+            "page_number": page_number,
+            "model_id": int(model_id),
+            "timestamp_ms": parse_cursor_id(cursor_id)[1],
+            "created_at": created_at.replace(microsecond=0),
+            "updated_at": created_at,
+        }
+        return Page(cursor=cursor, steps=steps, images=images)
+
+
+def schema_fingerprint() -> str:
+    """
+    Hash the current table definitions, so cached datasets are rebuilt after a schema change.
+
+    Returns:
+        str: A short hash of the `CREATE TABLE` statements.
+    """
+    ddl = "".join(str(CreateTable(table)) for table in SQLModel.metadata.sorted_tables)
+    return hashlib.sha256(ddl.encode()).hexdigest()[:10]
+
+
+async def generate(
+    engine: Engine, cursors: int, images_per_cursor: int, seed: int = 0, batch_size: int = 5_000
+) -> None:
+    """
+    Create the tables and fill them with a synthetic browsing history.
+
+    Rows are written with batched executemany inserts, so a million images take seconds,
+    not the hours the importer would need. The first superuser is created as on startup.
+
+    Args:
+        engine (Engine): The database engine, for an empty database.
+        cursors (int): The number of cursors (pages).
+        images_per_cursor (int): The number of images on every page.
+        seed (int): The random seed.
+        batch_size (int): The number of cursors written per transaction.
+    """
+    SQLModel.metadata.create_all(bind=engine)
+    tables = SQLModel.metadata.tables
+
+    factory = PageFactory(images_per_cursor=images_per_cursor, seed=seed)
+    batch: list[Page] = []
+    prefix_ids: dict[str, int] = {}
+
+    def image_row(conn: Connection, image: dict[str, Any]) -> dict[str, Any]:
+        # Store the URL as the app does, as a shared prefix and the image's own suffix
+        row = {key: value for key, value in image.items() if key != "url"}
+        prefix, row["url_suffix"] = split_url(image["url"])
+        if prefix and prefix not in prefix_ids:
+            result = conn.execute(tables["url_prefix"].insert(), {"prefix": prefix})
+            prefix_ids[prefix] = result.inserted_primary_key[0]
+        row["url_prefix_id"] = prefix_ids.get(prefix)
+        return row
+
+    def flush() -> None:
+        with engine.begin() as conn:
+            conn.execute(tables["cursor"].insert(), [page.cursor for page in batch])
+            conn.execute(
+                tables["generation_step"].insert(), [step for page in batch for step in page.steps]
+            )
+            conn.execute(
+                tables["generated_image"].insert(),
+                [image_row(conn, image) for page in batch for image in page.images],
+            )
+        batch.clear()
+
+    for page in factory.pages(cursors):
+        batch.append(page)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+
+    with Session(engine) as db:
+        # The rows were written around the CRUD layer, which keeps the days up to date
+        await crud.browse_day.rebuild(db=db)
+        await init_initial_data(db=db)
+        # The importer refuses to run without a Civitai cookie
+        db.add(models.Settings(id="current", cookie_string="benchmark"))
+        db.commit()
+    with engine.connect() as conn:
+        conn.exec_driver_sql("ANALYZE")
+
+
+async def get_dataset(scale: str, seed: int = 0, directory: Path = DATA_PATH) -> Path:
+    """
+    Get the database file of a named dataset, generating it on first use.
+
+    Datasets are cached per scale, seed and schema, since the large ones take a while to
+    build. Benchmarks that write must work on a `copy_dataset` copy.
+
+    Args:
+        scale (str): The dataset scale, a key of `SCALES`.
+        seed (int): The random seed.
+        directory (Path): The dataset cache folder.
+
+    Returns:
+        Path: The dataset database file.
+    """
+    cursors, images_per_cursor = SCALES[scale]
+    path = directory / f"{scale}-{seed}-v{DATASET_VERSION}-{schema_fingerprint()}.sqlite3"
+    if not path.exists():
+        directory.mkdir(parents=True, exist_ok=True)
+        partial = path.with_suffix(".partial")
+        partial.unlink(missing_ok=True)
+        engine = create_engine(f"sqlite:///{partial}")
+        await generate(engine, cursors=cursors, images_per_cursor=images_per_cursor, seed=seed)
+        engine.dispose()
+        partial.rename(path)
+    return path
+
+
+def copy_dataset(source: Path, destination: Path) -> Path:
+    """
+    Copy a dataset, for benchmarks that modify the database.
+
+    Args:
+        source (Path): The dataset database file.
+        destination (Path): The copy.
+
+    Returns:
+        Path: The copy.
+    """
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(source, destination)
+    return destination
@@ -0,0 +1,218 @@
+from typing import Any, Awaitable, Callable, Optional, Union
+
+import inspect
+import json
+import platform
+import sqlite3
+import subprocess  # nosec B404
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+
+from app.core.query_stats import track_queries
+
+RESULTS_PATH = Path(__file__).parent / "results"
+
+BenchmarkFunc = Callable[[int], Union[Any, Awaitable[Any]]]
+
+
+@dataclass
+class BenchmarkResult:
+    """The timings and DB query counts of one benchmark."""
+
+    name: str
+    iterations: int
+    p50_ms: float
+    p99_ms: float
+    mean_ms: float
+    max_ms: float
+    queries: float
+    max_queries: int
+    extra: dict[str, float] = field(default_factory=dict)
+
+
+def percentile(values: list[float], q: float) -> float:
+    """
+    Get a percentile of a list of values, interpolating between the closest ranks.
+
+    Args:
+        values (list[float]): The values.
+        q (float): The percentile, between 0 and 100.
+
+    Returns:
+        float: The percentile, or 0.0 for no values.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+async def measure(
+    name: str, func: BenchmarkFunc, iterations: int, warmup: int = 2
+) -> BenchmarkResult:
+    """
+    Time a benchmark function and count the DB queries of every call.
+
+    Args:
+        name (str): The benchmark name.
+        func (BenchmarkFunc): The function, sync or async, called with the iteration number
+            so it can vary its input.
+        iterations (int): The number of measured calls.
+        warmup (int): The number of calls made first and not measured.
+
+    Returns:
+        BenchmarkResult: The result.
+    """
+    for i in range(warmup):
+        await _call(func, i)
+
+    timings: list[float] = []
+    queries: list[int] = []
+    for i in range(warmup, warmup + iterations):
+        with track_queries() as stats:
+            start = time.perf_counter()
+            await _call(func, i)
+            timings.append((time.perf_counter() - start) * 1000)
+        queries.append(stats.queries)
+
+    return BenchmarkResult(
+        name=name,
+        iterations=iterations,
+        p50_ms=round(percentile(timings, 50), 3),
+        p99_ms=round(percentile(timings, 99), 3),
+        mean_ms=round(sum(timings) / len(timings), 3),
+        max_ms=round(max(timings), 3),
+        queries=round(sum(queries) / len(queries), 2),
+        max_queries=max(queries),
+    )
+
+
+async def _call(func: BenchmarkFunc, i: int) -> Any:
+    result = func(i)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+def _git(*args: str) -> str:
+    try:
+        return subprocess.run(  # nosec B603 B607
+            ["git", *args], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def environment() -> dict[str, Any]:
+    """
+    Describe where the benchmarks ran, so results of different commits can be compared.
+
+    Returns:
+        dict[str, Any]: The git commit, whether the tree had local changes, and the Python,
+            SQLite and platform versions.
+    """
+    return {
+        "commit": _git("rev-parse", "--short", "HEAD") or "unknown",
+        "subject": _git("log", "-1", "--format=%s"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+def write_results(
+    results: list[BenchmarkResult],
+    dataset: dict[str, Any],
+    directory: Path = RESULTS_PATH,
+) -> Path:
+    """
+    Write benchmark results to a JSON file named after the time and the git commit.
+
+    Args:
+        results (list[BenchmarkResult]): The results.
+        dataset (dict[str, Any]): The dataset the benchmarks ran against.
+        directory (Path): The results folder.
+
+    Returns:
+        Path: The results file.
+    """
+    env = environment()
+    created_at = datetime.now(UTC)
+    report = {
+        "created_at": created_at.isoformat(),
+        "environment": env,
+        "dataset": dataset,
+        "results": [asdict(result) for result in results],
+    }
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{created_at:%Y%m%d-%H%M%S}-{env['commit']}.json"
+    path.write_text(json.dumps(report, indent=2))
+    return path
+
+
+def load_results(path: Path) -> dict[str, Any]:
+    """
+    Load a results file written by `write_results`.
+
+    Args:
+        path (Path): The results file.
+
+    Returns:
+        dict[str, Any]: The report.
+    """
+    return json.loads(path.read_text())
+
+
+@dataclass
+class Comparison:
+    """The change of one benchmark between two runs."""
+
+    name: str
+    base: Optional[dict[str, Any]]
+    head: Optional[dict[str, Any]]
+    p50_change: Optional[float] = None
+    queries_change: Optional[float] = None
+    regressed: bool = False
+
+
+def compare(base: dict[str, Any], head: dict[str, Any], threshold: float = 0.1) -> list[Comparison]:
+    """
+    Compare two benchmark reports.
+
+    A benchmark regressed when its p50 latency grew by more than `threshold`, or it makes
+    more DB queries than before. Query counts do not depend on the machine, so they are
+    the most reliable signal when the two reports come from different hosts.
+
+    Args:
+        base (dict[str, Any]): The baseline report.
+        head (dict[str, Any]): The new report.
+        threshold (float): The tolerated relative p50 increase.
+
+    Returns:
+        list[Comparison]: The comparisons, in the order of the new report.
+    """
+    base_results = {result["name"]: result for result in base["results"]}
+    head_results = {result["name"]: result for result in head["results"]}
+    names = list(head_results) + [name for name in base_results if name not in head_results]
+
+    comparisons = []
+    for name in names:
+        old, new = base_results.get(name), head_results.get(name)
+        comparison = Comparison(name=name, base=old, head=new)
+        if old and new:
+            if old["p50_ms"]:
+                comparison.p50_change = new["p50_ms"] / old["p50_ms"] - 1
+            if old["queries"]:
+                comparison.queries_change = new["queries"] / old["queries"] - 1
+            comparison.regressed = (
+                comparison.p50_change is not None and comparison.p50_change > threshold
+            ) or new["queries"] > old["queries"]
+        comparisons.append(comparison)
+    return comparisons
@@ -0,0 +1,302 @@
+from typing import Any, Iterator, Optional
+
+import asyncio
+import random
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+import httpx
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+
+from app import settings
+from app.api import deps as api_deps
+from app.views import deps as views_deps
+from benchmarks.harness import percentile
+
+# The steps of a browsing session, in report order
+STEPS = ("login", "list", "cursor", "image", "jump")
+
+_PAGE_LINK = re.compile(r'href="/generation\?page=(\d+)"')
+_CURSOR_LINK = re.compile(
+    r'href="/generation/(?!image/|search|timeline|imports|calendar|day)([^"?/]+)"'
+)
+_IMAGE_LINK = re.compile(r'href="/generation/image/([^"]+)"')
+_NEXT_IMAGE_LINK = re.compile(r'href="/generation/image/([^"]+)" class="nav-button next-button"')
+JUMP_COUNTS = (10, 25, 50, 75, 100, 125, 150, 175, 200)
+
+
+@dataclass
+class LoadTestResult:
+    """The latencies and errors of a load test, by browsing step."""
+
+    concurrency: int
+    seconds: float = 0.0
+    sessions: int = 0
+    latencies_ms: dict[str, list[float]] = field(default_factory=dict)
+    errors: Counter[str] = field(default_factory=Counter)
+
+    def record(self, step: str, milliseconds: float) -> None:
+        """
+        Record the latency of a request.
+
+        Args:
+            step (str): The browsing step, one of `STEPS`.
+            milliseconds (float): The latency.
+        """
+        self.latencies_ms.setdefault(step, []).append(milliseconds)
+
+    @property
+    def requests(self) -> int:
+        """The number of completed requests, logins excluded."""
+        return sum(len(values) for step, values in self.latencies_ms.items() if step != "login")
+
+    @property
+    def throughput(self) -> float:
+        """Completed requests per second, logins excluded."""
+        return self.requests / self.seconds if self.seconds else 0.0
+
+    def percentile(self, q: float, step: Optional[str] = None) -> float:
+        """
+        Get a latency percentile.
+
+        Args:
+            q (float): The percentile, between 0 and 100.
+            step (str | None): The browsing step, or None for all steps but the login.
+
+        Returns:
+            float: The latency, in milliseconds.
+        """
+        if step is not None:
+            return percentile(self.latencies_ms.get(step, []), q)
+        return percentile(
+            [ms for name, values in self.latencies_ms.items() if name != "login" for ms in values],
+            q,
+        )
+
+
+@dataclass
+class Viewer:
+    """One simulated viewer: a logged-in client and its own random choices."""
+
+    client: httpx.AsyncClient
+    random: random.Random
+    result: LoadTestResult
+    images_per_session: int = 10
+    jump_rate: float = 0.2
+    think_time: float = 0.0
+    last_page: int = 1
+
+    async def request(
+        self, step: str, method: str, url: str, **kwargs: Any
+    ) -> Optional[httpx.Response]:
+        """
+        Make a timed request.
+
+        Args:
+            step (str): The browsing step the request is recorded under.
+            method (str): The HTTP method.
+            url (str): The URL, relative to the base URL.
+            **kwargs (Any): Passed to `httpx.AsyncClient.request`.
+
+        Returns:
+            httpx.Response | None: The response, or None if the request failed.
+        """
+        if self.think_time:
+            await asyncio.sleep(self.random.uniform(0, 2 * self.think_time))
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError as exc:
+            self.result.errors[f"{step}: {type(exc).__name__}"] += 1
+            return None
+        if response.status_code >= 400:
+            self.result.errors[f"{step}: {response.status_code}"] += 1
+            return None
+        self.result.record(step, (time.perf_counter() - start) * 1000)
+        return response
+
+    async def login(self, username: str, password: str) -> bool:
+        """
+        Log in through the login form.
+
+        Args:
+            username (str): The username.
+            password (str): The password.
+
+        Returns:
+            bool: Whether the viewer is logged in.
+        """
+        response = await self.request(
+            "login",
+            "POST",
+            "/login",
+            data={"username": username, "password": password},
+            follow_redirects=False,
+        )
+        if response is None or "access_token" not in response.cookies:
+            self.result.errors["login: rejected"] += 1
+            return False
+        self.client.cookies = response.cookies
+        return True
+
+    async def browse(self) -> None:
+        """
+        Browse like a person: open a list page, a cursor on it, then page through its
+        images one by one, sometimes jumping ahead in the history.
+
+        Links are taken from the pages, so every request is one a browser would make.
+        """
+        page = self.random.randint(1, self.last_page)
+        response = await self.request("list", "GET", f"/generation?page={page}")
+        if response is None:
+            return
+        self.last_page = max([self.last_page, *map(int, _PAGE_LINK.findall(response.text))])
+        cursor_ids = _CURSOR_LINK.findall(response.text)
+        if not cursor_ids:
+            return
+
+        cursor_id = self.random.choice(cursor_ids)
+        if self.random.random() < self.jump_rate:
+            response = await self.request(
+                "jump",
+                "POST",
+                "/generation/jump",
+                data={"current_cursor": cursor_id, "jump_count": self.random.choice(JUMP_COUNTS)},
+                follow_redirects=True,
+            )
+        else:
+            response = await self.request("cursor", "GET", f"/generation/{cursor_id}")
+        if response is None:
+            return
+        image_ids = _IMAGE_LINK.findall(response.text)
+        if not image_ids:
+            return
+
+        image_id: Optional[str] = image_ids[0]
+        for _ in range(self.images_per_session):
+            if image_id is None:
+                break
+            response = await self.request("image", "GET", f"/generation/image/{image_id}")
+            if response is None:
+                break
+            match = _NEXT_IMAGE_LINK.search(response.text)
+            image_id = match.group(1) if match else None
+
+
+def make_client(
+    base_url: Optional[str] = None, app: Any = None, timeout: float = 30.0
+) -> httpx.AsyncClient:
+    """
+    Make a client for a running server, or for an ASGI app in this process.
+
+    Args:
+        base_url (str | None): The server URL, e.g. `http://localhost:5000`.
+        app (Any): The ASGI app, used if no URL is given.
+        timeout (float): The request timeout, in seconds.
+
+    Returns:
+        httpx.AsyncClient: The client.
+
+    Raises:
+        ValueError: If neither a URL nor an app is given.
+    """
+    if base_url:
+        return httpx.AsyncClient(base_url=base_url, timeout=timeout)
+    if app is None:
+        raise ValueError("A base URL or an app is required")
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://testserver", timeout=timeout
+    )
+
+
+@contextmanager
+def serve_dataset(app: Any, engine: Engine) -> Iterator[None]:
+    """
+    Serve the app from a dataset, with one session per request as in production.
+
+    Args:
+        app (Any): The FastAPI app.
+        engine (Engine): The engine of the dataset.
+
+    Yields:
+        None: While the app serves the dataset.
+    """
+
+    def get_db() -> Iterator[Session]:
+        with Session(engine) as db:
+            yield db
+
+    app.dependency_overrides[api_deps.get_db] = get_db
+    app.dependency_overrides[views_deps.get_db] = get_db
+    try:
+        yield
+    finally:
+        del app.dependency_overrides[api_deps.get_db]
+        del app.dependency_overrides[views_deps.get_db]
+
+
+async def run_load_test(
+    concurrency: int,
+    duration: float,
+    base_url: Optional[str] = None,
+    app: Any = None,
+    max_sessions: int = 0,
+    images_per_session: int = 10,
+    jump_rate: float = 0.2,
+    think_time: float = 0.0,
+    username: str = settings.FIRST_SUPERUSER_USERNAME,
+    password: str = settings.FIRST_SUPERUSER_PASSWORD,
+    seed: int = 0,
+) -> LoadTestResult:
+    """
+    Simulate concurrent viewers browsing the gallery.
+
+    Every viewer logs in with its own client, then runs browsing sessions back to back
+    until the duration is over.
+
+    Args:
+        concurrency (int): The number of simultaneous viewers.
+        duration (float): How long to browse, in seconds.
+        base_url (str | None): The URL of a running server.
+        app (Any): The ASGI app to load in this process, if no URL is given.
+        max_sessions (int): Stop each viewer after this many sessions. 0 for no limit.
+        images_per_session (int): The number of images viewed in a row per session.
+        jump_rate (float): The fraction of sessions that jump ahead instead of opening a
+            cursor.
+        think_time (float): The mean pause before each request, in seconds.
+        username (str): The username to log in with.
+        password (str): The password.
+        seed (int): The random seed.
+
+    Returns:
+        LoadTestResult: The result.
+    """
+    result = LoadTestResult(concurrency=concurrency)
+    deadline = time.perf_counter() + duration
+
+    async def viewer(number: int) -> None:
+        async with make_client(base_url=base_url, app=app) as client:
+            user = Viewer(
+                client=client,
+                random=random.Random(seed * 10_000 + number),
+                result=result,
+                images_per_session=images_per_session,
+                jump_rate=jump_rate,
+                think_time=think_time,
+            )
+            if not await user.login(username, password):
+                return
+            sessions = 0
+            while time.perf_counter() < deadline and (not max_sessions or sessions < max_sessions):
+                await user.browse()
+                sessions += 1
+            result.sessions += sessions
+
+    start = time.perf_counter()
+    await asyncio.gather(*(viewer(number) for number in range(concurrency)))
+    result.seconds = time.perf_counter() - start
+    return result
@@ -0,0 +1,165 @@
+from typing import Optional
+
+import json
+import resource
+import subprocess  # nosec B404
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlmodel import Session, create_engine
+
+from app import crud
+from app.core import civit
+from app.services.importer import import_cursor_recursive
+from app.views.pages.generation import repair_cursor_chain
+from benchmarks.civitai_stub import CivitaiStub
+from benchmarks.datagen import NEWEST_TIMESTAMP
+
+# The tasks that must run in flat memory, however long the history is
+MEMORY_TASKS = ("import", "repair")
+
+
+@dataclass
+class MemoryResult:
+    """The peak memory of a task against a dataset."""
+
+    task: str
+    cursors: int
+    images: int
+    peak_mb: float
+    max_rss_mb: float
+    seconds: float
+
+
+def max_rss_mb() -> float:
+    """
+    Get the peak resident set size of this process.
+
+    Returns:
+        float: The peak RSS, in MiB.
+    """
+    # On Linux, ru_maxrss survives fork and exec, so a probe would report the peak of the
+    # process that started it if that was higher; VmHWM is reset by exec
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is in KiB on Linux, and in bytes on macOS
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / divisor
+
+
+async def measure_memory(
+    task: str, path: Path, pages: int = 20, batch_size: Optional[int] = None
+) -> MemoryResult:
+    """
+    Run a task against a dataset, tracing the peak memory allocated by Python.
+
+    `import` imports `pages` new pages from the Civitai stand-in on top of the history, so
+    every cursor is inserted into the full page order. `repair` first shifts every page
+    number, so that every cursor of the history needs a fix.
+
+    Args:
+        task (str): The task, one of `MEMORY_TASKS`.
+        path (Path): The dataset database file. It is modified.
+        pages (int): The number of pages imported by `import`.
+        batch_size (int | None): The repair batch size. Defaults to `CURSOR_BATCH_SIZE`.
+
+    Returns:
+        MemoryResult: The result.
+
+    Raises:
+        ValueError: If the task is unknown.
+    """
+    if task not in MEMORY_TASKS:
+        raise ValueError(f"Unknown task {task}, expected one of {', '.join(MEMORY_TASKS)}")
+
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    try:
+        with Session(engine) as db:
+            cursors = db.execute(text("SELECT count(*) FROM cursor")).scalar_one()
+            images = db.execute(text("SELECT count(*) FROM generated_image")).scalar_one()
+            stub = None
+            if task == "import":
+                head = await crud.cursor.get_latest(db=db)
+                stub = CivitaiStub.generate(
+                    pages, newest=NEWEST_TIMESTAMP + timedelta(days=1), tail_cursor=head.id
+                )
+            else:
+                db.execute(text("UPDATE cursor SET page_number = page_number + 1"))
+                db.commit()
+
+            tracemalloc.start()
+            start = time.perf_counter()
+            if stub is not None:
+                async with civit.get_client(transport=stub.transport()) as client:
+                    await import_cursor_recursive(cursor_id=None, db=db, client=client)
+            else:
+                await repair_cursor_chain(db=db, batch_size=batch_size)
+            seconds = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    finally:
+        engine.dispose()
+
+    return MemoryResult(
+        task=task,
+        cursors=cursors,
+        images=images,
+        peak_mb=round(peak / 1024 / 1024, 2),
+        max_rss_mb=round(max_rss_mb(), 1),
+        seconds=round(seconds, 3),
+    )
+
+
+def probe_memory(task: str, path: Path, pages: int = 20) -> MemoryResult:
+    """
+    Run `measure_memory` in a fresh interpreter, so the peak RSS is the task's own.
+
+    Args:
+        task (str): The task, one of `MEMORY_TASKS`.
+        path (Path): The dataset database file. It is modified.
+        pages (int): The number of pages imported by `import`.
+
+    Returns:
+        MemoryResult: The result.
+
+    Raises:
+        RuntimeError: If the task fails.
+    """
+    command = [sys.executable, "-m", "benchmarks", "memory-probe", task, str(path)]
+    process = subprocess.run(  # nosec B603
+        [*command, "--pages", str(pages)], capture_output=True, text=True, check=False
+    )
+    if process.returncode:
+        raise RuntimeError(f"The {task} memory probe failed:\n{process.stderr[-2000:]}")
+    return MemoryResult(**json.loads(process.stdout.strip().splitlines()[-1]))
+
+
+def memory_growth(results: list[MemoryResult]) -> dict[str, tuple[float, float]]:
+    """
+    Get how much more memory each task needs on the largest dataset than on the smallest.
+
+    Args:
+        results (list[MemoryResult]): The results of the tasks on several datasets.
+
+    Returns:
+        dict[str, tuple[float, float]]: The growth of the traced peak and of the peak RSS
+            in MiB, by task.
+    """
+    growth = {}
+    for task in MEMORY_TASKS:
+        runs = sorted((r for r in results if r.task == task), key=lambda r: r.cursors)
+        if len(runs) > 1:
+            growth[task] = (
+                round(runs[-1].peak_mb - runs[0].peak_mb, 2),
+                round(runs[-1].max_rss_mb - runs[0].max_rss_mb, 1),
+            )
+    return growth
@@ -0,0 +1,123 @@
+import re
+import statistics
+import subprocess  # nosec B404
+import sys
+from dataclasses import dataclass, field
+
+IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+# Integrations that must not be imported unless they are used
+LAZY_MODULES = ("telegram", "emails")
+
+
+@dataclass
+class ImportTime:
+    """The import time of one module, as reported by `python -X importtime`."""
+
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+@dataclass
+class ImportReport:
+    """How long a fresh interpreter takes to import a module, and what it imports."""
+
+    module: str
+    seconds: list[float] = field(default_factory=list)
+    imports: list[ImportTime] = field(default_factory=list)
+
+    @property
+    def median_seconds(self) -> float:
+        """The median wall-clock time of the runs."""
+        return statistics.median(self.seconds) if self.seconds else 0.0
+
+    @property
+    def modules(self) -> set[str]:
+        """The names of all imported modules."""
+        return {item.module for item in self.imports}
+
+    def slowest(self, count: int = 25, own: bool = False) -> list[ImportTime]:
+        """
+        Get the slowest imports.
+
+        Args:
+            count (int): The number of imports.
+            own (bool): Only the modules of the project, e.g. `app.*`.
+
+        Returns:
+            list[ImportTime]: The imports, by cumulative time, slowest first.
+        """
+        package = self.module.split(".")[0]
+        imports = [
+            item
+            for item in self.imports
+            if not own or item.module == package or item.module.startswith(f"{package}.")
+        ]
+        return sorted(imports, key=lambda item: item.cumulative_us, reverse=True)[:count]
+
+
+def parse_import_times(output: str) -> list[ImportTime]:
+    """
+    Parse the output of `python -X importtime`.
+
+    Args:
+        output (str): The standard error of the interpreter.
+
+    Returns:
+        list[ImportTime]: The imports, in the order they finished.
+    """
+    imports = []
+    for line in output.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            imports.append(
+                ImportTime(
+                    module=module,
+                    self_us=int(self_us),
+                    cumulative_us=int(cumulative_us),
+                    depth=len(indent) // 2,
+                )
+            )
+    return imports
+
+
+def import_report(module: str, runs: int = 5, python: str = sys.executable) -> ImportReport:
+    """
+    Import a module in fresh interpreters, timing the whole start-up.
+
+    The first run is traced with `-X importtime`; the others are timed only, as the tracing
+    itself slows the import down.
+
+    Args:
+        module (str): The module, e.g. `app.core.app`.
+        runs (int): The number of timed runs.
+        python (str): The Python interpreter.
+
+    Returns:
+        ImportReport: The report.
+
+    Raises:
+        RuntimeError: If the module cannot be imported.
+    """
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"import {module}; print(time.perf_counter() - start)"
+    )
+    report = ImportReport(module=module)
+
+    traced = subprocess.run(  # nosec B603
+        [python, "-X", "importtime", "-c", code], capture_output=True, text=True, check=False
+    )
+    if traced.returncode:
+        raise RuntimeError(f"Importing {module} failed:\n{traced.stderr[-2000:]}")
+    report.imports = parse_import_times(traced.stderr)
+
+    for _ in range(runs):
+        timed = subprocess.run(  # nosec B603
+            [python, "-c", code], capture_output=True, text=True, check=True
+        )
+        report.seconds.append(float(timed.stdout.strip().splitlines()[-1]))
+    return report
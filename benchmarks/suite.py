@@ -0,0 +1,252 @@
+from typing import Any, Awaitable, Callable, Iterator, Optional
+
+import random
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from httpx import Response
+from sqlalchemy import text
+from sqlmodel import Session
+
+from app import crud, settings
+from app.api import deps as api_deps
+from app.core import civit
+from app.core.app import app
+from app.core.page_cache import page_cache
+from app.services.importer import import_cursor_recursive
+from app.views import deps as views_deps
+from app.views.pages.generation import repair_cursor_chain
+from benchmarks.civitai_stub import CivitaiStub
+from benchmarks.datagen import NEWEST_TIMESTAMP
+from benchmarks.harness import BenchmarkResult, measure
+
+
+@dataclass
+class BenchmarkContext:
+    """The dataset and logged-in client the benchmarks run against."""
+
+    db: Session
+    client: TestClient
+    iterations: int
+    import_pages: int
+    random: random.Random
+    civitai_options: dict[str, float] = field(default_factory=dict)
+    cursor_ids: list[str] = field(default_factory=list)
+    image_ids: list[str] = field(default_factory=list)
+    total_cursors: int = 0
+
+    def pick(self, items: list[str], i: int) -> str:
+        """
+        Pick a sample for an iteration, the same one on every run.
+
+        Args:
+            items (list[str]): The samples.
+            i (int): The iteration number.
+
+        Returns:
+            str: The sample.
+        """
+        return items[i % len(items)]
+
+
+BenchmarkRunner = Callable[[BenchmarkContext], Awaitable[BenchmarkResult]]
+
+# Benchmarks in run order. Read-only benchmarks come first, as the others add rows.
+BENCHMARKS: dict[str, BenchmarkRunner] = {}
+
+
+def benchmark(name: str) -> Callable[[BenchmarkRunner], BenchmarkRunner]:
+    """
+    Register a benchmark.
+
+    Args:
+        name (str): The benchmark name, used in reports and by `--only`.
+
+    Returns:
+        Callable[[BenchmarkRunner], BenchmarkRunner]: The decorator.
+    """
+
+    def decorator(func: BenchmarkRunner) -> BenchmarkRunner:
+        BENCHMARKS[name] = func
+        return func
+
+    return decorator
+
+
+@contextmanager
+def benchmark_context(
+    db: Session,
+    iterations: int,
+    import_pages: int,
+    seed: int = 0,
+    civitai_options: Optional[dict[str, float]] = None,
+) -> Iterator[BenchmarkContext]:
+    """
+    Log in to the app against a dataset, and sample the cursors and images to request.
+
+    Args:
+        db (Session): A session on the dataset.
+        iterations (int): The number of measured calls per benchmark.
+        import_pages (int): The number of pages imported per import call.
+        seed (int): The random seed for the samples.
+        civitai_options (dict[str, float] | None): Latency and failure rates of the
+            Civitai stand-in, see `CivitaiStub`.
+
+    Yields:
+        BenchmarkContext: The context.
+    """
+
+    def override_get_db() -> Iterator[Session]:
+        yield db
+
+    app.dependency_overrides[api_deps.get_db] = override_get_db
+    app.dependency_overrides[views_deps.get_db] = override_get_db
+    try:
+        client = TestClient(app)
+        response = client.post(
+            "/login",
+            data={
+                "username": settings.FIRST_SUPERUSER_USERNAME,
+                "password": settings.FIRST_SUPERUSER_PASSWORD,
+            },
+            follow_redirects=False,
+        )
+        client.cookies = response.cookies
+
+        rng = random.Random(seed)
+        total = db.execute(text("SELECT count(*) FROM cursor")).scalar_one()
+        pages = sorted(rng.sample(range(1, total + 1), min(total, 200)))
+        rows = db.execute(
+            text(
+                "SELECT cursor.id, (SELECT min(id) FROM generated_image "
+                "WHERE generated_image.cursor_id = cursor.id) FROM cursor "
+                f"WHERE page_number IN ({', '.join(map(str, pages))})"  # nosec B608
+            )
+        ).all()
+        rng.shuffle(rows)
+        yield BenchmarkContext(
+            db=db,
+            client=client,
+            iterations=iterations,
+            import_pages=import_pages,
+            random=rng,
+            civitai_options=civitai_options or {},
+            cursor_ids=[cursor_id for cursor_id, _ in rows],
+            image_ids=[image_id for _, image_id in rows if image_id],
+            total_cursors=total,
+        )
+    finally:
+        del app.dependency_overrides[api_deps.get_db]
+        del app.dependency_overrides[views_deps.get_db]
+
+
+def _check(response: Response, status_code: int = 200) -> Response:
+    if response.status_code != status_code:
+        raise RuntimeError(f"{response.request.url} returned {response.status_code}")
+    return response
+
+
+def _get_page(ctx: BenchmarkContext, url: str) -> Response:
+    # Measure rendering, not the page cache
+    page_cache.clear()
+    return _check(ctx.client.get(url))
+
+
+@benchmark("list_first_page")
+async def bench_list_first_page(ctx: BenchmarkContext) -> BenchmarkResult:
+    return await measure(
+        "list_first_page", lambda i: _get_page(ctx, "/generation?page=1"), ctx.iterations
+    )
+
+
+@benchmark("list_deep_page")
+async def bench_list_deep_page(ctx: BenchmarkContext) -> BenchmarkResult:
+    page = max(1, ctx.total_cursors // 10 // 2)
+    return await measure(
+        "list_deep_page", lambda i: _get_page(ctx, f"/generation?page={page}"), ctx.iterations
+    )
+
+
+@benchmark("cursor_detail")
+async def bench_cursor_detail(ctx: BenchmarkContext) -> BenchmarkResult:
+    return await measure(
+        "cursor_detail",
+        lambda i: _get_page(ctx, f"/generation/{ctx.pick(ctx.cursor_ids, i)}"),
+        ctx.iterations,
+    )
+
+
+@benchmark("image_view")
+async def bench_image_view(ctx: BenchmarkContext) -> BenchmarkResult:
+    return await measure(
+        "image_view",
+        lambda i: _get_page(ctx, f"/generation/image/{ctx.pick(ctx.image_ids, i)}"),
+        ctx.iterations,
+    )
+
+
+@benchmark("jump")
+async def bench_jump(ctx: BenchmarkContext) -> BenchmarkResult:
+    def jump(i: int) -> Response:
+        response = ctx.client.post(
+            "/generation/jump",
+            data={"current_cursor": ctx.pick(ctx.cursor_ids, i), "jump_count": 100},
+            follow_redirects=False,
+        )
+        return _check(response, 302)
+
+    return await measure("jump", jump, ctx.iterations)
+
+
+@benchmark("import_pages")
+async def bench_import_pages(ctx: BenchmarkContext) -> BenchmarkResult:
+    totals = {"calls": 0, "cursors": 0, "images": 0, "failed": 0}
+    stats = civit.ImportStats()
+
+    async def import_pages(i: int) -> None:
+        # New pages, newer than everything imported so far, ending at the current newest
+        # cursor so the import stops as it would on a real refresh
+        head = await crud.cursor.get_latest(db=ctx.db)
+        stub = CivitaiStub.generate(
+            ctx.import_pages,
+            newest=NEWEST_TIMESTAMP + timedelta(days=i + 1),
+            seed=i,
+            tail_cursor=head.id,
+            **ctx.civitai_options,
+        )
+        totals["calls"] += 1
+        async with civit.get_client(transport=stub.transport()) as client:
+            try:
+                cursors, images = await import_cursor_recursive(
+                    cursor_id=None, db=ctx.db, client=client, stats=stats
+                )
+            except HTTPException:
+                ctx.db.rollback()
+                totals["failed"] += 1
+                return
+        totals["cursors"] += cursors
+        totals["images"] += images
+
+    iterations = max(1, ctx.iterations // 10)
+    result = await measure("import_pages", import_pages, iterations, warmup=1)
+    seconds = result.mean_ms / 1000 * totals["calls"]
+    result.extra = {
+        "pages": ctx.import_pages,
+        "pages_per_second": round(totals["cursors"] / seconds, 2),
+        "images_per_second": round(totals["images"] / seconds, 2),
+        "failed": totals["failed"],
+        "fetch_s": round(stats.fetch_seconds, 3),
+        "parse_s": round(stats.parse_seconds, 3),
+        "db_s": round(stats.db_seconds, 3),
+        "relink_s": round(stats.relink_seconds, 3),
+    }
+    return result
+
+
+@benchmark("repair")
+async def bench_repair(ctx: BenchmarkContext) -> BenchmarkResult:
+    iterations = max(1, ctx.iterations // 10)
+    return await measure("repair", lambda i: repair_cursor_chain(db=ctx.db), iterations, warmup=1)
@@ -28,6 +28,15 @@ target_metadata.naming_convention = {
     "fk": "fk_%(table_name)s_%(column_0_name)" "s_%(referred_table_name)s",
     "pk": "pk_%(table_name)s",
 }
+
+
+def include_object(object, name, type_, reflected, compare_to):  # noqa: A002
+    """Skip FTS5 virtual tables and their shadow tables, which are managed by hand."""
+    if type_ == "table" and "_fts" in name:
+        return False
+    return True
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -53,6 +62,7 @@ def run_migrations_offline() -> None:
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
         render_as_batch=True,
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -74,7 +84,10 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata, render_as_batch=True
+            connection=connection,
+            target_metadata=target_metadata,
+            render_as_batch=True,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
@@ -0,0 +1,75 @@
+"""image position
+
+Revision ID: 5a9e3c71f0b2
+Revises: d41a6f0b8e25
+Create Date: 2026-10-19 19:12:44.108235
+
+"""
+from pathlib import Path
+
+from alembic import op
+from alembic.operations import Operations
+from alembic.runtime.migration import MigrationContext
+import sqlalchemy as sa
+import sqlmodel # added
+
+
+# revision identifiers, used by Alembic.
+revision = '5a9e3c71f0b2'
+down_revision = 'd41a6f0b8e25'
+branch_labels = None
+depends_on = None
+
+
+def archive_files():
+    # The yearly archives sit next to the main database (see app.db.archive)
+    database = op.get_bind().engine.url.database
+    if not database:
+        return []
+    return sorted((Path(database).parent / "archive").glob("archive-*.sqlite3"))
+
+
+def in_archives(migrate):
+    for path in archive_files():
+        engine = sa.create_engine(f"sqlite:///{path}")
+        try:
+            with engine.begin() as connection:
+                migrate(Operations(MigrationContext.configure(connection)))
+        finally:
+            engine.dispose()
+
+
+def upgrade_store(ops) -> None:
+    ops.add_column(
+        'generated_image', sa.Column('position', sa.Integer(), server_default='0', nullable=False)
+    )
+    # The images were inserted in the order of the Civitai API, which the rowid kept
+    ops.execute(
+        "UPDATE generated_image SET position = ordered.position FROM ("
+        "SELECT rowid AS image_rowid, "
+        "row_number() OVER (PARTITION BY cursor_id ORDER BY rowid) - 1 AS position "
+        "FROM generated_image"
+        ") AS ordered WHERE generated_image.rowid = ordered.image_rowid"
+    )
+    with ops.batch_alter_table('generated_image', schema=None) as batch_op:
+        batch_op.drop_index('ix_generated_image_cursor_id_id')
+        batch_op.create_index(
+            'ix_generated_image_cursor_id_position', ['cursor_id', 'position', 'id'], unique=False
+        )
+
+
+def downgrade_store(ops) -> None:
+    with ops.batch_alter_table('generated_image', schema=None) as batch_op:
+        batch_op.drop_index('ix_generated_image_cursor_id_position')
+        batch_op.create_index('ix_generated_image_cursor_id_id', ['cursor_id', 'id'], unique=False)
+        batch_op.drop_column('position')
+
+
+def upgrade() -> None:
+    upgrade_store(op)
+    in_archives(upgrade_store)
+
+
+def downgrade() -> None:
+    downgrade_store(op)
+    in_archives(downgrade_store)
@@ -0,0 +1,101 @@
+"""generation steps
+
+Revision ID: 7b5323f24327
+Revises: 2077e2a2e360
+Create Date: 2026-10-19 09:12:41.118302
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel # added
+
+
+# revision identifiers, used by Alembic.
+revision = '7b5323f24327'
+down_revision = '2077e2a2e360'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('generation_step',
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('id', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('workflow_id', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('cursor_id', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('prompt', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('negative_prompt', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('base_model', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('model_id', sa.Integer(), nullable=True),
+    sa.Column('sampler', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('seed', sa.Integer(), nullable=True),
+    sa.Column('steps', sa.Integer(), nullable=True),
+    sa.Column('cfg_scale', sa.Float(), nullable=True),
+    sa.ForeignKeyConstraint(['cursor_id'], ['cursor.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('generation_step', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_generation_step_workflow_id'), ['workflow_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_generation_step_cursor_id'), ['cursor_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_generation_step_base_model'), ['base_model'], unique=False)
+        batch_op.create_index(batch_op.f('ix_generation_step_model_id'), ['model_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_generation_step_sampler'), ['sampler'], unique=False)
+
+    with op.batch_alter_table('generated_image', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('step_id', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+        batch_op.add_column(sa.Column('seed', sa.Integer(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_generated_image_step_id'), ['step_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_generated_image_seed'), ['seed'], unique=False)
+        batch_op.create_foreign_key(
+            batch_op.f('fk_generated_image_step_id_generation_step'),
+            'generation_step', ['step_id'], ['id'],
+        )
+
+    # Full-text index on the prompt text, kept in sync by triggers
+    op.execute(
+        "CREATE VIRTUAL TABLE generation_step_fts USING fts5("
+        "prompt, negative_prompt, content='generation_step', content_rowid='rowid')"
+    )
+    op.execute(
+        "CREATE TRIGGER generation_step_fts_ai AFTER INSERT ON generation_step BEGIN "
+        "INSERT INTO generation_step_fts(rowid, prompt, negative_prompt) "
+        "VALUES (new.rowid, new.prompt, new.negative_prompt); END"
+    )
+    op.execute(
+        "CREATE TRIGGER generation_step_fts_ad AFTER DELETE ON generation_step BEGIN "
+        "INSERT INTO generation_step_fts(generation_step_fts, rowid, prompt, negative_prompt) "
+        "VALUES ('delete', old.rowid, old.prompt, old.negative_prompt); END"
+    )
+    op.execute(
+        "CREATE TRIGGER generation_step_fts_au AFTER UPDATE ON generation_step BEGIN "
+        "INSERT INTO generation_step_fts(generation_step_fts, rowid, prompt, negative_prompt) "
+        "VALUES ('delete', old.rowid, old.prompt, old.negative_prompt); "
+        "INSERT INTO generation_step_fts(rowid, prompt, negative_prompt) "
+        "VALUES (new.rowid, new.prompt, new.negative_prompt); END"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS generation_step_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS generation_step_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS generation_step_fts_ai")
+    op.execute("DROP TABLE IF EXISTS generation_step_fts")
+
+    with op.batch_alter_table('generated_image', schema=None) as batch_op:
+        batch_op.drop_constraint(
+            batch_op.f('fk_generated_image_step_id_generation_step'), type_='foreignkey'
+        )
+        batch_op.drop_index(batch_op.f('ix_generated_image_seed'))
+        batch_op.drop_index(batch_op.f('ix_generated_image_step_id'))
+        batch_op.drop_column('seed')
+        batch_op.drop_column('step_id')
+
+    with op.batch_alter_table('generation_step', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_generation_step_sampler'))
+        batch_op.drop_index(batch_op.f('ix_generation_step_model_id'))
+        batch_op.drop_index(batch_op.f('ix_generation_step_base_model'))
+        batch_op.drop_index(batch_op.f('ix_generation_step_cursor_id'))
+        batch_op.drop_index(batch_op.f('ix_generation_step_workflow_id'))
+
+    op.drop_table('generation_step')
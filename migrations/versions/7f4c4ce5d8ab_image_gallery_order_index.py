@@ -0,0 +1,27 @@
+"""image gallery order index
+
+Revision ID: 7f4c4ce5d8ab
+Revises: 7b5323f24327
+Create Date: 2026-10-19 10:03:27.540912
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel # added
+
+
+# revision identifiers, used by Alembic.
+revision = '7f4c4ce5d8ab'
+down_revision = '7b5323f24327'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('generated_image', schema=None) as batch_op:
+        batch_op.create_index('ix_generated_image_cursor_id_id', ['cursor_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('generated_image', schema=None) as batch_op:
+        batch_op.drop_index('ix_generated_image_cursor_id_id')
@@ -0,0 +1,95 @@
+"""url prefix
+
+Revision ID: 9e2b7d4c6a13
+Revises: 5d2f8a61c9e4
+Create Date: 2026-10-19 15:20:41.207318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel # added
+
+
+# revision identifiers, used by Alembic.
+revision = '9e2b7d4c6a13'
+down_revision = '5d2f8a61c9e4'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 5000
+
+
+def split_url(url):
+    # A copy of app.models.url_prefix.split_url, as it was when this migration was written
+    scheme, separator, rest = url.partition("://")
+    if not separator:
+        return "", url
+    parts = rest.split("/", 2)
+    if len(parts) < 3:
+        return "", url
+    prefix = f"{scheme}://{parts[0]}/{parts[1]}/"
+    return prefix, url[len(prefix) :]
+
+
+def upgrade() -> None:
+    op.create_table('url_prefix',
+    sa.Column('prefix', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('prefix')
+    )
+    with op.batch_alter_table('generated_image', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('url_prefix_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('url_suffix', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+
+    # Split the URLs in keyset batches, so huge tables are not loaded at once
+    conn = op.get_bind()
+    prefix_ids = {}
+    last_id = ""
+    while True:
+        rows = conn.execute(
+            sa.text("SELECT id, url FROM generated_image WHERE id > :last_id ORDER BY id LIMIT :limit"),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).all()
+        if not rows:
+            break
+        updates = []
+        for image_id, url in rows:
+            prefix, suffix = split_url(url)
+            if prefix and prefix not in prefix_ids:
+                conn.execute(sa.text("INSERT INTO url_prefix (prefix) VALUES (:prefix)"), {"prefix": prefix})
+                prefix_ids[prefix] = conn.execute(
+                    sa.text("SELECT id FROM url_prefix WHERE prefix = :prefix"), {"prefix": prefix}
+                ).scalar_one()
+            updates.append({"id": image_id, "prefix_id": prefix_ids.get(prefix), "suffix": suffix})
+        conn.execute(
+            sa.text("UPDATE generated_image SET url_prefix_id = :prefix_id, url_suffix = :suffix WHERE id = :id"),
+            updates,
+        )
+        last_id = rows[-1][0]
+
+    with op.batch_alter_table('generated_image', schema=None) as batch_op:
+        batch_op.alter_column('url_suffix', existing_type=sqlmodel.sql.sqltypes.AutoString(), nullable=False)
+        batch_op.create_foreign_key(batch_op.f('fk_generated_image_url_prefix_id_url_prefix'), 'url_prefix', ['url_prefix_id'], ['id'])
+        batch_op.drop_index('ix_generated_image_url')
+        batch_op.drop_column('url')
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('generated_image', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('url', sa.VARCHAR(), nullable=True))
+
+    op.execute(
+        "UPDATE generated_image SET url = coalesce("
+        "(SELECT prefix FROM url_prefix WHERE url_prefix.id = generated_image.url_prefix_id), ''"
+        ") || url_suffix"
+    )
+
+    with op.batch_alter_table('generated_image', schema=None) as batch_op:
+        batch_op.alter_column('url', existing_type=sa.VARCHAR(), nullable=False)
+        batch_op.create_index('ix_generated_image_url', ['url'], unique=False)
+        batch_op.drop_constraint(batch_op.f('fk_generated_image_url_prefix_id_url_prefix'), type_='foreignkey')
+        batch_op.drop_column('url_suffix')
+        batch_op.drop_column('url_prefix_id')
+
+    op.drop_table('url_prefix')
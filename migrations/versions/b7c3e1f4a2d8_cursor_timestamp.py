@@ -0,0 +1,69 @@
+"""cursor timestamp
+
+Revision ID: b7c3e1f4a2d8
+Revises: 9e2b7d4c6a13
+Create Date: 2026-10-19 16:42:09.513267
+
+"""
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel # added
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7c3e1f4a2d8'
+down_revision = '9e2b7d4c6a13'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 5000
+
+
+def parse_cursor_id(cursor_id):
+    # A copy of app.crud.cursor.parse_cursor_id, as it was when this migration was written
+    model_id, _, timestamp_str = cursor_id.partition("-")
+    timestamp = datetime.strptime(timestamp_str[:14], "%Y%m%d%H%M%S").replace(tzinfo=timezone.utc)
+    milliseconds = int(timestamp_str[14:17] or 0)
+    return int(model_id), int(timestamp.timestamp()) * 1000 + milliseconds
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('cursor', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('model_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('timestamp_ms', sa.Integer(), nullable=True))
+
+    # Parse the cursor ids in keyset batches, so huge tables are not loaded at once
+    conn = op.get_bind()
+    last_id = ""
+    while True:
+        ids = conn.execute(
+            sa.text("SELECT id FROM cursor WHERE id > :last_id ORDER BY id LIMIT :limit"),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).scalars().all()
+        if not ids:
+            break
+        updates = []
+        for cursor_id in ids:
+            model_id, timestamp_ms = parse_cursor_id(cursor_id)
+            updates.append({"id": cursor_id, "model_id": model_id, "timestamp_ms": timestamp_ms})
+        conn.execute(
+            sa.text("UPDATE cursor SET model_id = :model_id, timestamp_ms = :timestamp_ms WHERE id = :id"),
+            updates,
+        )
+        last_id = ids[-1]
+
+    with op.batch_alter_table('cursor', schema=None) as batch_op:
+        batch_op.alter_column('model_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.alter_column('timestamp_ms', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_index(batch_op.f('ix_cursor_model_id'), ['model_id'], unique=False)
+        batch_op.create_index('ix_cursor_timestamp_ms_id', ['timestamp_ms', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('cursor', schema=None) as batch_op:
+        batch_op.drop_index('ix_cursor_timestamp_ms_id')
+        batch_op.drop_index(batch_op.f('ix_cursor_model_id'))
+        batch_op.drop_column('timestamp_ms')
+        batch_op.drop_column('model_id')
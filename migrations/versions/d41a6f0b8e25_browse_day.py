@@ -0,0 +1,81 @@
+"""browse day
+
+Revision ID: d41a6f0b8e25
+Revises: b7c3e1f4a2d8
+Create Date: 2026-10-19 17:58:31.402716
+
+"""
+from pathlib import Path
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel # added
+
+
+# revision identifiers, used by Alembic.
+revision = 'd41a6f0b8e25'
+down_revision = 'b7c3e1f4a2d8'
+branch_labels = None
+depends_on = None
+
+# The days of the cursors and images of a database; SQLite returns the bare cursor id of
+# the max() timestamp
+DAYS = (
+    "SELECT date(cursor.timestamp_ms / 1000, 'unixepoch') AS day, "
+    "count(cursor.id) AS cursor_count, coalesce(sum(images.count), 0) AS image_count, "
+    "cursor.id AS first_cursor_id, max(cursor.timestamp_ms) AS first_timestamp_ms "
+    "FROM cursor LEFT OUTER JOIN ("
+    "SELECT cursor_id, count(*) AS count FROM generated_image GROUP BY cursor_id"
+    ") AS images ON images.cursor_id = cursor.id "
+    "GROUP BY date(cursor.timestamp_ms / 1000, 'unixepoch')"
+)
+
+ADD_DAY = (
+    "INSERT INTO browse_day "
+    "(day, cursor_count, image_count, first_cursor_id, first_timestamp_ms) "
+    "VALUES (:day, :cursor_count, :image_count, :first_cursor_id, :first_timestamp_ms) "
+    "ON CONFLICT (day) DO UPDATE SET "
+    "cursor_count = cursor_count + excluded.cursor_count, "
+    "image_count = image_count + excluded.image_count, "
+    "first_cursor_id = CASE WHEN excluded.first_timestamp_ms > first_timestamp_ms "
+    "THEN excluded.first_cursor_id ELSE first_cursor_id END, "
+    "first_timestamp_ms = max(first_timestamp_ms, excluded.first_timestamp_ms)"
+)
+
+
+def archive_files():
+    # The yearly archives sit next to the main database (see app.db.archive)
+    database = op.get_bind().engine.url.database
+    if not database:
+        return []
+    return sorted((Path(database).parent / "archive").glob("archive-*.sqlite3"))
+
+
+def upgrade() -> None:
+    op.create_table('browse_day',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('cursor_count', sa.Integer(), nullable=False),
+    sa.Column('image_count', sa.Integer(), nullable=False),
+    sa.Column('first_cursor_id', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('first_timestamp_ms', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day')
+    )
+
+    # Count the existing history, in the main database and in the archives
+    op.execute(
+        "INSERT INTO browse_day "
+        "(day, cursor_count, image_count, first_cursor_id, first_timestamp_ms) " + DAYS
+    )
+    for path in archive_files():
+        engine = sa.create_engine(f"sqlite:///{path}")
+        try:
+            with engine.connect() as connection:
+                days = connection.execute(sa.text(DAYS)).mappings().all()
+        finally:
+            engine.dispose()
+        if days:
+            op.get_bind().execute(sa.text(ADD_DAY), [dict(day) for day in days])
+
+
+def downgrade() -> None:
+    op.drop_table('browse_day')
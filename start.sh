@@ -2,4 +2,6 @@
 
 alembic upgrade head
 
+python -m app --build-static
+
 python -m app
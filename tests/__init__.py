@@ -0,0 +1,8 @@
+import os
+import tempfile
+
+# Imported before the conftest imports `app`, so even the log lines of that import stay
+# out of app/data/logs. The sinks are then moved to the session temp dir (see `log_dir`).
+_log_dir = tempfile.mkdtemp(prefix="civit-browser-logs-")
+os.environ.setdefault("LOG_FILE", os.path.join(_log_dir, "log.log"))
+os.environ.setdefault("ERROR_LOG_FILE", os.path.join(_log_dir, "error_log.log"))
@@ -0,0 +1,259 @@
+from unittest.mock import patch
+
+import httpx
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app import crud, models, settings
+from app.core import civit
+from benchmarks.civitai_stub import CivitaiStub
+
+CURSOR_IDS = ["1-20241030195910517", "1-20241029195910517", "1-20241028195910517"]
+
+
+async def _create_gallery(db: Session) -> None:
+    """
+    Create three cursors, newest first, each with two images.
+    """
+    for i, cursor_id in enumerate(CURSOR_IDS):
+        next_cursor_id = CURSOR_IDS[i + 1] if i + 1 < len(CURSOR_IDS) else None
+        await crud.cursor.create(
+            db=db, obj_in=models.CursorCreate(id=cursor_id, next_cursor_id=next_cursor_id)
+        )
+        await crud.generation_step.create(
+            db=db,
+            obj_in=models.GenerationStepCreate(
+                id=f"{cursor_id}-0", workflow_id=cursor_id, cursor_id=cursor_id, prompt="a fox"
+            ),
+        )
+        for n in range(2):
+            await crud.generated_image.create(
+                db=db,
+                obj_in=models.GeneratedImageCreate(
+                    id=f"{cursor_id}-img{n}",
+                    url=f"https://image.civitai.com/test/{cursor_id}-img{n}.jpeg",
+                    width=832,
+                    height=1216,
+                    cursor_id=cursor_id,
+                    step_id=f"{cursor_id}-0",
+                ),
+            )
+
+
+async def test_list_cursors_keyset(
+    db_with_user: Session, client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    """
+    Test that cursors are listed newest first and paginated with the `next` token.
+    """
+    await _create_gallery(db_with_user)
+    url = f"{settings.API_V1_PREFIX}/generation/cursors"
+
+    r = client.get(url, params={"limit": 2}, headers=normal_user_token_headers)
+    assert r.status_code == 200
+    page = r.json()
+    assert [cursor["id"] for cursor in page["items"]] == CURSOR_IDS[:2]
+    assert page["next"] == CURSOR_IDS[1]
+
+    r = client.get(
+        url, params={"limit": 2, "before": page["next"]}, headers=normal_user_token_headers
+    )
+    page = r.json()
+    assert [cursor["id"] for cursor in page["items"]] == CURSOR_IDS[2:]
+    assert page["next"] is None
+
+    r = client.get(url, params={"before": "not-a-cursor"}, headers=normal_user_token_headers)
+    assert r.status_code == 400
+
+    day = CURSOR_IDS[0].split("-")[1]
+    r = client.get(
+        f"{settings.API_V1_PREFIX}/generation/days",
+        params={"year": day[:4], "month": day[4:6]},
+        headers=normal_user_token_headers,
+    )
+    assert r.status_code == 200
+    assert CURSOR_IDS[0] in [item["first_cursor_id"] for item in r.json()["items"]]
+
+
+async def test_get_cursor_and_neighbors(
+    db_with_user: Session, client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    """
+    Test cursor detail and image neighbours across cursor boundaries.
+    """
+    await _create_gallery(db_with_user)
+    prefix = f"{settings.API_V1_PREFIX}/generation"
+
+    r = client.get(f"{prefix}/cursors/{CURSOR_IDS[1]}", headers=normal_user_token_headers)
+    assert r.status_code == 200
+    assert [image["id"] for image in r.json()["images"]] == [
+        f"{CURSOR_IDS[1]}-img0",
+        f"{CURSOR_IDS[1]}-img1",
+    ]
+
+    r = client.get(f"{prefix}/cursors/missing", headers=normal_user_token_headers)
+    assert r.status_code == 404
+
+    r = client.get(
+        f"{prefix}/images/{CURSOR_IDS[1]}-img1/neighbors",
+        params={"limit": 2},
+        headers=normal_user_token_headers,
+    )
+    neighbors = r.json()
+    assert [image["id"] for image in neighbors["before"]] == [
+        f"{CURSOR_IDS[1]}-img0",
+        f"{CURSOR_IDS[0]}-img1",
+    ]
+    assert [image["id"] for image in neighbors["after"]] == [
+        f"{CURSOR_IDS[2]}-img0",
+        f"{CURSOR_IDS[2]}-img1",
+    ]
+
+
+async def test_timeline_endpoint(
+    db_with_user: Session, client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    """
+    Test that the timeline is paginated across cursor boundaries with the `next` token.
+    """
+    await _create_gallery(db_with_user)
+    url = f"{settings.API_V1_PREFIX}/generation/timeline"
+
+    r = client.get(url, params={"limit": 3}, headers=normal_user_token_headers)
+    assert r.status_code == 200
+    page = r.json()
+    assert [image["id"] for image in page["items"]] == [
+        f"{CURSOR_IDS[0]}-img0",
+        f"{CURSOR_IDS[0]}-img1",
+        f"{CURSOR_IDS[1]}-img0",
+    ]
+    assert page["next"] == f"{CURSOR_IDS[1]}-img0"
+
+    r = client.get(
+        url, params={"limit": 3, "after": page["next"]}, headers=normal_user_token_headers
+    )
+    page = r.json()
+    assert [image["id"] for image in page["items"]] == [
+        f"{CURSOR_IDS[1]}-img1",
+        f"{CURSOR_IDS[2]}-img0",
+        f"{CURSOR_IDS[2]}-img1",
+    ]
+
+    r = client.get(url, params={"after": "missing"}, headers=normal_user_token_headers)
+    assert r.status_code == 400
+
+
+async def test_search_images_endpoint(
+    db_with_user: Session, client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    """
+    Test that the search endpoint pages through every match exactly once.
+    """
+    await _create_gallery(db_with_user)
+    url = f"{settings.API_V1_PREFIX}/generation/search"
+
+    seen: list[str] = []
+    params: dict[str, str | int] = {"q": "fox", "limit": 4}
+    while True:
+        page = client.get(url, params=params, headers=normal_user_token_headers).json()
+        seen.extend(item["id"] for item in page["items"])
+        assert all(item["step"]["prompt"] == "a fox" for item in page["items"])
+        if not page["next"]:
+            break
+        params["before"] = page["next"]
+    assert len(seen) == len(set(seen)) == 6
+
+
+async def test_import_and_list_import_runs(
+    db_with_user: Session, client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    """
+    Test that an API import is recorded, and import runs are listed newest first.
+    """
+    current = await crud.settings.get_current(db=db_with_user)
+    await crud.settings.update(
+        db_with_user,
+        obj_in=models.SettingsRead(
+            id=current.id, cookie_string="cookie", created_at=current.created_at
+        ),
+        id=current.id,
+    )
+    stub = CivitaiStub.generate(2, images_per_page=3)
+    url = f"{settings.API_V1_PREFIX}/generation"
+
+    def get_client() -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=stub.transport())
+
+    with patch.object(civit, "get_client", get_client):
+        for _ in range(2):
+            r = client.post(f"{url}/import", headers=normal_user_token_headers)
+            assert r.status_code == 200
+
+    run = r.json()
+    assert run["trigger"] == "api"
+    assert run["status"] == "succeeded"
+    # The latest page is already imported, the rest of the chain is not fetched again
+    assert run["pages_fetched"] == 1
+    assert run["images_inserted"] == 0
+    assert run["images_skipped"] == 0
+
+    r = client.get(f"{url}/imports", params={"limit": 1}, headers=normal_user_token_headers)
+    page = r.json()
+    assert [item["id"] for item in page["items"]] == [run["id"]]
+    r = client.get(
+        f"{url}/imports", params={"before": page["next"]}, headers=normal_user_token_headers
+    )
+    first = r.json()["items"]
+    assert len(first) == 1
+    assert first[0]["images_inserted"] == 6
+    assert first[0]["duration_seconds"] >= 0
+
+
+async def test_import_generation_endpoint(
+    db_with_user: Session, client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    """
+    Test that the single cursor import keeps the page order and skips existing steps.
+    """
+    current = await crud.settings.get_current(db=db_with_user)
+    await crud.settings.update(
+        db_with_user,
+        obj_in=models.SettingsRead(
+            id=current.id, cookie_string="cookie", created_at=current.created_at
+        ),
+        id=current.id,
+    )
+    stub = CivitaiStub.generate(1, images_per_page=4)
+    page = stub.pages[stub.latest]
+    step = page.steps[0]
+    await crud.generation_step.create(
+        db=db_with_user,
+        obj_in=models.GenerationStepCreate(
+            id=step["id"], workflow_id=step["workflow_id"], cursor_id=stub.latest
+        ),
+    )
+
+    def get_client() -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=stub.transport())
+
+    with patch.object(civit, "get_client", get_client):
+        r = client.post(
+            f"{settings.API_V1_PREFIX}/generation/import-generation",
+            params={"cursor_id": stub.latest},
+            headers=normal_user_token_headers,
+        )
+    assert r.status_code == 200
+
+    images = await crud.generated_image.get_by_cursor(db=db_with_user, cursor_id=stub.latest)
+    assert [image.position for image in images] == list(range(4))
+    assert {image.id for image in images} == {image["id"] for image in page.images}
+
+
+def test_generation_endpoints_require_auth(client: TestClient) -> None:
+    """
+    Test that the read API requires authentication.
+    """
+    r = client.get(f"{settings.API_V1_PREFIX}/generation/cursors")
+    assert r.status_code == 401
+    r = client.get(f"{settings.API_V1_PREFIX}/generation/imports")
+    assert r.status_code == 401
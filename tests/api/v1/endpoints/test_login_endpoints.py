@@ -6,6 +6,7 @@ from fastapi.testclient import TestClient
 from sqlmodel import Session
 
 from app import crud, models, settings
+from app.core.auth_cache import auth_cache
 
 
 async def test_get_access_token(
@@ -77,7 +78,9 @@ async def test_reset_password(db_with_user: Session, client: TestClient) -> None
     assert r.status_code == 200
     assert mock_send_email.called
 
-    # Test that the reset password endpoint works
+    # Test that the reset password endpoint works, and drops the cached user
+    user = await crud.user.get(db=db_with_user, username="test_user")
+    auth_cache.set_user(user)
     token = mock_send_email.call_args[1]["token"]
     new_password = "new_password"
     r = client.post(
@@ -85,6 +88,7 @@ async def test_reset_password(db_with_user: Session, client: TestClient) -> None
         json={"token": token, "new_password": new_password},
     )
     assert r.status_code == 200
+    assert auth_cache.get_user(user.id) is None
 
     # Test that the new password works
     login_data = {
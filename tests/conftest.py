@@ -1,6 +1,7 @@
-from typing import Any
+from typing import Any, Callable, ContextManager
 
-from collections.abc import AsyncGenerator, Generator
+from collections.abc import AsyncGenerator, Generator, Iterator
+from contextlib import contextmanager
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
@@ -9,15 +10,20 @@ import sqlalchemy as sa
 from fastapi import Request, Response
 from fastapi.testclient import TestClient
 from httpx import Cookies
+from jinja2 import FileSystemBytecodeCache
 from sqlalchemy.orm import sessionmaker
 from sqlmodel import Session, SQLModel, create_engine
 
-from app import crud, models, settings
+from app import configure_log_files, crud, models, paths, settings
 from app.api import deps as api_deps
 from app.core import security
 from app.core.app import app
+from app.core.auth_cache import auth_cache
+from app.core.page_cache import page_cache
+from app.core.query_stats import QueryStats, instrument_engine, track_queries
 from app.db.init_db import init_initial_data
 from app.views import deps as views_deps
+from app.views import templates
 
 # Set up the database
 db_url = "sqlite:///:memory:"
@@ -27,6 +33,7 @@ engine = create_engine(
     connect_args={"check_same_thread": False},
     pool_pre_ping=True,
 )
+instrument_engine(engine)
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=Session)
 SQLModel.metadata.drop_all(bind=engine)
 SQLModel.metadata.create_all(bind=engine)
@@ -50,6 +57,43 @@ def do_begin(conn: Any) -> None:
     conn.exec_driver_sql("BEGIN")
 
 
+@pytest.fixture(name="log_dir", scope="session", autouse=True)
+def fixture_log_dir(tmp_path_factory: pytest.TempPathFactory) -> Iterator[Path]:
+    """
+    Fixture that keeps the log files of the test run out of `app/data/logs`.
+
+    Args:
+        tmp_path_factory (pytest.TempPathFactory): factory of the session temp dirs.
+
+    Yields:
+        Path: the directory of `log.log` and `error_log.log`.
+    """
+    directory = tmp_path_factory.mktemp("logs")
+    configure_log_files(log_file=directory / "log.log", error_log_file=directory / "error_log.log")
+    yield directory
+    configure_log_files()
+
+
+@pytest.fixture(name="jinja_cache", scope="session", autouse=True)
+def fixture_jinja_cache(tmp_path_factory: pytest.TempPathFactory) -> Iterator[Path]:
+    """
+    Fixture that keeps the Jinja bytecode cache of the test run out of `app/data`.
+
+    Args:
+        tmp_path_factory (pytest.TempPathFactory): factory of the session temp dirs.
+
+    Yields:
+        Path: the bytecode cache directory.
+    """
+    directory = tmp_path_factory.mktemp("jinja")
+    bytecode_cache = templates.env.bytecode_cache
+    with patch.object(paths, "JINJA_CACHE_PATH", directory):
+        if bytecode_cache is not None:
+            templates.env.bytecode_cache = FileSystemBytecodeCache(directory=str(directory))
+        yield directory
+    templates.env.bytecode_cache = bytecode_cache
+
+
 @pytest.fixture(name="init")
 def fixture_init(mocker: MagicMock, tmp_path: Path) -> None:  # pylint: disable=unused-argument
     # mocker.patch("app.paths.FEEDS_PATH", return_value=tmp_path)
@@ -64,6 +108,7 @@ async def fixture_db(init: Any) -> AsyncGenerator[Session, None]:  # pylint: dis
 
     # Begin a nested transaction (using SAVEPOINT).
     nested = connection.begin_nested()
+    crud.settings.clear_cache()
     await init_initial_data(db=session)
 
     # If the application code calls session.commit, it will end the nested
@@ -101,11 +146,37 @@ async def fixture_client(db: Session) -> AsyncGenerator[TestClient, None]:
 
     app.dependency_overrides[api_deps.get_db] = override_get_db
     app.dependency_overrides[views_deps.get_db] = override_get_db
+    page_cache.clear()
+    auth_cache.clear()
     yield TestClient(app)
     del app.dependency_overrides[api_deps.get_db]
     del app.dependency_overrides[views_deps.get_db]
 
 
+@pytest.fixture(name="query_budget")
+def fixture_query_budget() -> Callable[[int], ContextManager[QueryStats]]:
+    """
+    Fixture that asserts a block, e.g. a request, stays within a DB query budget.
+
+    Usage: `with query_budget(10): client.get("/generation")`
+
+    Returns:
+        Callable[[int], ContextManager[QueryStats]]: context manager factory, taking the
+            maximum number of queries.
+    """
+
+    @contextmanager
+    def query_budget(max_queries: int) -> Iterator[QueryStats]:
+        with track_queries() as stats:
+            yield stats
+        statements = "\n".join(f"{n}x {shape}" for shape, n in stats.statements.most_common())
+        assert (
+            stats.queries <= max_queries
+        ), f"{stats.queries} DB queries, budget is {max_queries}:\n{statements}"
+
+    return query_budget
+
+
 @pytest.fixture(name="db_with_user")
 async def fixture_db_with_user(db: Session) -> Session:
     """
@@ -0,0 +1,53 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+from sqlmodel import Session
+
+from app import crud, models, settings
+from app.core import auth_cache, security
+
+
+@pytest.fixture(autouse=True)
+def fixture_clear_auth_cache() -> None:
+    auth_cache.auth_cache.clear()
+
+
+async def test_decode_access_token_is_cached() -> None:
+    """
+    Test that a verified access token is only decoded once, and never past its expiry.
+    """
+    token = security.encode_token(
+        subject="user_id", key=settings.JWT_ACCESS_SECRET_KEY, expires_delta=timedelta(minutes=5)
+    )
+    with patch.object(security, "decode_token", wraps=security.decode_token) as mock_decode:
+        assert auth_cache.decode_access_token(token) == "user_id"
+        assert auth_cache.decode_access_token(token) == "user_id"
+        assert mock_decode.call_count == 1
+
+    auth_cache.auth_cache.set_user_id("expired", "user_id", expires_at=0)
+    with pytest.raises(HTTPException):
+        auth_cache.decode_access_token("expired")
+
+
+async def test_get_user_skips_query_and_invalidates_on_update(db_with_user: Session) -> None:
+    """
+    Test that a cached user is served without a query, and dropped when it is updated.
+    """
+    db_user = await crud.user.get(db=db_with_user, username="test_user")
+    user_id = db_user.id
+    await auth_cache.get_user(db=db_with_user, user_id=user_id)
+    db_with_user.expunge_all()
+
+    with patch.object(crud.user, "get", side_effect=AssertionError("queried")):
+        user = await auth_cache.get_user(db=db_with_user, user_id=user_id)
+    assert user.username == "test_user"
+    assert user in db_with_user
+
+    await crud.user.update(
+        db=db_with_user, obj_in=models.UserUpdate(full_name="Updated Name"), id=user_id
+    )
+    assert auth_cache.auth_cache.get_user(user_id) is None
+    user = await auth_cache.get_user(db=db_with_user, user_id=user_id)
+    assert user.full_name == "Updated Name"
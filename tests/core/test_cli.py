@@ -1,3 +1,4 @@
+from pathlib import Path
 from unittest.mock import patch
 
 from typer.testing import CliRunner
@@ -25,3 +26,17 @@ def test_cli_main() -> None:
         result = runner.invoke(typer_app)
         assert result.exit_code == 0
         mock_start_server.assert_called_once()
+
+
+def test_cli_build_static(tmp_path: Path) -> None:
+    """
+    Test the CLI build static command.
+    """
+    with patch("app.core.cli.paths.STATIC_BUILD_PATH", tmp_path), patch(
+        "app.core.cli.start_server"
+    ) as mock_start_server:
+        runner = CliRunner()
+        result = runner.invoke(typer_app, ["--build-static"])
+        assert result.exit_code == 0
+        assert (tmp_path / "manifest.json").exists()
+        mock_start_server.assert_not_called()
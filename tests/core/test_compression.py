@@ -0,0 +1,103 @@
+import gzip
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.compression import CompressionMiddleware, accepted_encodings
+from app.core.static import (
+    IMMUTABLE_CACHE_CONTROL,
+    PrecompressedStaticFiles,
+    build_static,
+    get_static_url,
+)
+
+BODY = "civit browser " * 100
+
+
+def _create_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+    @app.get("/text")
+    def text() -> Response:
+        return PlainTextResponse(BODY)
+
+    @app.get("/small")
+    def small() -> Response:
+        return PlainTextResponse("tiny")
+
+    @app.get("/image")
+    def image() -> Response:
+        return Response(BODY.encode(), media_type="image/jpeg")
+
+    @app.get("/stream")
+    def stream() -> Response:
+        return StreamingResponse(iter([BODY.encode(), BODY.encode()]), media_type="text/plain")
+
+    return app
+
+
+def test_accepted_encodings() -> None:
+    assert accepted_encodings("gzip, deflate", available=("br", "gzip")) == ["gzip"]
+    assert accepted_encodings("br;q=1.0, gzip;q=0.5", available=("br", "gzip")) == ["br", "gzip"]
+    assert accepted_encodings("gzip;q=0", available=("br", "gzip")) == []
+    assert accepted_encodings("*", available=("br", "gzip")) == ["br", "gzip"]
+    assert accepted_encodings("", available=("br", "gzip")) == []
+
+
+def test_compression_middleware() -> None:
+    client = TestClient(_create_app())
+
+    response = client.get("/text", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(BODY)
+    assert response.text == BODY
+
+    response = client.get("/text", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.text == BODY
+
+    for path in ("/small", "/image", "/stream"):
+        response = client.get(path, headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+
+
+def test_build_and_serve_precompressed_static(tmp_path: Path) -> None:
+    source = tmp_path / "static"
+    (source / "icons").mkdir(parents=True)
+    (source / "style.css").write_text("body { color: black; }\n" * 50)
+    (source / "icons" / "icon.png").write_bytes(b"\x89PNG" + b"\x00" * 100)
+    build = tmp_path / "build"
+
+    manifest = build_static(source=source, destination=build)
+    hashed_css = manifest["style.css"]
+    assert hashed_css.startswith("style.") and hashed_css.endswith(".css")
+    assert (build / f"{hashed_css}.gz").exists()
+    assert not (build / f"{manifest['icons/icon.png']}.gz").exists()
+    assert get_static_url(manifest)("style.css") == f"/static/{hashed_css}"
+    assert get_static_url(manifest)("missing.js") == "/static/missing.js"
+
+    app = FastAPI()
+    app.mount("/static", PrecompressedStaticFiles(directory=source, build_directory=build))
+    client = TestClient(app)
+
+    response = client.get(f"/static/{hashed_css}", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-type"].startswith("text/css")
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert int(response.headers["content-length"]) == len(
+        gzip.compress((source / "style.css").read_bytes(), compresslevel=9, mtime=0)
+    )
+    assert response.text == (source / "style.css").read_text()
+
+    response = client.get(f"/static/{hashed_css}", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+
+    # Unbuilt names still resolve to the source folder, without immutable caching
+    response = client.get("/static/style.css")
+    assert response.status_code == 200
+    assert response.headers.get("cache-control") != IMMUTABLE_CACHE_CONTROL
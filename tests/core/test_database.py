@@ -1,10 +1,20 @@
+from typing import Any
+
 import os
+from datetime import datetime
 from pathlib import Path
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
-from sqlmodel import SQLModel
+import pytest
+from sqlalchemy import text
+from sqlmodel import Session, SQLModel, create_engine
 
+from app import crud, models
+from app.db.archive import ArchiveLimitError, attach_archives, create_archive
 from app.db.init_db import create_all
+from app.services.archive import _copy_to_archive as copy_to_archive
+from app.services.archive import archive_cursors
+from app.views.pages.generation import repair_cursor_chain
 
 
 async def test_create_all(tmpdir: str, monkeypatch: MagicMock) -> None:
@@ -33,3 +43,194 @@ async def test_create_all(tmpdir: str, monkeypatch: MagicMock) -> None:
     tables = SQLModel.metadata.tables
     assert "user" in tables
     assert "fake_table" not in tables
+
+
+async def test_archive_cursors(tmp_path: Path, monkeypatch: MagicMock) -> None:
+    """
+    Test that old cursors are moved into yearly archive files, and that the CRUD layer
+    reads them as if they had not moved.
+    """
+    monkeypatch.setattr("app.paths.ARCHIVE_PATH", tmp_path / "archive")
+    engine = create_engine(f"sqlite:///{tmp_path / 'main.sqlite3'}")
+    SQLModel.metadata.create_all(bind=engine)
+    cursor_ids = [
+        "1001440-20250401120000000",
+        "1001440-20250301120000000",
+        "1001440-20240101120000000",
+        "1001440-20231231100000000",
+    ]
+
+    with Session(engine) as db:
+        for cursor_id in reversed(cursor_ids):
+            await crud.cursor.create(db=db, obj_in=models.CursorCreate(id=cursor_id))
+            await crud.generated_image.create(
+                db=db,
+                obj_in=models.GeneratedImageCreate(
+                    id=f"{cursor_id}-image",
+                    url=f"https://image.civitai.com/xG1nkqKTMzGDvpLrqFT7WA/{cursor_id}.jpeg",
+                    cursor_id=cursor_id,
+                    width=832,
+                    height=1216,
+                ),
+            )
+        await repair_cursor_chain(db=db)
+
+        result = await archive_cursors(db=db, before=datetime(2025, 1, 1))
+
+    assert (result.cursors, result.images) == (2, 2)
+    assert sorted(path.name for path in (tmp_path / "archive").iterdir()) == [
+        "archive-2023.sqlite3",
+        "archive-2024.sqlite3",
+    ]
+
+    with Session(engine) as db:
+        assert db.execute(text("SELECT count(*) FROM main.cursor")).scalar_one() == 2
+        cursors = await crud.cursor.get_multi(db=db)
+        assert [(cursor.id, cursor.page_number) for cursor in cursors] == [
+            (cursor_id, page) for page, cursor_id in enumerate(cursor_ids, start=1)
+        ]
+        assert await crud.cursor.count(db=db) == 4
+        chain = await crud.cursor.get_chain(db=db, cursor_id=cursor_ids[0], steps=3)
+        assert [cursor.id for cursor in chain] == cursor_ids[1:]
+        chain = await crud.cursor.get_chain(db=db, cursor_id=cursor_ids[3], steps=3, reverse=True)
+        assert [cursor.id for cursor in chain] == cursor_ids[2::-1]
+
+        image = await crud.generated_image.get(db=db, id=f"{cursor_ids[3]}-image")
+        assert image.url.endswith(f"/{cursor_ids[3]}.jpeg")
+        following = await crud.generated_image.get_after(
+            db=db, image=await crud.generated_image.get(db=db, id=f"{cursor_ids[1]}-image")
+        )
+        assert [image.id for image in following] == [f"{cursor_ids[2]}-image", image.id]
+
+        # New cursors are imported into the main database, and the archive is left as it is
+        await crud.cursor.create(db=db, obj_in=models.CursorCreate(id="1001440-20250501120000000"))
+        assert (await crud.cursor.get(db=db, id=cursor_ids[3])).page_number == 5
+        assert await repair_cursor_chain(db=db) == (1, ["1001440-20250501120000000"])
+    engine.dispose()
+
+
+async def test_archive_cursors_failed_batch(tmp_path: Path, monkeypatch: MagicMock) -> None:
+    """
+    Test that a run failing after some batches leaves the archived page numbers consistent,
+    and that running it again completes the move.
+    """
+    monkeypatch.setattr("app.paths.ARCHIVE_PATH", tmp_path / "archive")
+    engine = create_engine(f"sqlite:///{tmp_path / 'main.sqlite3'}")
+    SQLModel.metadata.create_all(bind=engine)
+    cursor_ids = [
+        "1001440-20250401120000000",
+        "1001440-20240601120000000",
+        "1001440-20240101120000000",
+        "1001440-20231231100000000",
+    ]
+    copies = 0
+
+    def fail_second_copy(*args: Any, **kwargs: Any) -> None:
+        nonlocal copies
+        copies += 1
+        if copies == 2:
+            raise OSError("disk full")
+        copy_to_archive(*args, **kwargs)
+
+    with Session(engine) as db:
+        for cursor_id in reversed(cursor_ids):
+            await crud.cursor.create(db=db, obj_in=models.CursorCreate(id=cursor_id))
+        await archive_cursors(db=db, before=datetime(2024, 1, 1), vacuum=False)
+
+        with patch("app.services.archive._copy_to_archive", side_effect=fail_second_copy):
+            with pytest.raises(OSError):
+                await archive_cursors(db=db, before=datetime(2025, 1, 1), batch_size=1)
+        db.rollback()
+        assert db.execute(text("SELECT count(*) FROM main.cursor")).scalar_one() == 2
+        cursors = await crud.cursor.get_multi(db=db)
+        assert [(cursor.id, cursor.page_number) for cursor in cursors] == [
+            (cursor_id, page) for page, cursor_id in enumerate(cursor_ids, start=1)
+        ]
+
+        result = await archive_cursors(db=db, before=datetime(2025, 1, 1), batch_size=1)
+        assert result.cursors == 1
+        cursors = await crud.cursor.get_multi(db=db)
+        assert [(cursor.id, cursor.page_number) for cursor in cursors] == [
+            (cursor_id, page) for page, cursor_id in enumerate(cursor_ids, start=1)
+        ]
+    engine.dispose()
+
+
+async def test_archive_search(tmp_path: Path, monkeypatch: MagicMock) -> None:
+    """
+    Test that search and its filter values cover the archived generations.
+    """
+    monkeypatch.setattr("app.paths.ARCHIVE_PATH", tmp_path / "archive")
+    engine = create_engine(f"sqlite:///{tmp_path / 'main.sqlite3'}")
+    SQLModel.metadata.create_all(bind=engine)
+    steps = [
+        ("1001440-20250401120000000", "a red fox in the snow", "Euler a"),
+        ("1001440-20230601120000000", "a fox in a castle", "DPM++ 2M"),
+    ]
+
+    with Session(engine) as db:
+        for cursor_id, prompt, sampler in reversed(steps):
+            await crud.cursor.create(db=db, obj_in=models.CursorCreate(id=cursor_id))
+            await crud.generation_step.create(
+                db=db,
+                obj_in=models.GenerationStepCreate(
+                    id=f"{cursor_id}-step",
+                    workflow_id=cursor_id,
+                    cursor_id=cursor_id,
+                    prompt=prompt,
+                    sampler=sampler,
+                ),
+            )
+            for n in range(2):
+                await crud.generated_image.create(
+                    db=db,
+                    obj_in=models.GeneratedImageCreate(
+                        id=f"{cursor_id}-image-{n}",
+                        url=f"https://image.civitai.com/xG1nkqKTMzGDvpLrqFT7WA/{cursor_id}-{n}.jpeg",
+                        cursor_id=cursor_id,
+                        step_id=f"{cursor_id}-step",
+                        width=832,
+                        height=1216,
+                    ),
+                )
+        await archive_cursors(db=db, before=datetime(2025, 1, 1), vacuum=False)
+
+        results = await crud.generation_step.search_images(db=db, query="fox")
+        assert [image.id for image, _ in results] == [
+            f"{cursor_id}-image-{n}" for cursor_id, *_ in steps for n in (1, 0)
+        ]
+        results = await crud.generation_step.search_images(db=db, query="castle")
+        assert [step.id for _, step in results] == [f"{steps[1][0]}-step"] * 2
+        results = await crud.generation_step.search_images(db=db, query="fox", skip=1, limit=2)
+        assert [image.id for image, _ in results] == [
+            f"{steps[0][0]}-image-0",
+            f"{steps[1][0]}-image-1",
+        ]
+        samplers = await crud.generation_step.get_distinct_values(db=db, column="sampler")
+        assert samplers == ["DPM++ 2M", "Euler a"]
+    engine.dispose()
+
+
+async def test_archive_limit(tmp_path: Path, monkeypatch: MagicMock) -> None:
+    """
+    Test that archives SQLite could not attach are refused, rather than silently unread.
+    """
+    monkeypatch.setattr("app.paths.ARCHIVE_PATH", tmp_path / "archive")
+    monkeypatch.setattr("app.db.archive.attach_limit", lambda connection: 2)
+    monkeypatch.setattr("app.services.archive.attach_limit", lambda connection: 2)
+    engine = create_engine(f"sqlite:///{tmp_path / 'main.sqlite3'}")
+    SQLModel.metadata.create_all(bind=engine)
+    create_archive(2022)
+    create_archive(2023)
+
+    with Session(engine) as db:
+        await crud.cursor.create(db=db, obj_in=models.CursorCreate(id="1001440-20240101120000000"))
+        with pytest.raises(ArchiveLimitError):
+            await archive_cursors(db=db, before=datetime(2025, 1, 1))
+        assert await crud.cursor.count(db=db) == 1
+        assert db.execute(text("SELECT count(*) FROM main.cursor")).scalar_one() == 1
+
+    create_archive(2024)
+    with engine.connect() as connection, pytest.raises(ArchiveLimitError):
+        attach_archives(connection)
+    engine.dispose()
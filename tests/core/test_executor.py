@@ -0,0 +1,37 @@
+import asyncio
+import time
+
+from app.core.executor import BlockingExecutor, run_blocking
+
+
+async def test_run_blocking() -> None:
+    """
+    Test that a blocking function runs in the executor and returns its result.
+    """
+    assert await run_blocking(sum, [1, 2, 3]) == 6
+    assert await run_blocking(int, "ff", base=16) == 255
+
+
+async def test_blocking_executor_keeps_event_loop_free() -> None:
+    """
+    Test that blocking calls do not block the event loop, and that queued calls are counted.
+    """
+    executor = BlockingExecutor(max_workers=1)
+    ticks = 0
+
+    async def tick() -> None:
+        nonlocal ticks
+        for _ in range(5):
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    await asyncio.gather(executor.run(time.sleep, 0.1), executor.run(time.sleep, 0.1), tick())
+    executor.shutdown()
+
+    assert ticks == 5
+    stats = executor.stats()
+    assert stats["completed"] == 2
+    assert stats["queued"] == 0
+    assert stats["running"] == 0
+    assert stats["max_queued"] >= 1
+    assert stats["wait_seconds"] > 0.05
@@ -0,0 +1,34 @@
+import pytest
+
+from app.core.metrics import Counter, Gauge, Histogram, Registry
+
+
+def test_registry_renders_prometheus_text() -> None:
+    """
+    Test that counters, gauges and histograms render in the Prometheus text format.
+    """
+    registry = Registry()
+    counter = registry.register(Counter("test_total", "Test counter", ("cache", "result")))
+    registry.register(Gauge("test_queue", "Test gauge", lambda: 3))
+    histogram = registry.register(Histogram("test_seconds", "Test histogram", buckets=(0.1, 1)))
+
+    counter.inc(cache="page", result="hit")
+    counter.inc(2, cache="page", result="hit")
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(5)
+
+    text = registry.render()
+    assert "# TYPE test_total counter" in text
+    assert 'test_total{cache="page",result="hit"} 3.0' in text
+    assert "test_queue 3.0" in text
+    assert 'test_seconds_bucket{le="0.1"} 1' in text
+    assert 'test_seconds_bucket{le="1.0"} 2' in text
+    assert 'test_seconds_bucket{le="+Inf"} 3' in text
+    assert "test_seconds_sum 5.55" in text
+    assert "test_seconds_count 3" in text
+
+    with pytest.raises(ValueError):
+        counter.inc(cache="page")
+    with pytest.raises(ValueError):
+        registry.register(Counter("test_total", "Duplicate"))
@@ -1,3 +1,4 @@
+from threading import current_thread
 from unittest.mock import patch
 
 import pytest
@@ -141,17 +142,21 @@ async def test_send_test_email() -> None:
 
 async def test_send_reset_password_email() -> None:
     """
-    Test that the send_reset_password_email function calls the send_email function.
+    Test that the send_reset_password_email function calls the send_email function, in the
+    blocking executor.
     """
+    threads = []
     with patch("app.core.notify.get_html_template") as mock_get_html_template:
         mock_get_html_template.return_value = ""
         with patch("app.core.notify.send_email") as mock_send_email:
-            notify.send_reset_password_email(
+            mock_send_email.side_effect = lambda **kwargs: threads.append(current_thread().name)
+            await notify.send_reset_password_email(
                 email_to="test@example.com", username="test", token="test"
             )
 
     assert mock_send_email.called
     assert mock_send_email.call_count == 1
+    assert threads[0].startswith("blocking")
 
 
 async def test_send_new_account_email() -> None:
@@ -161,7 +166,7 @@ async def test_send_new_account_email() -> None:
     with patch("app.core.notify.get_html_template") as mock_get_html_template:
         mock_get_html_template.return_value = ""
         with patch("app.core.notify.send_email") as mock_send_email:
-            notify.send_new_account_email(
+            await notify.send_new_account_email(
                 email_to="test@example.com", username="test", password="test"
             )
 
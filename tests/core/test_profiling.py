@@ -0,0 +1,103 @@
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from fastapi.testclient import TestClient
+from httpx import Cookies
+
+from app.core import profiling
+from app.core.app import app
+from app.core.profiling import (
+    ProfilingMiddleware,
+    get_access_token,
+    is_profile_requested,
+    write_profile,
+)
+
+
+def test_is_profile_requested() -> None:
+    """
+    Test that profiling is requested with a query parameter or a header.
+    """
+    scope = {"type": "http", "query_string": b"page=2&profile", "headers": []}
+    assert is_profile_requested(scope)
+    scope = {"type": "http", "query_string": b"", "headers": [(b"x-profile", b"1")]}
+    assert is_profile_requested(scope)
+    scope = {"type": "http", "query_string": b"profiles=1", "headers": []}
+    assert not is_profile_requested(scope)
+
+
+def test_get_access_token() -> None:
+    """
+    Test that the access token is read from the cookie or the Authorization header.
+    """
+    scope = {"type": "http", "headers": [(b"cookie", b'access_token="Bearer abc"')]}
+    assert get_access_token(scope) == "abc"
+    scope = {"type": "http", "headers": [(b"authorization", b"Bearer def")]}
+    assert get_access_token(scope) == "def"
+    assert get_access_token({"type": "http", "headers": []}) is None
+
+
+def test_profile_superuser(
+    mocker: MagicMock,
+    client: TestClient,  # pylint: disable=unused-argument
+    superuser_cookies: Cookies,
+) -> None:
+    """
+    Test that a superuser gets the profile instead of the page.
+    """
+    mocker.patch.object(profiling, "SamplingProfiler", None)
+    profiled = TestClient(ProfilingMiddleware(app), cookies=superuser_cookies)
+    response = profiled.get("/generation?profile")
+    assert response.status_code == 200
+    assert "<title>Profile: GET /generation (" in response.text
+    assert "Install pyinstrument for a flame graph." in response.text
+    assert response.headers["cache-control"] == "no-store"
+
+
+def test_profile_normal_user(
+    mocker: MagicMock,
+    client: TestClient,  # pylint: disable=unused-argument
+    normal_user_cookies: Cookies,
+) -> None:
+    """
+    Test that anybody but a superuser gets the page as usual, without being profiled.
+    """
+    profiler = mocker.patch.object(profiling, "RequestProfiler")
+    for cookies in (normal_user_cookies, Cookies()):
+        profiled = TestClient(ProfilingMiddleware(app), cookies=cookies)
+        page = profiled.get("/generation")
+        response = profiled.get("/generation", headers={"X-Profile": "1"})
+        assert response.status_code == 200
+        assert response.text == page.text
+    profiler.assert_not_called()
+
+
+def test_profile_sample_to_disk(
+    client: TestClient,  # pylint: disable=unused-argument
+    normal_user_cookies: Cookies,
+    tmp_path: Path,
+) -> None:
+    """
+    Test that one request in N is profiled to disk, and the page is served as usual.
+    """
+    middleware = ProfilingMiddleware(app, on_demand=False, sample_rate=2, directory=tmp_path)
+    profiled = TestClient(middleware, cookies=normal_user_cookies)
+    for _ in range(4):
+        assert profiled.get("/generation?profile").status_code == 200
+
+    profiles = sorted(tmp_path.glob("*.html"))
+    assert len(profiles) == 2
+    assert "-GET-generation-" in profiles[0].name
+
+
+def test_write_profile_keeps_max_files(tmp_path: Path) -> None:
+    """
+    Test that the oldest sampled profiles are removed.
+    """
+    for n in range(5):
+        write_profile(tmp_path, f"2024010{n}-GET-root-1ms.html", "<html></html>", max_files=3)
+    assert [path.name[:9] for path in sorted(tmp_path.glob("*.html"))] == [
+        "20240102-",
+        "20240103-",
+        "20240104-",
+    ]
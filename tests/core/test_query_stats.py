@@ -0,0 +1,136 @@
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session
+
+from app import logger
+from app.core.query_stats import (
+    QueryStatsMiddleware,
+    SlowQueryLog,
+    parameters_shape,
+    slow_queries,
+    statement_shape,
+    track_queries,
+)
+
+
+def test_statement_shape() -> None:
+    """
+    Test that statements differing only by whitespace or IN list length share a shape.
+    """
+    assert statement_shape("SELECT *\n  FROM cursor WHERE id IN (?, ?, ?)") == (
+        "SELECT * FROM cursor WHERE id IN (...)"
+    )
+    assert statement_shape("SELECT * FROM cursor WHERE id IN (?)") == (
+        "SELECT * FROM cursor WHERE id IN (...)"
+    )
+
+
+async def test_track_queries(db: Session) -> None:
+    """
+    Test that queries are counted by statement shape, and only inside the block.
+    """
+    with track_queries() as stats:
+        for n in range(3):
+            db.execute(text("SELECT :n"), {"n": n})
+    db.execute(text("SELECT 1"))
+
+    assert stats.queries == 3
+    assert stats.seconds > 0
+    assert stats.repeated(3) == [("SELECT ?", 3)]
+    assert stats.repeated(4) == []
+
+
+async def test_track_queries_after_error(db: Session) -> None:
+    """
+    Test that a failed statement does not leave its start time to the next query.
+    """
+    with patch("app.core.query_stats.time.perf_counter", side_effect=[1.0, 10.0, 10.5]):
+        with track_queries() as stats:
+            with pytest.raises(OperationalError):
+                db.execute(text("SELECT * FROM missing_table"))
+            db.execute(text("SELECT 1"))
+
+    assert stats.queries == 1
+    assert stats.seconds == pytest.approx(0.5)
+
+
+def test_middleware_server_timing_and_warnings(db: Session) -> None:
+    """
+    Test that requests get a Server-Timing header, and that N+1 queries are logged.
+    """
+    app = FastAPI()
+
+    @app.get("/n-plus-one")
+    async def n_plus_one() -> dict[str, int]:
+        for n in range(5):
+            db.execute(text("SELECT :n"), {"n": n})
+        return {"ok": 1}
+
+    app.add_middleware(QueryStatsMiddleware, warning_threshold=4, repeat_threshold=5)
+    warnings: list[str] = []
+    sink = logger.add(warnings.append, level="WARNING", format="{message}")
+    try:
+        response = TestClient(app).get("/n-plus-one")
+    finally:
+        logger.remove(sink)
+
+    assert response.headers["server-timing"].startswith("db;dur=")
+    assert response.headers["server-timing"].endswith('desc="5 queries"')
+    assert any("n_plus_one) made 5 DB queries" in w for w in warnings)
+    assert any("repeated a DB query 5 times: SELECT ?" in w for w in warnings)
+
+
+def test_parameters_shape() -> None:
+    """
+    Test that parameters are described by their types only.
+    """
+    assert parameters_shape(("abc", 1, None)) == "(str, int, NoneType)"
+    assert parameters_shape({"id": "abc"}) == "{id: str}"
+    assert parameters_shape([("abc", 1), ("def", 2)]) == "(str, int) x 2"
+    assert parameters_shape(()) == "()"
+
+
+def test_slow_query_log(db: Session) -> None:
+    """
+    Test that slow statements are recorded with their plan and request, newest first.
+    """
+    app = FastAPI()
+
+    @app.get("/slow")
+    async def slow() -> dict[str, int]:
+        db.execute(text("SELECT * FROM cursor WHERE id = :id"), {"id": "abc"})
+        return {"ok": 1}
+
+    app.add_middleware(QueryStatsMiddleware)
+    slow_queries.clear()
+    with patch.object(slow_queries, "threshold_seconds", 1e-9):
+        db.execute(text("SELECT 1"))
+        TestClient(app).get("/slow")
+    queries = slow_queries.entries()
+    slow_queries.clear()
+
+    assert queries[0].shape == "SELECT * FROM cursor WHERE id = ?"
+    assert queries[0].parameters == "(str)"
+    assert queries[0].endpoint == "GET /slow (slow)"
+    assert queries[0].plan and "cursor" in queries[0].plan
+    assert queries[0].seconds > 0
+    assert queries[-1].shape == "SELECT 1"
+    assert queries[-1].endpoint == ""
+
+
+def test_slow_query_log_threshold(db: Session) -> None:
+    """
+    Test that fast statements are not recorded, and that the buffer keeps the newest.
+    """
+    log = SlowQueryLog(threshold_seconds=1.0, size=2)
+    log.record(db.connection(), "SELECT 1", (), seconds=0.5)
+    assert log.entries() == []
+    for n in range(3):
+        log.record(db.connection(), f"SELECT {n}", (), seconds=2.0)
+    assert [query.statement for query in log.entries()] == ["SELECT 2", "SELECT 1"]
+    assert log.entries()[0].plan == "SCAN CONSTANT ROW"
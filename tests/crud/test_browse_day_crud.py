@@ -0,0 +1,44 @@
+from datetime import date
+
+from sqlmodel import Session
+
+from app import crud, models
+
+
+async def test_days_are_counted_on_insert(db: Session) -> None:
+    """
+    Test that cursors and images are counted in their day as they are created, and that a
+    rebuild gives the same days.
+    """
+    for cursor_id in ("42-20240303100000000", "1001440-20240301120000000"):
+        await crud.cursor.create(db=db, obj_in=models.CursorCreate(id=cursor_id))
+    # Created after an older cursor of the same day, but newer
+    await crud.cursor.create(db=db, obj_in=models.CursorCreate(id="1001440-20240303235959999"))
+    for n in range(3):
+        await crud.generated_image.create(
+            db=db,
+            obj_in=models.GeneratedImageCreate(
+                id=f"image-{n}",
+                url=f"https://image.civitai.com/xG1nkqKTMzGDvpLrqFT7WA/image-{n}.jpeg",
+                cursor_id="42-20240303100000000",
+                width=832,
+                height=1216,
+            ),
+        )
+
+    expected = [
+        (date(2024, 3, 1), 1, 0, "1001440-20240301120000000"),
+        (date(2024, 3, 3), 2, 3, "1001440-20240303235959999"),
+    ]
+    days = await crud.browse_day.get_month(db=db, year=2024, month=3)
+    assert [
+        (day.day, day.cursor_count, day.image_count, day.first_cursor_id) for day in days
+    ] == expected
+    assert await crud.browse_day.get_month(db=db, year=2024, month=2) == []
+    assert (await crud.browse_day.get_latest(db=db)).day == date(2024, 3, 3)
+
+    assert await crud.browse_day.rebuild(db=db) == 2
+    days = await crud.browse_day.get_month(db=db, year=2024, month=3)
+    assert [
+        (day.day, day.cursor_count, day.image_count, day.first_cursor_id) for day in days
+    ] == expected
@@ -0,0 +1,54 @@
+from sqlmodel import Session
+
+from app import crud, models
+
+
+async def test_create_keeps_page_order(db: Session) -> None:
+    """
+    Test that a cursor is inserted at its place by timestamp, shifting the older pages.
+    """
+    for cursor_id in (
+        "1001440-20241030195910517",
+        "1001440-20241028120000000",
+        "1001440-20241029120000000",
+        "1001440-20241031120000000",
+    ):
+        await crud.cursor.create(db=db, obj_in=models.CursorCreate(id=cursor_id))
+
+    cursors = await crud.cursor.get_multi(db=db)
+    assert [(cursor.id, cursor.page_number) for cursor in cursors] == [
+        ("1001440-20241031120000000", 1),
+        ("1001440-20241030195910517", 2),
+        ("1001440-20241029120000000", 3),
+        ("1001440-20241028120000000", 4),
+    ]
+
+
+async def test_order_is_chronological_across_model_ids(db: Session) -> None:
+    """
+    Test that cursors are ordered by their parsed timestamp, milliseconds included, and not
+    by the model id prefix of their id.
+    """
+    for cursor_id in (
+        "999-20241030195910517",
+        "1001440-20241030195910100",
+        "1001440-20241029120000000",
+        "42-20241030195910900",
+    ):
+        await crud.cursor.create(db=db, obj_in=models.CursorCreate(id=cursor_id))
+
+    cursors = await crud.cursor.get_multi(db=db)
+    assert [(cursor.id, cursor.page_number) for cursor in cursors] == [
+        ("42-20241030195910900", 1),
+        ("999-20241030195910517", 2),
+        ("1001440-20241030195910100", 3),
+        ("1001440-20241029120000000", 4),
+    ]
+    assert cursors[1].model_id == 999
+    assert cursors[1].timestamp_ms == 1730318350517
+
+    older = await crud.cursor.get_before(db=db, before="999-20241030195910517", limit=10)
+    assert [cursor.id for cursor in older] == [
+        "1001440-20241030195910100",
+        "1001440-20241029120000000",
+    ]
@@ -0,0 +1,125 @@
+from typing import Callable, ContextManager
+
+from sqlmodel import Session, select
+
+from app import crud, models
+from app.core.query_stats import QueryStats
+from app.models.url_prefix import split_url
+
+
+def test_split_url() -> None:
+    """
+    Test that URLs are split after their first path segment, and rejoin unchanged.
+    """
+    url = "https://image.civitai.com/xG1nkqKTMzGDvpLrqFT7WA/abc/original=true/abc.jpeg"
+    assert split_url(url) == (
+        "https://image.civitai.com/xG1nkqKTMzGDvpLrqFT7WA/",
+        "abc/original=true/abc.jpeg",
+    )
+    assert split_url("https://example.com/image.jpeg") == ("", "https://example.com/image.jpeg")
+    assert split_url("not a url") == ("", "not a url")
+
+
+async def test_create_shares_url_prefix(db: Session) -> None:
+    """
+    Test that images store a shared URL prefix, and read back their full URL.
+    """
+    cursor_id = "1001440-20241030195910517"
+    await crud.cursor.create(db=db, obj_in=models.CursorCreate(id=cursor_id))
+    urls = [
+        "https://image.civitai.com/xG1nkqKTMzGDvpLrqFT7WA/a/original=true/a.jpeg",
+        "https://image.civitai.com/xG1nkqKTMzGDvpLrqFT7WA/b/original=true/b.mp4",
+        "https://example.com/c.jpeg",
+    ]
+    for n, url in enumerate(urls):
+        await crud.generated_image.create(
+            db=db,
+            obj_in=models.GeneratedImageCreate(
+                id=f"image-{n}", url=url, width=832, height=1216, cursor_id=cursor_id
+            ),
+        )
+
+    db.expunge_all()
+    images = await crud.generated_image.get_by_cursor(db=db, cursor_id=cursor_id)
+    assert [image.url for image in images] == urls
+    assert images[0].url_suffix == "a/original=true/a.jpeg"
+    assert images[0].url_prefix_id == images[1].url_prefix_id
+    assert images[2].url_prefix_id is None
+    assert len(db.exec(select(models.UrlPrefix)).all()) == 1
+    assert models.GeneratedImageRead.from_orm(images[1]).url == urls[1]
+
+
+async def test_url_prefix_ids_cached_in_session(
+    db: Session, query_budget: Callable[[int], ContextManager[QueryStats]]
+) -> None:
+    """
+    Test that a prefix is looked up once per session, and forgotten on rollback.
+    """
+    prefix = "https://image.civitai.com/xG1nkqKTMzGDvpLrqFT7WA/"
+    prefix_id = await crud.url_prefix.get_id(db=db, prefix=prefix)
+    with query_budget(0):
+        assert await crud.url_prefix.get_id(db=db, prefix=prefix) == prefix_id
+
+    db.begin_nested().rollback()
+    with query_budget(2) as stats:
+        await crud.url_prefix.get_id(db=db, prefix=prefix)
+    assert stats.queries > 0
+
+
+async def test_gallery_order_follows_api_order(db: Session) -> None:
+    """
+    Test that images are ordered by their place in the API page, not by their id.
+    """
+    newer, older = "1001440-20241030195910517", "1001440-20241029120000000"
+    ids = {newer: ["n-c", "n-a", "n-b"], older: ["o-b", "o-a"]}
+    for cursor_id, image_ids in ids.items():
+        await crud.cursor.create(db=db, obj_in=models.CursorCreate(id=cursor_id))
+        for position, image_id in enumerate(image_ids):
+            await crud.generated_image.create(
+                db=db,
+                obj_in=models.GeneratedImageCreate(
+                    id=image_id,
+                    url=f"https://example.com/{image_id}.jpeg",
+                    width=832,
+                    height=1216,
+                    cursor_id=cursor_id,
+                    position=position,
+                ),
+            )
+
+    images = await crud.generated_image.get_by_cursor(db=db, cursor_id=newer)
+    assert [image.id for image in images] == ids[newer]
+    after = await crud.generated_image.get_after(db=db, image=images[1], limit=3)
+    assert [image.id for image in after] == ["n-b", "o-b", "o-a"]
+    oldest = await crud.generated_image.get(db=db, id="o-b")
+    before = await crud.generated_image.get_before(db=db, image=oldest, limit=2)
+    assert [image.id for image in before] == ["n-b", "n-a"]
+
+
+async def test_gallery_order_follows_cursor_timestamps(db: Session) -> None:
+    """
+    Test that images follow the cursor listing across model ids, whose string order differs.
+    """
+    cursor_ids = ["1001440-20250101000000000", "999-20240601000000000", "1001440-20240101000000000"]
+    for cursor_id in cursor_ids:
+        await crud.cursor.create(db=db, obj_in=models.CursorCreate(id=cursor_id))
+        await crud.generated_image.create(
+            db=db,
+            obj_in=models.GeneratedImageCreate(
+                id=f"image-{cursor_id}",
+                url=f"https://example.com/{cursor_id}.jpeg",
+                width=832,
+                height=1216,
+                cursor_id=cursor_id,
+            ),
+        )
+
+    cursors = await crud.cursor.get_multi(db=db)
+    assert [cursor.id for cursor in cursors] == cursor_ids
+    timeline = await crud.generated_image.get_timeline(db=db)
+    assert [image.cursor_id for image in timeline] == cursor_ids
+    middle = await crud.generated_image.get(db=db, id=f"image-{cursor_ids[1]}")
+    after = await crud.generated_image.get_after(db=db, image=middle)
+    before = await crud.generated_image.get_before(db=db, image=middle)
+    assert [image.cursor_id for image in after] == cursor_ids[2:]
+    assert [image.cursor_id for image in before] == cursor_ids[:1]
@@ -0,0 +1,103 @@
+from sqlmodel import Session
+
+from app import crud, models
+from app.core import civit
+from app.crud.generation_step import build_fts_query
+
+
+async def _create_step_with_image(
+    db: Session, step_id: str, prompt: str, sampler: str, seed: int
+) -> None:
+    cursor_id = "1001440-20241030195910517"
+    if not await crud.cursor.get_or_none(db=db, id=cursor_id):
+        await crud.cursor.create(db=db, obj_in=models.CursorCreate(id=cursor_id))
+    step_create = models.GenerationStepCreate(
+        id=step_id,
+        workflow_id=step_id,
+        cursor_id=cursor_id,
+        prompt=prompt,
+        negative_prompt="blurry, lowres",
+        base_model="SDXL",
+        sampler=sampler,
+        seed=seed,
+    )
+    await crud.generation_step.create(db=db, obj_in=step_create)
+    image_create = models.GeneratedImageCreate(
+        id=f"image-{step_id}",
+        url=f"https://image.civitai.com/test/{step_id}.jpeg",
+        width=832,
+        height=1216,
+        cursor_id=cursor_id,
+        step_id=step_id,
+        seed=seed,
+    )
+    await crud.generated_image.create(db=db, obj_in=image_create)
+
+
+async def test_search_images_by_prompt(db: Session) -> None:
+    """
+    Test that images can be found through the full-text index on their prompt.
+    """
+    await _create_step_with_image(db, "wf-1-0", "a red fox in the snow", "Euler a", 1)
+    await _create_step_with_image(db, "wf-2-0", "a castle on a hill", "DPM++ 2M", 2)
+
+    results = await crud.generation_step.search_images(db=db, query="fox")
+    assert [image.id for image, _ in results] == ["image-wf-1-0"]
+
+    results = await crud.generation_step.search_images(db=db, query="cast*")
+    assert [step.id for _, step in results] == ["wf-2-0"]
+
+    results = await crud.generation_step.search_images(db=db, query="lowres")
+    assert len(results) == 2
+
+
+async def test_search_images_by_parameters(db: Session) -> None:
+    """
+    Test that images can be filtered by the indexed generation parameters.
+    """
+    await _create_step_with_image(db, "wf-1-0", "a red fox in the snow", "Euler a", 1)
+    await _create_step_with_image(db, "wf-2-0", "a castle on a hill", "DPM++ 2M", 2)
+
+    results = await crud.generation_step.search_images(db=db, sampler="DPM++ 2M")
+    assert [step.id for _, step in results] == ["wf-2-0"]
+
+    results = await crud.generation_step.search_images(db=db, seed=1, base_model="SDXL")
+    assert [step.id for _, step in results] == ["wf-1-0"]
+
+    samplers = await crud.generation_step.get_distinct_values(db=db, column="sampler")
+    assert samplers == ["DPM++ 2M", "Euler a"]
+
+
+def test_build_fts_query() -> None:
+    """
+    Test that FTS5 syntax characters in user input are quoted.
+    """
+    assert build_fts_query('red "fox" -blur') == '"red" """fox""" "-blur"'
+    assert build_fts_query("cast*") == '"cast"*'
+    assert build_fts_query("  ") == ""
+
+
+def test_parse_step() -> None:
+    """
+    Test that generation parameters are extracted from a workflow step payload.
+    """
+    item = {"id": "1001440-20241030195910517", "createdAt": "2024-10-30T19:59:10.517Z"}
+    step = {
+        "name": "0",
+        "params": {
+            "prompt": "a red fox",
+            "negativePrompt": "blurry",
+            "baseModel": "SDXL",
+            "sampler": "Euler a",
+            "seed": 1234,
+            "steps": 25,
+            "cfgScale": 7,
+        },
+        "resources": [{"id": 128078}],
+    }
+    step_data = civit.parse_step(item, step)
+    assert step_data["id"] == "1001440-20241030195910517-0"
+    assert step_data["model_id"] == 128078
+    assert step_data["seed"] == 1234
+    assert step_data["cfg_scale"] == 7.0
+    assert step_data["created_at"] == "2024-10-30T19:59:10.517Z"
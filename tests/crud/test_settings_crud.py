@@ -0,0 +1,52 @@
+from unittest.mock import patch
+
+from sqlmodel import Session
+
+from app import crud, models
+from app.crud.data_version import SETTINGS
+
+
+async def test_get_current_is_cached(db: Session) -> None:
+    """
+    Test that the current settings are read from the database only once.
+    """
+    settings = await crud.settings.get_current(db)
+    assert settings.cookie_string == ""
+
+    with patch.object(crud.settings, "get_multi", side_effect=AssertionError("queried")):
+        assert (await crud.settings.get_current(db)).id == settings.id
+
+
+async def test_update_invalidates_cache(db: Session) -> None:
+    """
+    Test that updating the settings bumps their data version and applies immediately.
+    """
+    settings = await crud.settings.get_current(db)
+    await crud.settings.update(
+        db,
+        obj_in=models.SettingsRead(
+            id=settings.id, cookie_string="new-cookie", created_at=settings.created_at
+        ),
+        id=settings.id,
+    )
+
+    assert (await crud.settings.get_current(db)).cookie_string == "new-cookie"
+    assert await crud.data_version.get_version(db=db, key=SETTINGS) == 1
+
+
+async def test_get_current_picks_up_other_worker_updates(db: Session) -> None:
+    """
+    Test that a settings change made elsewhere is seen once the cache TTL runs out.
+    """
+    settings = await crud.settings.get_current(db)
+
+    # Simulate another worker: change the row and bump the version behind the cache
+    db_settings = await crud.settings.get(db=db, id=settings.id)
+    db_settings.cookie_string = "other-worker-cookie"
+    db.add(db_settings)
+    db.commit()
+    await crud.data_version.bump(db=db, key=SETTINGS)
+
+    assert (await crud.settings.get_current(db)).cookie_string == ""
+    with patch("app.crud.settings.app_settings.SETTINGS_CACHE_TTL_SECONDS", 0):
+        assert (await crud.settings.get_current(db)).cookie_string == "other-worker-cookie"
@@ -0,0 +1,106 @@
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlmodel import create_engine
+
+from app.core.app import app
+from benchmarks.datagen import generate
+from benchmarks.harness import compare, percentile
+from benchmarks.loadtest import run_load_test, serve_dataset
+from benchmarks.memory import MEMORY_TASKS, measure_memory, memory_growth
+from benchmarks.startup import import_report
+
+
+async def test_generate_dataset(tmp_path: Path) -> None:
+    """
+    Test that the synthetic dataset is one consistent, newest-first cursor chain.
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'bench.sqlite3'}")
+    await generate(engine, cursors=30, images_per_cursor=4, batch_size=7)
+
+    with engine.connect() as conn:
+        cursors = conn.execute(
+            text("SELECT id, next_cursor_id, page_number FROM cursor ORDER BY id DESC")
+        ).all()
+        images = conn.execute(text("SELECT count(*) FROM generated_image")).scalar_one()
+        users = conn.execute(text("SELECT count(*) FROM user")).scalar_one()
+    engine.dispose()
+
+    assert len(cursors) == 30
+    assert images == 120
+    assert users == 1
+    assert [page_number for _, _, page_number in cursors] == list(range(1, 31))
+    assert [next_id for _, next_id, _ in cursors] == [c[0] for c in cursors[1:]] + [None]
+
+
+def test_compare_flags_regressions() -> None:
+    """
+    Test that slower or chattier benchmarks are flagged as regressions.
+    """
+
+    def report(p50_ms: float, queries: float) -> dict:  # type: ignore
+        return {"results": [{"name": "cursor_detail", "p50_ms": p50_ms, "queries": queries}]}
+
+    assert percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.5
+    assert not compare(report(10, 6), report(10.5, 6))[0].regressed
+    assert compare(report(10, 6), report(12, 6))[0].regressed
+    assert compare(report(10, 6), report(9, 7))[0].regressed
+
+
+def test_startup_does_not_import_lazy_modules() -> None:
+    """
+    Test that optional integrations and the models are only imported when used.
+    """
+    report = import_report("app.core.app", runs=1)
+    assert report.median_seconds > 0
+    assert report.slowest(1, own=True)[0].module == "app.core.app"
+    assert not {"telegram", "emails"} & report.modules
+
+    report = import_report("app.core.cli", runs=1)
+    assert "app.models.settings" in report.modules
+    assert not {"sqlmodel", "fastapi"} & report.modules
+
+
+async def test_load_test(tmp_path: Path) -> None:
+    """
+    Test that simulated viewers log in and browse lists, cursors, images and jumps.
+    """
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'bench.sqlite3'}", connect_args={"check_same_thread": False}
+    )
+    await generate(engine, cursors=30, images_per_cursor=4)
+    try:
+        with serve_dataset(app, engine):
+            result = await run_load_test(
+                app=app, concurrency=2, duration=60, max_sessions=3, jump_rate=0.5, seed=1
+            )
+    finally:
+        engine.dispose()
+
+    assert not result.errors
+    assert result.sessions == 6
+    assert len(result.latencies_ms["login"]) == 2
+    assert len(result.latencies_ms["list"]) == 6
+    assert {"cursor", "image", "jump"} <= set(result.latencies_ms)
+    assert result.requests > 6
+    assert result.throughput > 0
+    assert 0 < result.percentile(50) <= result.percentile(99)
+
+
+async def test_memory_is_flat(tmp_path: Path) -> None:
+    """
+    Test that the import and the chain repair do not load the whole history.
+    """
+    results = []
+    for cursors in (20, 400):
+        for task in MEMORY_TASKS:
+            path = tmp_path / f"{task}-{cursors}.sqlite3"
+            engine = create_engine(f"sqlite:///{path}")
+            await generate(engine, cursors=cursors, images_per_cursor=2)
+            engine.dispose()
+            results.append(await measure_memory(task, path, pages=3, batch_size=20))
+
+    assert [result.cursors for result in results] == [20, 20, 400, 400]
+    assert all(result.peak_mb > 0 for result in results)
+    for task, (traced, _) in memory_growth(results).items():
+        assert traced < 0.25, f"{task} memory grew by {traced} MiB"
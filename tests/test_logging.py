@@ -0,0 +1,16 @@
+import uuid
+from pathlib import Path
+
+from app import logger, settings
+
+
+async def test_log_file_written_once(log_dir: Path) -> None:
+    """
+    Test that a log message is written to the log file once, from the queued sink.
+    """
+    marker = f"log-marker-{uuid.uuid4()}"
+    logger.info("Queued {}", marker)
+    await logger.complete()
+
+    assert settings.LOG_ENQUEUE
+    assert (log_dir / "log.log").read_text().count(marker) == 1
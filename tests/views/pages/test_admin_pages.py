@@ -0,0 +1,35 @@
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from httpx import Cookies
+
+from app.core.query_stats import slow_queries
+
+
+def test_slow_queries_requires_superuser(client: TestClient, normal_user_cookies: Cookies) -> None:
+    """
+    Test that normal users are sent to the login page.
+    """
+    client.cookies = normal_user_cookies
+    response = client.get("/admin/slow-queries", follow_redirects=False)
+    assert response.status_code == 307
+    assert response.headers["location"] == "/login"
+
+
+def test_slow_queries_superuser(client: TestClient, superuser_cookies: Cookies) -> None:
+    """
+    Test that superusers see the slow queries with their plans, and can clear them.
+    """
+    client.cookies = superuser_cookies
+    slow_queries.clear()
+    with patch.object(slow_queries, "threshold_seconds", 1e-9):
+        client.get("/generation")
+    response = client.get("/admin/slow-queries")
+    assert response.status_code == 200
+    assert "GET /generation (view_generation)" in response.text
+    assert "Query plan:" in response.text
+
+    response = client.post("/admin/slow-queries/clear")
+    assert response.status_code == 200
+    assert slow_queries.entries() == []
+    assert "No queries slower than" in response.text
@@ -0,0 +1,354 @@
+from typing import Callable, ContextManager
+
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from httpx import Cookies
+from sqlmodel import Session
+
+from app import crud, models, settings
+from app.core import civit
+from app.core.page_cache import invalidate_gallery, page_cache
+from app.core.query_stats import QueryStats, track_queries
+from app.services.importer import import_cursor_recursive, run_import
+from app.views.pages.generation import repair_cursor_chain
+from benchmarks.civitai_stub import CivitaiStub
+
+
+async def _create_cursors_with_images(db: Session, cursor_ids: list[str], per_cursor: int) -> None:
+    """
+    Create cursors, newest first, each with `per_cursor` images.
+    """
+    for i, cursor_id in enumerate(cursor_ids):
+        next_cursor_id = cursor_ids[i + 1] if i + 1 < len(cursor_ids) else None
+        await crud.cursor.create(
+            db=db, obj_in=models.CursorCreate(id=cursor_id, next_cursor_id=next_cursor_id)
+        )
+    for cursor_id in cursor_ids:
+        for n in range(per_cursor):
+            await crud.generated_image.create(
+                db=db,
+                obj_in=models.GeneratedImageCreate(
+                    id=f"{cursor_id}-img{n}",
+                    url=f"https://image.civitai.com/test/{cursor_id}-img{n}.jpeg",
+                    width=832,
+                    height=1216,
+                    cursor_id=cursor_id,
+                ),
+            )
+
+
+async def test_search_generation(
+    db_with_user: Session, client: TestClient, normal_user_cookies: Cookies
+) -> None:
+    """
+    Test that the search page lists images whose prompt matches the query.
+    """
+    cursor_id = "1001440-20241030195910517"
+    await crud.cursor.create(db=db_with_user, obj_in=models.CursorCreate(id=cursor_id))
+    await crud.generation_step.create(
+        db=db_with_user,
+        obj_in=models.GenerationStepCreate(
+            id=f"{cursor_id}-0", workflow_id=cursor_id, cursor_id=cursor_id, prompt="a red fox"
+        ),
+    )
+    await crud.generated_image.create(
+        db=db_with_user,
+        obj_in=models.GeneratedImageCreate(
+            id="image-1",
+            url="https://image.civitai.com/test/image-1.jpeg",
+            width=832,
+            height=1216,
+            cursor_id=cursor_id,
+            step_id=f"{cursor_id}-0",
+        ),
+    )
+
+    client.cookies = normal_user_cookies
+    response = client.get("/generation/search", params={"q": "fox"})
+    assert response.status_code == 200
+    assert response.template.name == "generation/search.html"  # type: ignore
+    assert "/generation/image/image-1" in response.text
+
+    response = client.get("/generation/search", params={"q": "castle"})
+    assert "/generation/image/image-1" not in response.text
+
+
+async def test_view_image_preload_links(
+    db_with_user: Session, client: TestClient, normal_user_cookies: Cookies
+) -> None:
+    """
+    Test that the image view emits preload hints for neighbours across cursor boundaries.
+    """
+    cursor_ids = ["1-20241030195910517", "1-20241029195910517", "1-20241028195910517"]
+    await _create_cursors_with_images(db_with_user, cursor_ids, per_cursor=2)
+
+    client.cookies = normal_user_cookies
+    response = client.get(f"/generation/image/{cursor_ids[1]}-img1")
+    assert response.status_code == 200
+
+    link = response.headers["link"]
+    assert f"</generation/image/{cursor_ids[2]}-img0>; rel=prefetch" in link
+    assert f"</generation/image/{cursor_ids[1]}-img0>; rel=prefetch" in link
+    assert f"{cursor_ids[0]}-img1.jpeg>; rel=preload; as=image" in link
+    assert f"{cursor_ids[2]}-img1.jpeg>; rel=preload; as=image" in link
+    assert response.context["next_image"].id == f"{cursor_ids[2]}-img0"  # type: ignore
+    assert response.context["prev_image"].id == f"{cursor_ids[1]}-img0"  # type: ignore
+
+
+async def test_view_cursor_conditional_get(
+    db_with_user: Session, client: TestClient, normal_user_cookies: Cookies
+) -> None:
+    """
+    Test that cursor pages carry an ETag, answer 304 to a matching If-None-Match and are
+    re-rendered once the gallery data changes.
+    """
+    cursor_ids = ["1-20241030195910517", "1-20241029195910517"]
+    await _create_cursors_with_images(db_with_user, cursor_ids, per_cursor=1)
+
+    client.cookies = normal_user_cookies
+    response = client.get(f"/generation/{cursor_ids[0]}")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert len(page_cache) == 1
+
+    response = client.get(f"/generation/{cursor_ids[0]}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    # Served from the page cache
+    response = client.get(f"/generation/{cursor_ids[0]}")
+    assert response.status_code == 200
+    assert response.headers["etag"] == etag
+    assert not hasattr(response, "template")
+
+    await invalidate_gallery(db=db_with_user)
+    assert len(page_cache) == 0
+    response = client.get(f"/generation/{cursor_ids[0]}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+async def test_view_timeline_across_cursors(
+    db_with_user: Session, client: TestClient, normal_user_cookies: Cookies
+) -> None:
+    """
+    Test that the timeline pages through images across cursor boundaries.
+    """
+    cursor_ids = ["1-20241030195910517", "1-20241029195910517", "1-20241028195910517"]
+    await _create_cursors_with_images(db_with_user, cursor_ids, per_cursor=2)
+
+    client.cookies = normal_user_cookies
+    with patch.object(settings, "TIMELINE_BATCH_SIZE", 4):
+        response = client.get("/generation/timeline")
+        assert response.status_code == 200
+        images = response.context["images"]  # type: ignore
+        assert [image.id for image in images] == [
+            f"{cursor_ids[0]}-img0",
+            f"{cursor_ids[0]}-img1",
+            f"{cursor_ids[1]}-img0",
+            f"{cursor_ids[1]}-img1",
+        ]
+        assert f'data-next-after="{cursor_ids[1]}-img1"' in response.text
+
+        response = client.get("/generation/timeline/items", params={"after": images[-1].id})
+        assert response.status_code == 200
+        assert [image.id for image in response.context["images"]] == [  # type: ignore
+            f"{cursor_ids[2]}-img0",
+            f"{cursor_ids[2]}-img1",
+        ]
+        assert "timeline-sentinel" not in response.text
+        assert "<html" not in response.text
+
+        response = client.get("/generation/timeline/items", params={"after": "missing"})
+        assert response.status_code == 400
+
+
+async def test_calendar_jumps_to_day(
+    db_with_user: Session, client: TestClient, normal_user_cookies: Cookies
+) -> None:
+    """
+    Test that the calendar shows the days of a month, and that a day jumps to its newest
+    cursor.
+    """
+    cursor_ids = ["1-20240303195910517", "1-20240303100000000", "1-20240301100000000"]
+    await _create_cursors_with_images(db_with_user, cursor_ids, per_cursor=2)
+    client.cookies = normal_user_cookies
+
+    response = client.get("/generation/calendar")
+    assert response.status_code == 200
+    assert (response.context["year"], response.context["month"]) == (2024, 3)  # type: ignore
+    days = response.context["days"]  # type: ignore
+    assert [(day.day.day, day.cursor_count, day.image_count) for day in days.values()] == [
+        (1, 1, 2),
+        (3, 2, 4),
+    ]
+    assert f'href="/generation/{cursor_ids[0]}"' in response.text
+
+    response = client.get("/generation/day", params={"day": "2024-03-03"}, follow_redirects=False)
+    assert response.headers["location"] == f"/generation/{cursor_ids[0]}"
+
+    response = client.get("/generation/day", params={"day": "2024-03-02"}, follow_redirects=False)
+    assert response.headers["location"] == "/generation/calendar?year=2024&month=3"
+    assert "No images on March 2" in response.cookies["alerts"]
+
+
+async def test_cursor_views_query_budget(
+    db_with_user: Session,
+    client: TestClient,
+    normal_user_cookies: Cookies,
+    query_budget: Callable[[int], ContextManager[QueryStats]],
+) -> None:
+    """
+    Test that the cursor, image and jump views make a bounded number of DB queries, however
+    long the cursor chain is.
+    """
+    cursor_ids = [f"1-202410{day:02d}195910517" for day in range(30, 0, -1)]
+    await _create_cursors_with_images(db_with_user, cursor_ids, per_cursor=2)
+    client.cookies = normal_user_cookies
+
+    with query_budget(8):
+        response = client.get(f"/generation/{cursor_ids[10]}")
+    pagination = [c.id for c in response.context["pagination_cursors"]]  # type: ignore
+    assert pagination == cursor_ids[7:14]
+    assert response.headers["server-timing"].startswith("db;dur=")
+
+    with query_budget(6):
+        response = client.get(f"/generation/image/{cursor_ids[10]}-img0")
+    assert response.status_code == 200
+
+    with query_budget(3):
+        response = client.post(
+            "/generation/jump",
+            data={"current_cursor": cursor_ids[0], "jump_count": 25},
+            follow_redirects=False,
+        )
+    assert response.headers["location"] == f"/generation/{cursor_ids[25]}"
+
+    response = client.post(
+        "/generation/jump",
+        data={"current_cursor": cursor_ids[20], "jump_count": 25},
+        follow_redirects=False,
+    )
+    assert response.headers["location"] == f"/generation/{cursor_ids[-1]}"
+
+
+async def test_import_cursor_recursive_from_stub(db_with_user: Session) -> None:
+    """
+    Test a full import of Civitai pages, served by the local stand-in.
+    """
+    current = await crud.settings.get_current(db=db_with_user)
+    await crud.settings.update(
+        db_with_user,
+        obj_in=models.SettingsRead(
+            id=current.id, cookie_string="cookie", created_at=current.created_at
+        ),
+        id=current.id,
+    )
+    stub = CivitaiStub.generate(3, images_per_page=4)
+
+    async with civit.get_client(transport=stub.transport()) as client:
+        with track_queries() as queries:
+            cursors, images = await import_cursor_recursive(
+                cursor_id=None, db=db_with_user, client=client
+            )
+
+    assert (cursors, images) == (3, 12)
+    # Existing images are looked up once per page, not once per image
+    lookups = [
+        (shape, n)
+        for shape, n in queries.statements.items()
+        if shape.startswith("SELECT generated_image.id FROM generated_image WHERE")
+    ]
+    assert lookups == [
+        ("SELECT generated_image.id FROM generated_image WHERE generated_image.id IN (...)", 3)
+    ]
+    assert stub.stats.pages == 3
+    cursor_ids = list(stub.pages)
+    latest = await crud.cursor.get(db=db_with_user, id=cursor_ids[0])
+    assert latest.next_cursor_id == cursor_ids[1]
+    steps = await crud.generation_step.get_all(db=db_with_user)
+    assert len(steps) == 3
+    days = await crud.browse_day.get_all(db=db_with_user)
+    assert sum(day.image_count for day in days) == 12
+    assert all(step.prompt and step.model_id for step in steps)
+
+    # A rate-limited page fails the import
+    stub = CivitaiStub.generate(1, rate_limit_rate=1.0)
+    async with civit.get_client(transport=stub.transport()) as client:
+        with pytest.raises(HTTPException):
+            await import_cursor_recursive(cursor_id=None, db=db_with_user, client=client)
+    assert stub.stats.rate_limited == 1
+
+
+async def test_run_import_records_ledger(
+    db_with_user: Session, client: TestClient, normal_user_cookies: Cookies
+) -> None:
+    """
+    Test that imports are recorded in the import run ledger, with their stage timings.
+    """
+    current = await crud.settings.get_current(db=db_with_user)
+    await crud.settings.update(
+        db_with_user,
+        obj_in=models.SettingsRead(
+            id=current.id, cookie_string="cookie", created_at=current.created_at
+        ),
+        id=current.id,
+    )
+    stub = CivitaiStub.generate(3, images_per_page=4)
+    async with civit.get_client(transport=stub.transport()) as http_client:
+        run = await run_import(
+            db=db_with_user, trigger=models.ImportTrigger.MANUAL, client=http_client
+        )
+
+    assert run.status == models.ImportStatus.SUCCEEDED
+    assert (run.pages_fetched, run.cursors_imported, run.images_inserted) == (3, 3, 12)
+    assert run.bytes_downloaded == stub.stats.bytes_sent
+    assert run.fetch_seconds > 0 and run.db_seconds > 0
+    assert run.finished_at and run.duration_seconds is not None
+    assert run.bound in ("network", "disk")
+
+    stub = CivitaiStub.generate(1, error_rate=1.0)
+    async with civit.get_client(transport=stub.transport()) as http_client:
+        with pytest.raises(HTTPException):
+            await run_import(db=db_with_user, trigger=models.ImportTrigger.API, client=http_client)
+
+    failed, succeeded = await crud.import_run.get_recent(db=db_with_user)
+    assert failed.status == models.ImportStatus.FAILED
+    assert failed.trigger == models.ImportTrigger.API
+    assert "Error fetching cursor data" in failed.error
+    assert succeeded.id == run.id
+
+    client.cookies = normal_user_cookies
+    response = client.get("/generation/imports")
+    assert response.status_code == 200
+    assert "succeeded" in response.text
+    assert "failed" in response.text
+
+
+async def test_repair_cursor_chain_in_batches(db_with_user: Session) -> None:
+    """
+    Test that the repair fixes page numbers and links across batch boundaries.
+    """
+    cursor_ids = [f"1001440-202410301959{59 - n:02d}000" for n in range(7)]
+    await _create_cursors_with_images(db_with_user, cursor_ids, per_cursor=0)
+    broken = await crud.cursor.get(db=db_with_user, id=cursor_ids[1])
+    broken.next_cursor_id = None
+    broken.page_number = 99
+    db_with_user.add(broken)
+    last = await crud.cursor.get(db=db_with_user, id=cursor_ids[-1])
+    last.next_cursor_id = cursor_ids[0]
+    db_with_user.add(last)
+    db_with_user.commit()
+
+    fixes_made, fixed_cursors = await repair_cursor_chain(
+        db=db_with_user, batch_size=2, max_fixed_ids=2
+    )
+    assert fixes_made == 3
+    assert len(fixed_cursors) == 2
+
+    cursors = await crud.cursor.get_multi(db=db_with_user)
+    assert [cursor.page_number for cursor in cursors] == list(range(1, 8))
+    assert [cursor.next_cursor_id for cursor in cursors] == cursor_ids[1:] + [None]
+    assert await repair_cursor_chain(db=db_with_user, batch_size=2) == (0, [])
@@ -0,0 +1,44 @@
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from httpx import Cookies
+
+from app import settings
+from app.core import metrics
+
+
+def test_metrics_requires_auth(client: TestClient, normal_user_cookies: Cookies) -> None:
+    """
+    Test that the metrics are not served anonymously or to normal users.
+    """
+    response = client.get("/metrics")
+    assert response.status_code == 401
+
+    client.cookies = normal_user_cookies
+    response = client.get("/metrics")
+    assert response.status_code == 401
+
+
+def test_metrics_superuser(client: TestClient, superuser_cookies: Cookies) -> None:
+    """
+    Test that superusers can read the metrics, including per-request DB stats.
+    """
+    client.cookies = superuser_cookies
+    client.get("/generation")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE http_request_seconds histogram" in response.text
+    assert 'http_request_db_queries_count{handler="view_generation"}' in response.text
+    assert metrics.HTTP_REQUEST_DB_QUERIES.count(handler="view_generation") > 0
+
+
+def test_metrics_token(client: TestClient) -> None:
+    """
+    Test that scrapers can read the metrics with the metrics bearer token.
+    """
+    with patch.object(settings, "METRICS_TOKEN", "scrape-token"):
+        response = client.get("/metrics", headers={"Authorization": "Bearer scrape-token"})
+        assert response.status_code == 200
+        response = client.get("/metrics", headers={"Authorization": "Bearer wrong"})
+        assert response.status_code == 401
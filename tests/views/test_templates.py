@@ -1,7 +1,11 @@
+from pathlib import Path
+from unittest.mock import patch
+
 import pytest
 
 from app import settings
-from app.views.templates import get_templates
+from app.views.templates import get_templates, precompile_templates
+from app.views.templates import settings as templates_settings
 
 
 def test_templates_obj_env_globals() -> None:
@@ -12,4 +16,20 @@ def test_templates_obj_env_globals() -> None:
     assert templates.env.globals["PROJECT_DESCRIPTION"] == settings.PROJECT_DESCRIPTION
     assert templates.env.globals["BASE_DOMAIN"] == settings.BASE_DOMAIN
     assert templates.env.globals["BASE_URL"] == settings.BASE_URL
-    assert templates.env.globals["VERSION"] == ""
+    assert templates.env.globals["VERSION"] == settings.VERSION
+
+
+def test_templates_precompile(jinja_cache: Path) -> None:
+    templates = get_templates()
+    compiled = precompile_templates(templates)
+    assert compiled == len(templates.env.list_templates(extensions=["html"]))
+    cached_names = [name for _, name in templates.env.cache.keys()]  # type: ignore
+    assert "generation/image_view.html" in cached_names
+    if settings.JINJA_BYTECODE_CACHE_ENABLED:
+        assert list(jinja_cache.glob("__jinja2_*.cache"))
+
+
+def test_templates_auto_reload_follows_debug() -> None:
+    with patch.object(templates_settings, "DEBUG", False):
+        templates = get_templates()
+    assert templates.env.auto_reload is False